@@ -0,0 +1,199 @@
+"""
+Concurrent evaluation runner for the task1 prompt comparison.
+
+Every (review, approach) pair becomes one task. Tasks are scheduled round-robin
+across approaches, so a partial run always holds comparable samples for each
+approach, and they run on a thread pool. API calls share one token bucket, so
+raising the concurrency never pushes the request rate over quota. Failed calls
+are retried with exponential backoff and full jitter. With a ResultStore, each
+result is appended as it completes, and keys already in the store are skipped.
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from task1.result_store import ResultStore, prompt_version
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: Optional[float] = None) -> "TokenBucket":
+        return cls(requests_per_minute / 60.0, burst)
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            # Sleep outside the lock so other threads can refill and check too
+            time.sleep(wait)
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0) -> float:
+    """
+    Full-jitter exponential backoff: uniform in [0, min(max_delay, base_delay * 2**attempt)]
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def call_with_backoff(
+    fn: Callable[[], str],
+    max_retries: int = 5,
+    rate_limiter: Optional[TokenBucket] = None,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0
+) -> Optional[str]:
+    """
+    Call `fn` until it succeeds or `max_retries` attempts have failed (then return None).
+    Every attempt, retries included, takes a token from `rate_limiter`.
+    """
+    for attempt in range(max_retries):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries - 1:
+                logger.warning(f"⚠️ Giving up after {max_retries} attempts: {e}")
+                return None
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.info(f"⚠️ Attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+    return None
+
+
+@dataclass
+class EvalTask:
+    approach: str
+    position: int  # row position in the evaluated DataFrame
+    review_id: str
+    review_text: str
+    actual_stars: int
+
+
+def interleave_tasks(
+    df: pd.DataFrame,
+    approaches: List[str],
+    text_column: str = "text",
+    label_column: str = "stars",
+    id_column: str = "review_id"
+) -> List[EvalTask]:
+    """
+    One task per (review, approach), ordered review by review so approaches advance together
+    """
+    tasks = []
+    for position, row in enumerate(df.itertuples(index=False)):
+        row = row._asdict()
+        review_id = str(row[id_column]) if id_column in row else str(position)
+        for approach in approaches:
+            tasks.append(EvalTask(approach, position, review_id, row[text_column], int(row[label_column])))
+    return tasks
+
+
+def score_response(task: EvalTask, response_text: Optional[str], parse_response: Callable) -> Dict:
+    parsed_json = parse_response(response_text)
+
+    if parsed_json and 'predicted_stars' in parsed_json:
+        predicted_rating = parsed_json['predicted_stars']
+        explanation = parsed_json.get('explanation', 'N/A')
+        is_valid_json = True
+    else:
+        predicted_rating = None
+        explanation = 'Failed to parse'
+        is_valid_json = False
+
+    return {
+        'review_id': task.review_id,
+        'review_text': task.review_text[:100] + '...',  # Truncate for display
+        'actual_stars': task.actual_stars,
+        'predicted_stars': predicted_rating,
+        'explanation': explanation,
+        'is_valid_json': is_valid_json,
+        'api_failed': response_text is None,
+        'raw_response': response_text[:200] if response_text else 'API Failed'
+    }
+
+
+def run_evaluation(
+    df: pd.DataFrame,
+    approaches: Dict[str, Callable[[str], str]],
+    get_response: Callable[[str], Optional[str]],
+    parse_response: Callable[[Optional[str]], Optional[Dict]],
+    concurrency: int = 8,
+    progress_every: int = 100,
+    store: Optional[ResultStore] = None,
+    versions: Optional[Dict[str, str]] = None,
+    **column_names
+) -> Dict[str, pd.DataFrame]:
+    """
+    Evaluate every approach on every row of `df` in one interleaved schedule.
+
+    Args:
+        df: DataFrame with the review text, gold label and review id columns
+        approaches: approach name -> prompt function (review text -> prompt)
+        get_response: prompt -> response text, or None when the call failed for good.
+            It owns rate limiting and retries (see call_with_backoff)
+        parse_response: response text -> parsed JSON dict or None
+        concurrency: number of worker threads
+        store: optional ResultStore; completed keys are skipped and new results appended
+        versions: approach name -> prompt version (default: prompt_version of the prompt function)
+        column_names: text_column / label_column / id_column overrides
+
+    Returns:
+        approach name -> results DataFrame in the row order of `df`
+    """
+    tasks = interleave_tasks(df, list(approaches), **column_names)
+    records: Dict[str, List] = {name: [None] * len(df) for name in approaches}
+
+    if store is not None:
+        versions = {name: (versions or {}).get(name) or prompt_version(fn) for name, fn in approaches.items()}
+        completed = store.completed_keys()
+        review_ids = [task.review_id for task in tasks[::len(approaches)]]
+        remaining = [t for t in tasks if (t.approach, versions[t.approach], t.review_id) not in completed]
+        logger.info(f"{len(tasks) - len(remaining)} results already stored, {len(remaining)} calls to make")
+        tasks = remaining
+
+    def evaluate(task: EvalTask) -> Dict:
+        prompt = approaches[task.approach](task.review_text)
+        record = score_response(task, get_response(prompt), parse_response)
+        if store is not None:
+            store.append({"approach": task.approach, "prompt_version": versions[task.approach], **record})
+        return record
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(evaluate, task): task for task in tasks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            task = futures[future]
+            records[task.approach][task.position] = future.result()
+            if done % progress_every == 0 or done == len(tasks):
+                elapsed = time.perf_counter() - started
+                logger.info(f"Processed {done}/{len(tasks)} calls ({done / elapsed:.1f}/s)")
+
+    if store is not None:
+        return {name: store.load(name, versions[name], review_ids=review_ids) for name in approaches}
+    return {name: pd.DataFrame(rows) for name, rows in records.items()}
\ No newline at end of file
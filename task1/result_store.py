@@ -0,0 +1,119 @@
+"""
+Append-only JSONL store for task1 evaluation results.
+
+Each line is one scored (approach, prompt_version, review_id) result, written as
+soon as it completes, so a run that dies halfway keeps everything it already paid
+for. Rerunning skips keys that already have a successful result. The last line
+for a key wins, which lets a retried API failure replace the earlier record
+without rewriting the file.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+ResultKey = Tuple[str, str, str]
+
+
+def prompt_version(prompt_function: Callable[[str], str], *extra: str) -> str:
+    """
+    Fingerprint of the prompt template (plus e.g. model name and temperature):
+    editing the prompt changes the version, so stale results are never reused
+    """
+    template = prompt_function("{review_text}")
+    return hashlib.sha256("\x00".join([template, *extra]).encode("utf-8")).hexdigest()[:12]
+
+
+class ResultStore:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._completed: Optional[Set[ResultKey]] = None
+        self._tail_checked = False
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _key(record: Dict) -> ResultKey:
+        return (record["approach"], record["prompt_version"], str(record["review_id"]))
+
+    def _scan(self) -> Iterator[Dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash mid-write
+
+    def _newline_if_torn(self) -> str:
+        # A crash mid-write leaves a line without its newline; start the next record on a fresh line
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return ""
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return "" if f.read(1) == b"\n" else "\n"
+
+    def completed_keys(self) -> Set[ResultKey]:
+        with self._lock:
+            if self._completed is None:
+                self._completed = {self._key(r) for r in self._scan() if not r.get("api_failed")}
+            return set(self._completed)
+
+    def is_completed(self, approach: str, version: str, review_id: str) -> bool:
+        return (approach, version, str(review_id)) in self.completed_keys()
+
+    def append(self, record: Dict):
+        """
+        Write one result (must carry approach, prompt_version and review_id); thread-safe
+        """
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if not self._tail_checked:
+                line = self._newline_if_torn() + line
+                self._tail_checked = True
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if self._completed is not None and not record.get("api_failed"):
+                self._completed.add(self._key(record))
+
+    def iter_results(self, approach: Optional[str] = None, version: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream records for one approach / prompt version, one line at a time
+        """
+        for record in self._scan():
+            if approach is not None and record["approach"] != approach:
+                continue
+            if version is not None and record["prompt_version"] != version:
+                continue
+            yield record
+
+    def load(
+        self,
+        approach: str,
+        version: str,
+        review_ids: Optional[List[str]] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Latest result per review as a DataFrame, keeping only `columns` while reading.
+        With `review_ids`, rows are restricted to (and ordered like) that list.
+        """
+        latest: Dict[str, Dict] = {}
+        for record in self.iter_results(approach, version):
+            review_id = str(record["review_id"])
+            latest[review_id] = {c: record.get(c) for c in columns} if columns else record
+
+        if review_ids is not None:
+            rows = [latest[str(review_id)] for review_id in review_ids if str(review_id) in latest]
+        else:
+            rows = list(latest.values())
+        return pd.DataFrame(rows, columns=columns)
\ No newline at end of file
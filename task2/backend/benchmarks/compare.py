@@ -0,0 +1,76 @@
+"""
+Compare two benchmark result files written by suite.py (or http_load.py --json):
+
+    python benchmarks/compare.py baseline.json candidate.json --threshold 10
+
+Rows are matched on scenario (or endpoint) and concurrency. Exits with status 1
+when any p95 latency or throughput moved the wrong way by more than --threshold
+percent, so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+# metric -> True when higher is better
+METRICS = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "loop_lag_max_ms": False,
+}
+GATED = ("throughput_rps", "p95_ms")
+
+
+def load(path: str) -> Dict[Tuple[str, int], Dict]:
+    with open(path) as f:
+        data = json.load(f)
+    rows: List[Dict] = data["results"] if isinstance(data, dict) else data
+    return {(row.get("scenario") or row.get("endpoint"), row["concurrency"]): row for row in rows}
+
+
+def change_pct(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def main(args) -> int:
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    regressions = []
+
+    print(f"{'scenario':<32} {'c':>4}  " + "  ".join(f"{metric:>20}" for metric in METRICS))
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        cells = []
+        for metric, higher_is_better in METRICS.items():
+            if metric not in before or metric not in after:
+                cells.append(f"{'-':>20}")
+                continue
+            pct = change_pct(before[metric], after[metric])
+            worse = -pct if higher_is_better else pct
+            flag = "!" if metric in GATED and worse > args.threshold else " "
+            if flag == "!":
+                regressions.append((key, metric, pct))
+            cells.append(f"{after[metric]:>10} ({pct:+6.1f}%){flag}")
+        print(f"{key[0]:<32} {key[1]:>4}  " + "  ".join(cells))
+
+    missing = baseline.keys() ^ candidate.keys()
+    if missing:
+        print(f"\nOnly in one file: {sorted(missing)}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold}%:")
+        for (name, concurrency), metric, pct in regressions:
+            print(f"  {name} c={concurrency}: {metric} {pct:+.1f}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    sys.exit(main(parser.parse_args()))
\ No newline at end of file
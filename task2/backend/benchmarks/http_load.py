@@ -0,0 +1,100 @@
+"""
+Closed-loop HTTP load generator for the read endpoints.
+
+Start one uvicorn worker, then sweep concurrency levels against /all and /stats:
+
+    uvicorn main:app --port 8000 --workers 1
+    python benchmarks/http_load.py --url http://localhost:8000 --levels 1,8,32,128 --duration 10
+
+Run it once on a build with the synchronous pymongo data layer and once on the
+Motor build to see how many concurrent readers a single worker sustains before
+latency collapses. Pass --json to write the raw numbers to a file.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_ENDPOINTS = [
+    "/api/reviews/all?limit=50",
+    "/api/reviews/stats",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_level(client: httpx.AsyncClient, endpoint: str, concurrency: int, duration: float) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get(endpoint)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+    }
+
+
+async def main(args):
+    levels = [int(level) for level in args.levels.split(",")]
+    endpoints = args.endpoint or DEFAULT_ENDPOINTS
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+
+    results = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        for endpoint in endpoints:
+            for concurrency in levels:
+                result = await run_level(client, endpoint, concurrency, args.duration)
+                results.append(result)
+                print(
+                    f"{endpoint:<32} c={concurrency:<4} {result['throughput_rps']:>8} req/s  "
+                    f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+                    f"errors={result['errors']}"
+                )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--levels", default="1,8,32,128", help="comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--endpoint", action="append", help="override the endpoints to hit (repeatable)")
+    parser.add_argument("--json", help="write results to this file")
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
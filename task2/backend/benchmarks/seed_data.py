@@ -0,0 +1,92 @@
+"""
+Seed the reviews collection with synthetic, already-enriched reviews.
+
+    python benchmarks/seed_data.py --count 1000000 --days 365 --drop
+
+Reviews get a skewed rating mix and timestamps spread over the last --days days
+(so the 24h window and hourly rollup buckets are realistic). The stats rollup is
+rebuilt at the end, so /stats is correct straight away. Uses MONGODB_URL from the
+environment / .env like the app. Sizes of 10^5 to 10^7 show how get_stats and
+deep-page get_all_reviews scale.
+
+With --archive-after-days, reviews older than that are then moved to the archive
+collection, as the archive job would; comparing against a run without it shows
+whether hot-path latency stays flat as history grows:
+
+    python benchmarks/seed_data.py --count 1000000 --days 365 --drop --archive-after-days 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, get_archive_collection, get_reviews_collection  # noqa: E402
+from services.review_service import review_service  # noqa: E402
+from services.stats_rollup import stats_rollup  # noqa: E402
+
+RATING_WEIGHTS = [0.10, 0.08, 0.14, 0.30, 0.38]
+
+WORDS = (
+    "food service staff place great good bad terrible amazing friendly slow rude clean dirty "
+    "price value menu order wait table atmosphere music parking location delicious cold fresh "
+    "portion drink dessert manager experience again recommend never always visit"
+).split()
+
+
+def make_review(rng: random.Random, now: datetime, days: int) -> dict:
+    rating = rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0]
+    review_text = " ".join(rng.choices(WORDS, k=rng.randint(8, 120))).capitalize() + "."
+    return {
+        "timestamp": now - timedelta(seconds=rng.uniform(0, days * 86400)),
+        "rating": rating,
+        "review_text": review_text,
+        "ai_response": "Thank you for your feedback.",
+        "ai_summary": f"Seeded {rating}-star review.",
+        "suggested_actions": ["Review seeded feedback"],
+        "enrichment_status": "completed",
+    }
+
+
+async def seed(args):
+    await Database.connect()
+    collection = get_reviews_collection()
+    if args.drop:
+        await collection.delete_many({})
+        await get_archive_collection().delete_many({})
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    inserted = 0
+
+    while inserted < args.count:
+        batch = [make_review(rng, now, args.days) for _ in range(min(args.batch_size, args.count - inserted))]
+        await collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+        if inserted % (args.batch_size * 10) == 0 or inserted == args.count:
+            rate = inserted / (time.perf_counter() - started)
+            print(f"Inserted {inserted}/{args.count} ({rate:,.0f} docs/s)")
+
+    if args.archive_after_days:
+        started = time.perf_counter()
+        archived = await review_service.archive_reviews(args.archive_after_days, args.batch_size)
+        print(f"Archived {archived} reviews in {time.perf_counter() - started:.1f}s")
+
+    print(await stats_rollup.rebuild())
+    Database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365, help="spread timestamps over this many days")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="delete existing reviews (hot and archived) first")
+    parser.add_argument("--archive-after-days", type=int, help="then archive reviews older than this many days")
+    asyncio.run(seed(parser.parse_args()))
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+Cold-start time and per-worker memory of the API.
+
+Single process (each run in a fresh interpreter): time to import the app,
+whether anything was connected at import, lifespan startup time and RSS after
+each step:
+
+    python benchmarks/startup_profile.py --runs 5
+    python benchmarks/startup_profile.py --mongomock --no-warmups
+
+Multi-worker (gunicorn with gunicorn.conf.py; needs a reachable MONGODB_URL):
+time until the first /health answers and until every worker does, then RSS
+and PSS of the master and each worker. PSS splits pages shared after the fork
+between the processes, so summing it gives the real footprint of the pool.
+
+    python benchmarks/startup_profile.py --workers 4 --json startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Offline by default: the stub LLM and throwaway settings, unless the caller set them
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+
+def memory_mb(pid: str = "self") -> Dict[str, Optional[float]]:
+    """
+    RSS and PSS from /proc (Linux); None where unavailable
+    """
+    def read_kb(path: str, key: str) -> Optional[float]:
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(key + ":"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+        return None
+
+    return {
+        "rss_mb": read_kb(f"/proc/{pid}/status", "VmRSS"),
+        "pss_mb": read_kb(f"/proc/{pid}/smaps_rollup", "Pss"),
+    }
+
+
+def child_pids(parent: int) -> List[int]:
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name is parenthesised and may contain spaces
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def profile_child(args) -> Dict:
+    """
+    Runs inside the fresh interpreter; prints one JSON result
+    """
+    started = time.perf_counter()
+    import main
+    from database import Database
+    result = {
+        "import_ms": round((time.perf_counter() - started) * 1000, 1),
+        "connected_at_import": Database.client is not None,
+        "after_import": memory_mb(),
+    }
+
+    if args.mongomock:
+        # Patched after the import on purpose: the import must not have opened a client
+        from suite import use_mongomock
+        use_mongomock()
+
+    if not args.no_lifespan:
+        async def start():
+            started = time.perf_counter()
+            async with main.lifespan(main.app):
+                result["lifespan_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                if not args.no_warmups:
+                    await asyncio.gather(*main.app.state.warmups, return_exceptions=True)
+                    result["warmed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                result["after_startup"] = memory_mb()
+
+        asyncio.run(start())
+    return result
+
+
+def profile_process(args) -> Dict:
+    command = [sys.executable, os.path.abspath(__file__), "--child"]
+    for flag in ("mongomock", "no_lifespan", "no_warmups"):
+        if getattr(args, flag):
+            command.append("--" + flag.replace("_", "-"))
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    def median(key, memory=None):
+        values = [run.get(key) for run in runs]
+        if memory:
+            values = [value.get(memory) if value else None for value in values]
+        values = [value for value in values if value is not None]
+        return statistics.median(values) if values else None
+
+    summary = {
+        "import_ms": median("import_ms"),
+        "lifespan_ms": median("lifespan_ms"),
+        "warmed_ms": median("warmed_ms"),
+        "rss_after_import_mb": median("after_import", "rss_mb"),
+        "rss_after_startup_mb": median("after_startup", "rss_mb"),
+        "connected_at_import": any(run["connected_at_import"] for run in runs),
+    }
+    print(f"Median of {len(runs)} runs:")
+    for key, value in summary.items():
+        print(f"  {key:<22} {value}")
+    return {"mode": "process", "summary": summary, "runs": runs}
+
+
+def profile_workers(args) -> Dict:
+    import httpx
+
+    env = {**os.environ, "WEB_CONCURRENCY": str(args.workers), "PORT": str(args.port)}
+    started = time.perf_counter()
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", args.app, "-c", "gunicorn.conf.py"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{args.port}/health"
+    first_ready = None
+    served_by = set()
+    try:
+        # Keep-alive would pin every probe to one worker; a fresh connection per probe spreads them
+        while time.perf_counter() - started < args.timeout and len(served_by) < args.workers:
+            if master.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {master.returncode}")
+            try:
+                response = httpx.get(url, headers={"Connection": "close"}, timeout=1.0)
+                if response.status_code == 200:
+                    first_ready = first_ready or time.perf_counter() - started
+                    served_by.add(response.json()["pid"])
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.05)
+        if first_ready is None:
+            raise RuntimeError(f"No answer from {url} within {args.timeout}s")
+        all_ready = time.perf_counter() - started
+
+        time.sleep(args.settle)
+        workers = [{"pid": pid, **memory_mb(str(pid))} for pid in child_pids(master.pid)]
+        result = {
+            "mode": "workers",
+            "workers": args.workers,
+            "first_ready_s": round(first_ready, 2),
+            "all_ready_s": round(all_ready, 2),
+            "master": memory_mb(str(master.pid)),
+            "per_worker": workers,
+            "total_pss_mb": round(sum(w["pss_mb"] or 0 for w in workers), 1),
+        }
+    finally:
+        master.terminate()
+        master.wait(timeout=30)
+
+    print(f"{args.workers} workers: first answer after {result['first_ready_s']}s, all up after {result['all_ready_s']}s")
+    print(f"  master  rss {result['master']['rss_mb']} MB")
+    for worker in workers:
+        print(f"  worker {worker['pid']}  rss {worker['rss_mb']} MB  pss {worker['pss_mb']} MB")
+    print(f"  total worker pss {result['total_pss_mb']} MB")
+    return result
+
+
+def main(args):
+    if args.child:
+        print(json.dumps(profile_child(args)))
+        return
+
+    result = profile_workers(args) if args.workers else profile_process(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to average over (single-process mode)")
+    parser.add_argument("--mongomock", action="store_true", help="in-memory database for the lifespan (single-process mode)")
+    parser.add_argument("--no-lifespan", action="store_true", help="only measure the import")
+    parser.add_argument("--no-warmups", action="store_true", help="don't wait for the dedup and search index warmups")
+    parser.add_argument("--workers", type=int, help="profile a gunicorn pool of this many workers instead")
+    parser.add_argument("--app", default="main:app", help="gunicorn app (multi-worker mode)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds to wait after startup before sampling memory")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    main(parser.parse_args())
\ No newline at end of file
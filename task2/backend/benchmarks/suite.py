@@ -0,0 +1,254 @@
+"""
+In-process benchmark suite for the review API.
+
+Runs the app (lifespan included) behind httpx's ASGI transport, with the stub
+LLM backend, and drives each scenario at the given concurrency levels:
+
+    LLM_STUB_LATENCY_MS=200 python benchmarks/suite.py --levels 1,16,64 --duration 5 --json results.json
+    python benchmarks/suite.py --mongomock --scenario stats --scenario all_deep
+    python benchmarks/compare.py baseline.json results.json
+
+Search latency at 10^6 documents (text index, or SEARCH_BACKEND=memory for the
+in-process index):
+
+    python benchmarks/seed_data.py --count 1000000 --drop
+    python benchmarks/suite.py --scenario search --scenario search_common --scenario search_filtered
+
+Against a real Mongo (MONGODB_URL), seed it first with benchmarks/seed_data.py.
+With --mongomock an in-memory database (mongomock-motor) is seeded with --seed-count
+reviews instead; it is fine for spotting Python-side regressions, not for judging
+query plans (mongomock also runs queries on the event loop and lacks $substrCP
+and $text, so all_summary and, unless SEARCH_BACKEND=memory, the search
+scenarios are skipped there).
+
+Each result reports throughput, p50/p95/p99 latency and event-loop blocking:
+a probe task sleeps LOOP_PROBE_INTERVAL at a time and records how late it woke
+up. `loop_lag_max_ms` is the longest stall and `loop_blocked_ms` the total
+lateness, so synchronous work on a hot path shows up even when latency hides it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Offline by default: the stub LLM and throwaway settings, unless the caller set them
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("LLM_STUB_LATENCY_MS", "200")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+# Load is generated from one client address; per-client limits would only measure the limiter
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from http_load import percentile  # noqa: E402
+
+LOOP_PROBE_INTERVAL = 0.005
+
+# Words from seed_data's vocabulary, plus ones it never generates (empty result sets)
+SEARCH_TERMS = ["rude", "delicious", "parking", "manager", "dessert", "cold", "price", "refund", "allergy"]
+
+SCENARIOS: Dict[str, Callable[[random.Random], Dict]] = {
+    "submit": lambda rng: {
+        "method": "POST",
+        "url": "/api/reviews/submit",
+        "json": {"rating": rng.randint(1, 5), "review_text": f"Benchmark review {rng.random()} about food and service"},
+    },
+    "all": lambda rng: {"method": "GET", "url": "/api/reviews/all", "params": {"limit": 50}},
+    "all_rating": lambda rng: {"method": "GET", "url": "/api/reviews/all", "params": {"limit": 50, "rating": rng.randint(1, 5)}},
+    "all_summary": lambda rng: {"method": "GET", "url": "/api/reviews/all", "params": {"limit": 50, "view": "summary"}},
+    "all_deep": lambda rng: {"method": "GET", "url": "/api/reviews/all", "params": {"limit": 50, "skip": 10_000}},
+    "all_estimated": lambda rng: {"method": "GET", "url": "/api/reviews/all", "params": {"limit": 50, "estimate_total": True}},
+    "stats": lambda rng: {"method": "GET", "url": "/api/reviews/stats"},
+    "search": lambda rng: {"method": "GET", "url": "/api/reviews/search", "params": {"q": " ".join(rng.sample(SEARCH_TERMS, 2)), "limit": 20}},
+    "search_common": lambda rng: {"method": "GET", "url": "/api/reviews/search", "params": {"q": "food service", "limit": 20}},
+    "search_filtered": lambda rng: {
+        "method": "GET",
+        "url": "/api/reviews/search",
+        "params": {"q": rng.choice(SEARCH_TERMS), "rating": rng.randint(1, 5), "since": "2025-01-01T00:00:00", "limit": 20},
+    },
+}
+
+
+class LoopLagProbe:
+    def __init__(self, interval: float = LOOP_PROBE_INTERVAL):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._expected = None
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - self._expected))
+
+    async def __aenter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        await asyncio.sleep(0)  # let the probe start before the load does
+        return self
+
+    async def __aexit__(self, *exc):
+        # A stall that runs to the end of the scenario never lets the probe wake up; count it here
+        overdue = asyncio.get_running_loop().time() - self._expected
+        if overdue > 0:
+            self.lags.append(overdue)
+        self._task.cancel()
+
+    def summary(self) -> Dict:
+        lags_ms = [lag * 1000 for lag in self.lags]
+        return {
+            "loop_lag_p99_ms": round(percentile(lags_ms, 99), 2),
+            "loop_lag_max_ms": round(max(lags_ms, default=0.0), 2),
+            "loop_blocked_ms": round(sum(lags_ms), 1),
+        }
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, concurrency: int, duration: float, seed: int) -> Dict:
+    make_request = SCENARIOS[name]
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            request = make_request(rng)
+            start = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+            # In-process requests that never wait on I/O (e.g. cache hits) would otherwise
+            # run back to back without yielding, which reads as loop blocking
+            await asyncio.sleep(0)
+
+    async with LoopLagProbe() as probe:
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+        **probe.summary(),
+    }
+
+
+def use_mongomock():
+    from mongomock_motor import AsyncMongoMockClient
+    import database
+
+    class MockClient(AsyncMongoMockClient):
+        def __init__(self, *args, **kwargs):
+            super().__init__()
+
+    database.AsyncIOMotorClient = MockClient
+
+
+async def seed_mongomock(count: int):
+    from seed_data import make_review
+    from database import get_reviews_collection
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    collection = get_reviews_collection()
+    for offset in range(0, count, 10_000):
+        await collection.insert_many([make_review(rng, now, 30) for _ in range(min(10_000, count - offset))])
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+async def main(args):
+    if args.mongomock:
+        use_mongomock()
+
+    # Imported after the environment and database patches above are in place
+    import main as app_module
+    from config import settings
+
+    levels = [int(level) for level in args.levels.split(",")]
+    unsupported = {"all_summary"} if settings.search_backend == "memory" else {"all_summary", "search", "search_common", "search_filtered"}
+    scenarios = args.scenario or [name for name in SCENARIOS if not (args.mongomock and name in unsupported)]
+    results = []
+
+    async with app_module.lifespan(app_module.app):
+        from services.review_service import review_service
+        # Measure against warm indexes, not the startup warm-up
+        await asyncio.gather(*app_module.app.state.warmups)
+        if args.mongomock and args.seed_count:
+            await seed_mongomock(args.seed_count)
+            await review_service.rebuild_stats()
+            await review_service.warm_search_index()
+
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            for name in scenarios:
+                for concurrency in levels:
+                    result = await run_scenario(client, name, concurrency, args.duration, args.seed)
+                    results.append(result)
+                    print(
+                        f"{name:<14} c={concurrency:<4} {result['throughput_rps']:>8} req/s  "
+                        f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+                        f"loop_max={result['loop_lag_max_ms']}ms errors={result['errors']}"
+                    )
+
+    if args.json:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "started_at": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "database": "mongomock" if args.mongomock else "mongodb",
+                "llm_backend": settings.llm_backend,
+                "llm_stub_latency_ms": settings.llm_stub_latency_ms,
+                "enrichment_mode": settings.enrichment_mode,
+                "stats_source": settings.stats_source,
+                "search_backend": settings.search_backend,
+                "duration_s": args.duration,
+            },
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,16,64", help="comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario and level")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="scenarios to run (repeatable)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mongomock", action="store_true", help="use an in-memory mongomock database")
+    parser.add_argument("--seed-count", type=int, default=20_000, help="reviews to seed with --mongomock")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
@@ -1,17 +1,111 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # MongoDB
     mongodb_url: str
     database_name: str = "review_feedback_db"
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_max_idle_time_ms: int = 60000
+    mongodb_wait_queue_timeout_ms: int = 5000
+    mongodb_connect_timeout_ms: int = 5000
+    mongodb_socket_timeout_ms: int = 20000
+    mongodb_server_selection_timeout_ms: int = 5000
     
     # Gemini API
-    gemini_api_key: str
+    gemini_api_key: str = ""  # required for the "gemini" and "record" backends
+    llm_backend: str = "gemini"  # "gemini", "stub" (offline, synthetic), "record" or "replay" (from llm_recording_path)
+    llm_recording_path: str = "llm_recordings.jsonl"
+    llm_stub_latency_ms: float = 800.0  # median stub latency
+    llm_stub_latency_sigma: float = 0.5  # lognormal spread; 0 for a fixed delay
+    llm_stub_error_rate: float = 0.0
+    llm_stub_seed: Optional[int] = None
+    llm_max_concurrency: int = 16  # upper bound (and starting point) of the adaptive LLM concurrency limit
+    llm_min_concurrency: int = 2  # the limit never backs off below this
+    llm_call_timeout_seconds: float = 10.0  # deadline per LLM call once it has a slot
+    llm_queue_timeout_seconds: float = 5.0  # longest wait for a slot before falling back
+    llm_breaker_failure_threshold: int = 5  # consecutive failures that open the circuit
+    llm_breaker_recovery_seconds: float = 30.0  # how long the circuit stays open before a probe call
+    reenrich_interval_seconds: float = 60.0  # sweep for reviews stored with fallback content; 0 disables
+    reenrich_batch_size: int = 50
+    llm_generation_mode: str = "combined"  # "combined" (one structured call) or "parallel" (three calls)
+    rating_classifier_path: str = ""  # .npz from `python -m services.rating_classifier`; empty disables the pre-LLM classifier
+    rating_classifier_threshold: float = 0.9  # probability the text matches the rating's sentiment before the LLM is skipped
+    
+    # LLM response cache
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 10000
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+    llm_cache_persistent: bool = False  # add a Mongo-backed tier shared across restarts and workers
+    
+    # Enrichment pipeline
+    enrichment_mode: str = "sync"  # "sync" (enrich, then insert) or "background" (insert, then enrich in workers)
+    enrichment_workers: int = 4
+    enrichment_queue_size: int = 1000
+    enrichment_max_retries: int = 3
+    enrichment_retry_backoff_seconds: float = 1.0
+    enrichment_reply_wait_seconds: float = 5.0  # how long /submit waits for the user reply in background mode
+    job_claim_seconds: float = 300.0  # a worker's claim on a review it requeued or re-enriches keeps other workers off it this long
+    
+    # Batch import
+    batch_max_items: int = 1000
+    batch_llm_concurrency: int = 8  # below llm_max_concurrency so interactive /submit keeps some LLM slots
+    batch_insert_chunk_size: int = 200  # reviews enriched and written per insert_many
+    
+    # Export
+    export_batch_size: int = 1000  # documents per Mongo cursor batch; bounds export memory
+    
+    # Search
+    search_backend: str = "mongo"  # "mongo" (text index) or "memory" (in-process inverted index, warmed at startup)
+    
+    # Near-duplicate detection
+    dedup_enabled: bool = True
+    dedup_max_distance: int = 3  # SimHash bits two reviews may differ by and still count as near-duplicates
+    dedup_reuse_enrichment: bool = True  # copy the AI fields of a same-rating near-duplicate instead of calling the LLM
+    dedup_flood_threshold: int = 5  # near-duplicates accepted per client and cluster per window before returning 429
+    dedup_flood_window_seconds: float = 600.0
+    
+    # Archive tiering
+    archive_after_days: int = 0  # reviews older than this move to the archive collection; 0 disables the job
+    archive_interval_seconds: float = 3600.0
+    archive_batch_size: int = 1000  # reviews copied and deleted per round trip
+    archive_block_compressor: str = "zstd"  # WiredTiger compressor for the archive, applied when it is first created
+    archive_count_ttl_seconds: float = 60.0  # how long a worker reuses archive counts for /all totals
+    
+    # Rate limiting
+    rate_limit_enabled: bool = True
+    rate_limit_store: str = "memory"  # "memory" (per worker) or "mongo" (one bucket per client shared by all workers)
+    rate_limit_submit_per_minute: float = 10.0  # POST /submit and /batch, per client; each one costs LLM calls
+    rate_limit_submit_burst: int = 5
+    rate_limit_api_per_minute: float = 600.0  # every other /api route, per client
+    rate_limit_api_burst: int = 120
+    rate_limit_trusted_proxies: int = 0  # proxies in front of the app that append to X-Forwarded-For; 0 ignores the header
+    
+    # Idempotency
+    idempotency_ttl_seconds: int = 24 * 3600  # how long a key's stored response is replayed to retries
+    idempotency_lock_seconds: float = 60.0  # an unfinished key whose worker died is taken over after this
+    idempotency_wait_seconds: float = 30.0  # how long a duplicate waits for the first request before a 409
     
     # App Settings
     environment: str = "development"
+    web_workers: int = 1  # worker processes for `python main.py`; production runs gunicorn (see gunicorn.conf.py)
     cors_origins: str = "http://localhost:5173,http://localhost:5174"
+    stats_cache_ttl_seconds: float = 5.0
+    http_cache_enabled: bool = True  # ETag/Last-Modified and 304s on /all and /stats
+    http_cache_version_ttl_seconds: float = 1.0  # how long a worker reuses the collection version; bounds staleness of other workers' writes
+    summary_text_length: int = 280  # review_text is truncated to this many characters in view=summary
+    stats_source: str = "rollup"  # "rollup" (materialized counters) or "aggregate" (scan the collection)
+    
+    # Instrumentation
+    metrics_enabled: bool = True  # Prometheus text format on /metrics
+    server_timing_enabled: bool = False  # per-stage Server-Timing response header (exposes internals to clients)
+    
+    # Live dashboard feed
+    live_feed_source: str = "local"  # "local" (this process's writes) or "change_stream" (needs a replica set)
+    live_feed_queue_size: int = 100  # per-subscriber buffer; the oldest events are dropped past this
+    live_stats_interval_seconds: float = 2.0
+    live_heartbeat_seconds: float = 15.0
     
     class Config:
         env_file = ".env"
@@ -1,5 +1,5 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import CollectionInvalid, ConnectionFailure, OperationFailure
 from config import settings
 import logging
 import os
@@ -8,31 +8,110 @@ import os
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Cold tier: reviews past the archive age, moved out of `reviews` by the archive job
+ARCHIVE_COLLECTION = "reviews_archive"
+
 
 class Database:
-    client: MongoClient = None
+    """
+    One Motor client per process. It is created in the app's lifespan (after any
+    fork), never at import; services look collections up on use, so importing them
+    opens nothing. Scripts without a lifespan get a client on first lookup.
+    """
+    client: AsyncIOMotorClient = None
+    
+    @classmethod
+    def _create_client(cls):
+        # Motor connects lazily, so this never blocks; pool and timeouts come from settings
+        cls.client = AsyncIOMotorClient(
+            settings.mongodb_url,
+            maxPoolSize=settings.mongodb_max_pool_size,
+            minPoolSize=settings.mongodb_min_pool_size,
+            maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+            waitQueueTimeoutMS=settings.mongodb_wait_queue_timeout_ms,
+            connectTimeoutMS=settings.mongodb_connect_timeout_ms,
+            socketTimeoutMS=settings.mongodb_socket_timeout_ms,
+            serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+        )
     
     @classmethod
-    def connect(cls):
+    async def connect(cls):
         try:
-            cls.client = MongoClient(settings.mongodb_url)
+            if not cls.client:
+                cls._create_client()
             # Test connection
-            cls.client.admin.command('ping')
+            await cls.client.admin.command('ping')
             logger.info("✅ Successfully connected to MongoDB!")
+            await cls.ensure_indexes()
         except ConnectionFailure as e:
             logger.error(f"❌ Failed to connect to MongoDB: {e}")
             raise
     
+    @classmethod
+    async def ensure_indexes(cls):
+        reviews = cls.get_collection("reviews")
+        # Keyset pagination: newest-first listing, optionally filtered by rating
+        await reviews.create_index([("timestamp", -1), ("_id", -1)])
+        await reviews.create_index([("rating", 1), ("timestamp", -1), ("_id", -1)])
+        if settings.search_backend == "mongo":
+            # Relevance-ranked search; matches in the customer's own words outrank the AI summary
+            await reviews.create_index(
+                [("review_text", "text"), ("ai_summary", "text")],
+                name="review_search",
+                weights={"review_text": 3, "ai_summary": 1}
+            )
+        # Fallback sweeper: only the (few) reviews still holding fallback content are indexed
+        await reviews.create_index(
+            [("timestamp", 1)],
+            name="fallback_sweep",
+            partialFilterExpression={"ai_fallback": True}
+        )
+        await cls.ensure_archive()
+        # Idempotency keys and shared rate-limit buckets expire on their own;
+        # the unique _id index is what lets only one request claim a key
+        await cls.get_collection("idempotency_keys").create_index("expires_at", expireAfterSeconds=0)
+        if settings.rate_limit_store == "mongo":
+            await cls.get_collection("rate_limits").create_index("expires_at", expireAfterSeconds=0)
+    
+    @classmethod
+    async def ensure_archive(cls):
+        # Rarely read, so it is stored with a denser block compressor than the hot collection.
+        # Only set up while the job is on; otherwise the first manual run creates it with the default.
+        if settings.archive_after_days > 0:
+            try:
+                await cls.get_database().create_collection(
+                    ARCHIVE_COLLECTION,
+                    storageEngine={"wiredTiger": {"configString": f"block_compressor={settings.archive_block_compressor}"}}
+                )
+                logger.info(f"🗄️ Created {ARCHIVE_COLLECTION} ({settings.archive_block_compressor})")
+            except CollectionInvalid:
+                pass  # already exists
+            except OperationFailure as e:
+                # e.g. hosted tiers that don't allow storage engine options; the default compressor will do
+                logger.warning(f"⚠️ Could not create {ARCHIVE_COLLECTION} with {settings.archive_block_compressor}: {e}")
+        # Same listing indexes as the hot collection: /all pages continue into the archive
+        archive = cls.get_collection(ARCHIVE_COLLECTION)
+        await archive.create_index([("timestamp", -1), ("_id", -1)])
+        await archive.create_index([("rating", 1), ("timestamp", -1), ("_id", -1)])
+        if settings.search_backend == "mongo":
+            # Search covers both tiers
+            await archive.create_index(
+                [("review_text", "text"), ("ai_summary", "text")],
+                name="review_search",
+                weights={"review_text": 3, "ai_summary": 1}
+            )
+    
     @classmethod
     def close(cls):
         if cls.client:
             cls.client.close()
+            cls.client = None
             logger.info("🔌 MongoDB connection closed")
     
     @classmethod
     def get_database(cls):
         if not cls.client:
-            cls.connect()
+            cls._create_client()
         return cls.client['fynd_assessment']
     
     @classmethod
@@ -42,4 +121,7 @@ class Database:
 
 # Convenience function
 def get_reviews_collection():
-    return Database.get_collection("reviews")
\ No newline at end of file
+    return Database.get_collection("reviews")
+
+def get_archive_collection():
+    return Database.get_collection(ARCHIVE_COLLECTION)
\ No newline at end of file
@@ -0,0 +1,27 @@
+from fastapi import Request
+from services.idempotency import IdempotencyStore
+from services.live_feed import LiveFeed
+from services.llm_service import LLMService
+from services.review_service import ReviewService
+
+# FastAPI dependencies: routes receive the services the lifespan put on app.state,
+# so tests can swap them with app.dependency_overrides. ReviewService takes its
+# collaborators (LLM, enrichment queue, stats, live feed, dedup index) in its
+# constructor, so a fake LLM or queue goes in by overriding get_review_service
+# with a ReviewService built on them
+
+
+def get_review_service(request: Request) -> ReviewService:
+    return request.app.state.review_service
+
+
+def get_llm_service(request: Request) -> LLMService:
+    return request.app.state.llm_service
+
+
+def get_live_feed(request: Request) -> LiveFeed:
+    return request.app.state.live_feed
+
+
+def get_idempotency_store(request: Request) -> IdempotencyStore:
+    return request.app.state.idempotency_store
\ No newline at end of file
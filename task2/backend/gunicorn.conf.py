@@ -0,0 +1,39 @@
+"""
+Multi-worker production profile: gunicorn supervises WEB_CONCURRENCY uvicorn
+workers, one event loop per core.
+
+    gunicorn main:app -c gunicorn.conf.py
+
+Each worker imports the app itself (no preload) and opens its own Mongo client
+and LLM clients in the lifespan, so no sockets are shared across the fork.
+In-process state is per worker too: the near-duplicate index, the memory search
+index, the stats cache and the local live feed (set LIVE_FEED_SOURCE=change_stream
+so every worker's dashboards see every write). Startup requeueing and the fallback
+sweeper run in every worker and claim reviews before working on them.
+
+Set PROMETHEUS_MULTIPROC_DIR to have /metrics aggregate all workers' samples.
+"""
+import multiprocessing
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+graceful_timeout = 30  # lets the lifespan stop the enrichment queue and sweeper
+keepalive = 5
+accesslog = "-"
+
+
+def on_starting(server):
+    # Samples left by a previous run would be summed into this one
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
\ No newline at end of file
@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+import orjson
+from bson import ObjectId
+from fastapi import Request
+from fastapi.responses import ORJSONResponse
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    # orjson writes datetimes as ISO 8601 itself; only ObjectIds need help
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    Default response class: orjson instead of json.dumps, and rows from Mongo can
+    be returned as they are (no jsonable_encoder pass over every value)
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _validators(data: bytes) -> Dict[str, str]:
+    digest = hashlib.blake2b(data, digest_size=12).hexdigest()
+    # no-cache: clients keep the body but revalidate on every poll, which is a cheap 304
+    return {"ETag": f'W/"{digest}"', "Cache-Control": "private, no-cache"}
+
+
+def version_validators(request: Request, version: Dict) -> Dict[str, str]:
+    """
+    ETag and Last-Modified for a response that only changes when the reviews
+    collection does, from StatsRollup.get_version() and the request's query;
+    no query is needed to answer a matching If-None-Match
+    """
+    updated_at: Optional[datetime] = version.get("updated_at")
+    parts = [
+        str(version.get("version", 0)),
+        str(version.get("total", 0)),
+        updated_at.isoformat() if updated_at else "",
+        request.url.path,
+        request.url.query,
+    ]
+    headers = _validators("|".join(parts).encode("utf-8"))
+    if updated_at:
+        headers["Last-Modified"] = format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def content_validators(content: Any) -> Dict[str, str]:
+    """
+    ETag from the payload itself, for small responses that are cached anyway but
+    also drift with time alone (trailing windows)
+    """
+    return _validators(dumps(content))
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """
+    True when the client's copy (If-None-Match, else If-Modified-Since) is still current
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        etag = _strip_weak(headers["ETag"])
+        return any(_strip_weak(tag) == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
\ No newline at end of file
@@ -1,10 +1,27 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+import asyncio
 import logging
+import math
+import os
+import time
 from config import settings
 from database import Database
-from routes import reviews
+from http_cache import FastJSONResponse
+from routes import reviews, metrics
+from routes.reviews import is_idempotent_replay
+from services.archiver import archive_job
+from services.enrichment_queue import enrichment_queue
+from services.fallback_sweeper import fallback_sweeper
+from services.idempotency import idempotency_store
+from services.live_feed import live_feed
+from services.llm_service import llm_service
+from services.rate_limiter import rate_limiter
+from services.review_service import review_service
+from services.stats_rollup import stats_rollup
+from services.instrumentation import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, RATE_LIMITED, server_timing_header, start_request_timings
 
 # Setup logging
 logging.basicConfig(
@@ -17,14 +34,39 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    logger.info("🚀 Starting up Review Feedback API...")
-    Database.connect()
+    logger.info(f"🚀 Starting up Review Feedback API (pid {os.getpid()})...")
+    # Clients are created here, in the serving process, never at import (so never before a fork)
+    await Database.connect()
+    llm_service.start()
+    app.state.review_service = review_service
+    app.state.llm_service = llm_service
+    app.state.live_feed = live_feed
+    app.state.idempotency_store = idempotency_store
+    if settings.stats_source == "rollup" and not await stats_rollup.exists():
+        await review_service.rebuild_stats()
+    if settings.enrichment_mode == "background":
+        await enrichment_queue.start(review_service.enrich_review)
+        await review_service.requeue_pending_reviews()
+    await live_feed.start(review_service.get_live_stats)
+    await fallback_sweeper.start(review_service.reenrich_fallback_reviews)
+    await archive_job.start(review_service.archive_reviews)
+    # Warmed in the background: until they finish, lookups just miss
+    app.state.warmups = [
+        asyncio.create_task(review_service.warm_dedup_index()),
+        asyncio.create_task(review_service.warm_search_index()),
+    ]
     logger.info("✅ Startup complete!")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down Review Feedback API...")
+    for task in app.state.warmups:
+        task.cancel()
+    await archive_job.stop()
+    await fallback_sweeper.stop()
+    await live_feed.stop()
+    await enrichment_queue.stop()
     Database.close()
     logger.info("✅ Shutdown complete!")
 
@@ -33,9 +75,26 @@ app = FastAPI(
     title="Review Feedback System API",
     description="AI-powered review feedback system with user and admin dashboards",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Per-client rate limiting. Registered before CORS so it runs inside it: 429s still
+# carry CORS headers (the browser can read Retry-After) and preflights are not counted.
+# Retries that will be replayed from their Idempotency-Key are not charged.
+@app.middleware("http")
+async def rate_limit_requests(request: Request, call_next):
+    if settings.rate_limit_enabled and not await is_idempotent_replay(request):
+        rule, retry_after = await rate_limiter.check(request)
+        if retry_after > 0:
+            RATE_LIMITED.labels(rule=rule).inc()
+            return FastJSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests, please slow down"},
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+    return await call_next(request)
+
 # CORS middleware - Updated for production
 app.add_middleware(
     CORSMiddleware,
@@ -45,8 +104,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request timing: latency histogram per route template, in-flight gauge, optional Server-Timing
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    timings = start_request_timings()
+    started = time.perf_counter()
+    status = 500
+    HTTP_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=str(status)
+        ).observe(elapsed)
+    
+    if settings.server_timing_enabled:
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
+
 # Include routers
 app.include_router(reviews.router)
+app.include_router(metrics.router)
 
 # Root endpoint
 @app.get("/")
@@ -65,9 +149,23 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "environment": settings.environment
+        "environment": settings.environment,
+        "pid": os.getpid()  # tells gunicorn workers apart
     }
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    # Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR;
+    # whichever worker serves the scrape aggregates all of them
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
 # Global error handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -79,10 +177,13 @@ async def global_exception_handler(request, exc):
     }
 
 if __name__ == "__main__":
+    # Development server; WEB_WORKERS > 1 forks that many processes (no reload then).
+    # Production: gunicorn main:app -c gunicorn.conf.py
     import uvicorn
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True if settings.environment == "development" else False
+        workers=settings.web_workers,
+        reload=settings.environment == "development" and settings.web_workers == 1
     )
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from bson import ObjectId
 
@@ -32,23 +32,65 @@ class ReviewSubmission(BaseModel):
         return v.strip()
 
 
+# batch request: items are validated one by one so a bad item fails alone, not the whole batch
+class ReviewBatchSubmission(BaseModel):
+    reviews: List[Dict[str, Any]] = Field(..., min_length=1, description="Items shaped like ReviewSubmission")
+
+
 # response model
 class ReviewResponse(BaseModel):
     success: bool
     message: str
     submission_id: Optional[str] = None
     ai_response: Optional[str] = None
+    enrichment_status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    success: bool
+    submission_id: Optional[str] = None
+    enrichment_status: Optional[str] = None
     error: Optional[str] = None
 
 
+class ReviewBatchResponse(BaseModel):
+    success: bool
+    submitted: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+class EnrichmentStatusResponse(BaseModel):
+    success: bool
+    submission_id: str
+    enrichment_status: str
+    ai_response: Optional[str] = None
+    ai_summary: Optional[str] = None
+    suggested_actions: List[str] = []
+
+
+# structured LLM output: all three AI fields from a single request
+class ReviewEnrichment(BaseModel):
+    ai_response: Optional[str] = None
+    ai_summary: Optional[str] = None
+    suggested_actions: Optional[List[str]] = None
+
+
 class ReviewRecord(BaseModel):
     id: str = Field(alias="_id")
     timestamp: datetime
     rating: int
     review_text: str
-    ai_response: str
-    ai_summary: str
-    suggested_actions: List[str]
+    ai_response: Optional[str] = None
+    ai_summary: Optional[str] = None
+    suggested_actions: List[str] = []
+    enrichment_status: str = "completed"
+    review_text_truncated: Optional[bool] = None
+    duplicate_of: Optional[str] = None
+    duplicate_count: int = 0
+    score: Optional[float] = None
     
     class Config:
         populate_by_name = True
@@ -60,7 +102,21 @@ class ReviewRecord(BaseModel):
 class ReviewListResponse(BaseModel):
     success: bool
     total: int
+    total_estimated: bool = False
+    reviews: List[ReviewRecord]
+    next_cursor: Optional[str] = None
+
+
+class ReviewSearchResponse(BaseModel):
+    success: bool
+    query: str
     reviews: List[ReviewRecord]
+    next_cursor: Optional[str] = None
+
+
+class ReviewDetailResponse(BaseModel):
+    success: bool
+    review: ReviewRecord
 
 
 class StatsResponse(BaseModel):
@@ -71,6 +127,17 @@ class StatsResponse(BaseModel):
     recent_count_24h: int
 
 
+class StatsBucket(BaseModel):
+    hour: datetime
+    count: int
+    rating_distribution: dict
+
+
+class StatsTimeseriesResponse(BaseModel):
+    success: bool
+    buckets: List[StatsBucket]
+
+
 class ErrorResponse(BaseModel):
     success: bool = False
     error: str
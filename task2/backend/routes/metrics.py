@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+import logging
+from config import settings
+from dependencies import get_llm_service
+from services.llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+@router.get("/llm")
+async def get_llm_metrics(llm_service: LLMService = Depends(get_llm_service)):
+    
+    return {
+        "success": True,
+        "backend": settings.llm_backend,
+        **llm_service.resilience.stats()
+    }
+
+@router.get("/cache")
+async def get_cache_metrics(llm_service: LLMService = Depends(get_llm_service)):
+    
+    if llm_service.cache is None:
+        return {
+            "success": True,
+            "enabled": False
+        }
+    
+    return {
+        "success": True,
+        "enabled": True,
+        **llm_service.cache.stats()
+    }
\ No newline at end of file
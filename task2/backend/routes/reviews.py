@@ -1,38 +1,141 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import csv
+import io
+import json
 import logging
+from config import settings
+from pydantic import ValidationError
 from models import (
     ReviewSubmission, 
+    ReviewBatchSubmission,
     ReviewResponse, 
+    ReviewBatchResponse,
     ReviewListResponse,
+    ReviewSearchResponse,
+    ReviewDetailResponse,
     StatsResponse,
+    StatsTimeseriesResponse,
+    EnrichmentStatusResponse,
     ErrorResponse
 )
-from services.review_service import review_service
+from dependencies import get_idempotency_store, get_live_feed, get_review_service
+from http_cache import FastJSONResponse, content_validators, dumps, is_not_modified, version_validators
+from services.review_service import ReviewService
+from services.enrichment_queue import EnrichmentQueueFull
+from services.dedup_index import DuplicateFlood
+from services.idempotency import IdempotencyConflict, IdempotencyInProgress, IdempotencyStore, request_fingerprint
+from services.live_feed import LiveFeed
+from services.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/reviews", tags=["reviews"])
 
+# Idempotency-Key scope of each POST route that honours it, and the body model it fingerprints
+IDEMPOTENT_SCOPES = {"/api/reviews/submit": "submit", "/api/reviews/batch": "batch"}
+IDEMPOTENT_PAYLOADS = {"submit": ReviewSubmission, "batch": ReviewBatchSubmission}
+
+
+async def is_idempotent_replay(request: Request) -> bool:
+    """
+    Whether this request will be answered from an earlier one with the same
+    Idempotency-Key and body; those cost nothing, so the rate limiter lets them
+    through. A reused key with another body is a conflict and is charged.
+    """
+    key = request.headers.get("idempotency-key")
+    scope = IDEMPOTENT_SCOPES.get(request.url.path)
+    if request.method != "POST" or not key or scope is None:
+        return False
+    try:
+        payload = IDEMPOTENT_PAYLOADS[scope].model_validate_json(await request.body())
+    except ValidationError:
+        return False
+    return await request.app.state.idempotency_store.has_result(
+        f"{scope}:{key}", request_fingerprint(payload.model_dump())
+    )
+
+
+async def run_idempotent(
+    store: IdempotencyStore,
+    scope: str,
+    key: Optional[str],
+    payload: Dict,
+    response: Response,
+    handler: Callable[[], Awaitable[Dict]]
+) -> Dict:
+    """
+    handler() once per Idempotency-Key: concurrent duplicates share the first
+    call and later retries get its stored result. Without a key, just handler().
+    """
+    if not key:
+        return await handler()
+    try:
+        result, replayed = await store.run(f"{scope}:{key}", request_fingerprint(payload), handler)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
 @router.post("/submit", response_model=ReviewResponse)
-async def submit_review(submission: ReviewSubmission):
+async def submit_review(
+    submission: ReviewSubmission,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    review_service: ReviewService = Depends(get_review_service),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store)
+):
     
-    try:
+    async def create() -> Dict:
         logger.info(f"📝 New review submission: {submission.rating} stars")
         
         # Create review with AI-generated content
         result = await review_service.create_review(
             rating=submission.rating,
-            review_text=submission.review_text
+            review_text=submission.review_text,
+            client=rate_limiter.client_key(request)
+        )
+        # Only what the response needs, so replays store nothing else
+        return {key: result[key] for key in ("submission_id", "ai_response", "enrichment_status")}
+    
+    try:
+        result = await run_idempotent(
+            idempotency_store, IDEMPOTENT_SCOPES["/api/reviews/submit"], idempotency_key, submission.model_dump(), response, create
         )
         
         return ReviewResponse(
             success=True,
             message="Review submitted successfully",
             submission_id=result["submission_id"],
-            ai_response=result["ai_response"]
+            ai_response=result["ai_response"],
+            enrichment_status=result["enrichment_status"]
         )
         
+    except EnrichmentQueueFull as e:
+        logger.warning(f"⚠️ Rejecting submission, enrichment queue full: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except HTTPException:
+        raise
+    except DuplicateFlood as e:
+        logger.warning(f"⚠️ Rejecting submission, near-duplicate flood: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(int(settings.dedup_flood_window_seconds))}
+        )
     except Exception as e:
         logger.error(f"❌ Error in submit_review: {e}")
         raise HTTPException(
@@ -41,28 +144,112 @@ async def submit_review(submission: ReviewSubmission):
         )
 
 
+@router.post("/batch", response_model=ReviewBatchResponse)
+async def submit_review_batch(
+    batch: ReviewBatchSubmission,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    review_service: ReviewService = Depends(get_review_service),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store)
+):
+    
+    if len(batch.reviews) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch may contain at most {settings.batch_max_items} reviews"
+        )
+    
+    # Validate each item on its own so one bad review is reported, not fatal
+    items = []
+    invalid = {}
+    for index, raw in enumerate(batch.reviews):
+        try:
+            submission = ReviewSubmission.model_validate(raw)
+            items.append((index, submission.rating, submission.review_text))
+        except ValidationError as e:
+            invalid[index] = {"index": index, "success": False, "error": "; ".join(err["msg"] for err in e.errors())}
+    
+    try:
+        logger.info(f"📦 Batch submission: {len(items)} valid of {len(batch.reviews)} reviews")
+        
+        async def create() -> Dict:
+            return {"results": await review_service.create_reviews_batch(items) if items else []}
+        
+        stored = (await run_idempotent(
+            idempotency_store, IDEMPOTENT_SCOPES["/api/reviews/batch"], idempotency_key, batch.model_dump(), response, create
+        ))["results"]
+        
+        results = sorted(stored + list(invalid.values()), key=lambda r: r["index"])
+        submitted = sum(1 for r in results if r["success"])
+        
+        return ReviewBatchResponse(
+            success=submitted == len(results),
+            submitted=submitted,
+            failed=len(results) - submitted,
+            results=results
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error in submit_review_batch: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to submit review batch: {str(e)}"
+        )
+
+
 @router.get("/all", response_model=ReviewListResponse)
 async def get_all_reviews(
+    request: Request,
     limit: int = Query(50, ge=1, le=200, description="Maximum number of reviews to return"),
     skip: int = Query(0, ge=0, description="Number of reviews to skip"),
-    rating: Optional[int] = Query(None, ge=1, le=5, description="Filter by rating")
+    rating: Optional[int] = Query(None, ge=1, le=5, description="Filter by rating"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    estimate_total: bool = Query(False, description="Return an approximate total instead of counting"),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' truncates review text and omits the AI reply"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (_id and timestamp are always included)"),
+    collapse: bool = Query(False, description="Show one row per near-duplicate cluster, with its duplicate_count"),
+    review_service: ReviewService = Depends(get_review_service)
 ):
     
     try:
-        logger.info(f"📊 Fetching reviews: limit={limit}, skip={skip}, rating={rating}")
+        # Dashboards poll this; when nothing was written since the client's copy, answer
+        # from the collection version alone, before any query
+        headers = {}
+        if settings.http_cache_enabled:
+            headers = version_validators(request, await review_service.get_collection_version())
+            if is_not_modified(request, headers):
+                return Response(status_code=304, headers=headers)
         
-        result = review_service.get_all_reviews(
+        logger.info(f"📊 Fetching reviews: limit={limit}, skip={skip}, rating={rating}, cursor={cursor}, view={view}")
+        
+        result = await review_service.get_all_reviews(
             limit=limit,
             skip=skip,
-            rating_filter=rating
+            rating_filter=rating,
+            cursor=cursor,
+            estimate_total=estimate_total,
+            view=view,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            collapse=collapse
         )
         
-        return ReviewListResponse(
-            success=True,
-            total=result["total"],
-            reviews=result["reviews"]
-        )
+        # Rows are already shaped by the Mongo projection; returning a Response directly
+        # skips re-validating every row against ReviewRecord
+        return FastJSONResponse(content={
+            "success": True,
+            "total": result["total"],
+            "total_estimated": result["total_estimated"],
+            "reviews": result["reviews"],
+            "next_cursor": result["next_cursor"]
+        }, headers=headers)
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"❌ Error in get_all_reviews: {e}")
         raise HTTPException(
@@ -71,13 +258,72 @@ async def get_all_reviews(
         )
 
 
+@router.get("/search", response_model=ReviewSearchResponse)
+async def search_reviews(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for in the review text and AI summary"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of reviews to return"),
+    rating: Optional[int] = Query(None, ge=1, le=5, description="Filter by rating"),
+    since: Optional[datetime] = Query(None, description="Only reviews at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only reviews before this time (UTC)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' truncates review text and omits the AI reply"),
+    review_service: ReviewService = Depends(get_review_service)
+):
+    """
+    Reviews matching q, most relevant first; each row carries its relevance score
+    """
+    try:
+        logger.info(f"🔎 Searching reviews: q={q!r}, rating={rating}, since={since}, until={until}, cursor={cursor}")
+        
+        result = await review_service.search_reviews(
+            query=q,
+            limit=limit,
+            rating_filter=rating,
+            since=since,
+            until=until,
+            cursor=cursor,
+            view=view
+        )
+        
+        return FastJSONResponse(content={
+            "success": True,
+            "query": q,
+            "reviews": result["reviews"],
+            "next_cursor": result["next_cursor"]
+        })
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"❌ Error in search_reviews: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to search reviews: {str(e)}"
+        )
+
+
 @router.get("/stats", response_model=StatsResponse)
-async def get_stats():
+async def get_stats(
+    request: Request,
+    response: Response,
+    review_service: ReviewService = Depends(get_review_service)
+):
     
     try:
         logger.info("📈 Fetching statistics")
         
-        stats = review_service.get_stats()
+        stats = await review_service.get_stats()
+        
+        # Stats come from a short-TTL cache, so hashing them is cheaper than tracking
+        # a version that would also have to follow the sliding 24h window
+        if settings.http_cache_enabled:
+            headers = content_validators(stats)
+            if is_not_modified(request, headers):
+                return Response(status_code=304, headers=headers)
+            response.headers.update(headers)
         
         return StatsResponse(
             success=True,
@@ -95,10 +341,219 @@ async def get_stats():
         )
 
 
+@router.get("/stats/timeseries", response_model=StatsTimeseriesResponse)
+async def get_stats_timeseries(
+    hours: int = Query(24, ge=1, le=24 * 90, description="Number of trailing hours"),
+    review_service: ReviewService = Depends(get_review_service)
+):
+    
+    try:
+        buckets = await review_service.get_stats_timeseries(hours)
+        
+        return StatsTimeseriesResponse(success=True, buckets=buckets)
+        
+    except Exception as e:
+        logger.error(f"❌ Error in get_stats_timeseries: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch stats timeseries: {str(e)}"
+        )
+
+
+@router.post("/stats/reconcile")
+async def reconcile_stats(review_service: ReviewService = Depends(get_review_service)):
+    
+    try:
+        logger.info("🧮 Rebuilding stats rollup")
+        
+        result = await review_service.rebuild_stats()
+        
+        return {
+            "success": True,
+            **result
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error in reconcile_stats: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to rebuild stats: {str(e)}"
+        )
+
+
+@router.post("/archive")
+async def archive_reviews(
+    older_than_days: Optional[int] = Query(None, ge=1, description="Defaults to ARCHIVE_AFTER_DAYS"),
+    review_service: ReviewService = Depends(get_review_service)
+):
+    
+    older_than_days = older_than_days or settings.archive_after_days
+    if older_than_days <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Archiving is disabled; pass older_than_days or set ARCHIVE_AFTER_DAYS"
+        )
+    
+    try:
+        logger.info(f"🗄️ Archiving reviews older than {older_than_days} days")
+        
+        archived = await review_service.archive_reviews(older_than_days, settings.archive_batch_size)
+        
+        return {
+            "success": True,
+            "archived": archived
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error in archive_reviews: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to archive reviews: {str(e)}"
+        )
+
+
+EXPORT_ROWS_PER_CHUNK = 500
+
+
+def _export_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False)
+    return "" if value is None else value
+
+
+async def _ndjson_rows(docs: AsyncIterator[Dict]) -> AsyncIterator[bytes]:
+    lines = []
+    async for doc in docs:
+        lines.append(dumps(doc))
+        if len(lines) >= EXPORT_ROWS_PER_CHUNK:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+async def _csv_rows(docs: AsyncIterator[Dict], columns: List[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    async for doc in docs:
+        writer.writerow([_export_value(doc.get(column)) for column in columns])
+        rows += 1
+        if rows % EXPORT_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_reviews(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="'ndjson' (one JSON object per line) or 'csv'"),
+    rating: Optional[int] = Query(None, ge=1, le=5, description="Filter by rating"),
+    since: Optional[datetime] = Query(None, description="Only reviews at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only reviews before this time (UTC)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export (_id is always included)"),
+    review_service: ReviewService = Depends(get_review_service)
+):
+    """
+    Stream every matching review, newest first, without paging.
+    pandas: pd.read_json(url, lines=True) or pd.read_csv(url + '&format=csv')
+    """
+    try:
+        columns = review_service.export_fields(fields.split(",") if fields else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(f"📤 Exporting reviews: format={format}, rating={rating}, since={since}, until={until}")
+    
+    docs = review_service.export_reviews(rating_filter=rating, since=since, until=until, fields=columns)
+    if format == "csv":
+        body, media_type = _csv_rows(docs, columns), "text/csv"
+    else:
+        body, media_type = _ndjson_rows(docs), "application/x-ndjson"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="reviews.{format}"'}
+    )
+
+
+def _sse_message(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+@router.get("/stream")
+async def stream_reviews(
+    request: Request,
+    review_service: ReviewService = Depends(get_review_service),
+    live_feed: LiveFeed = Depends(get_live_feed)
+):
+    """
+    Server-sent events for the admin dashboard: a stats snapshot on connect, then
+    review_created / review_updated / stats events as reviews arrive
+    """
+    queue = live_feed.broker.subscribe()
+    
+    async def event_stream():
+        try:
+            yield _sse_message("stats", await review_service.get_stats())
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.live_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    # Comment line: keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_message(event["event"], event["data"])
+        finally:
+            live_feed.broker.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{review_id}/status", response_model=EnrichmentStatusResponse)
+async def get_enrichment_status(review_id: str, review_service: ReviewService = Depends(get_review_service)):
+    
+    status = await review_service.get_enrichment_status(review_id)
+    
+    if status is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Review not found"
+        )
+    
+    return EnrichmentStatusResponse(success=True, **status)
+
+
 @router.get("/health")
 async def health_check():
 
     return {
         "status": "healthy",
         "service": "review-feedback-api"
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/{review_id}", response_model=ReviewDetailResponse)
+async def get_review(review_id: str, review_service: ReviewService = Depends(get_review_service)):
+    
+    review = await review_service.get_review_by_id(review_id)
+    
+    if review is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Review not found"
+        )
+    
+    return ReviewDetailResponse(success=True, review=review)
\ No newline at end of file
@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveJob:
+    """
+    Periodically moves reviews older than archive_after_days into the archive
+    collection, so the hot `reviews` collection and its indexes stay the size of
+    the recent window however long the history grows. Every worker runs one;
+    moves are idempotent, so overlapping runs only repeat a little work.
+    """
+
+    def __init__(self):
+        self._handler: Optional[Callable[[int, int], Awaitable[int]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Callable[[int, int], Awaitable[int]]):
+        if settings.archive_after_days <= 0 or settings.archive_interval_seconds <= 0:
+            return
+        self._handler = handler
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"✅ Archive job started (reviews older than {settings.archive_after_days} days, "
+            f"every {settings.archive_interval_seconds}s)"
+        )
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.archive_interval_seconds)
+            try:
+                await self._handler(settings.archive_after_days, settings.archive_batch_size)
+            except Exception as e:
+                logger.error(f"❌ Archive run failed: {e}")
+
+# Create singleton instance
+archive_job = ArchiveJob()
\ No newline at end of file
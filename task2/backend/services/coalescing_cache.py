@@ -0,0 +1,50 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CoalescingCache:
+    """
+    Short-TTL async cache. Concurrent misses for the same key share a single
+    in-flight load instead of each hitting the database.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._values: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._values.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # shield: a cancelled waiter must not cancel the load the others share
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved so an unshared failure isn't logged twice
+            raise
+        else:
+            if self.ttl_seconds > 0:
+                self._values[key] = (time.monotonic() + self.ttl_seconds, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import time
+from array import array
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+from bson import ObjectId
+from config import settings
+from services.llm_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+SHINGLE_WORDS = 3
+
+
+class DuplicateFlood(Exception):
+    """Raised when one client resubmits a cluster of near-identical reviews too often"""
+    pass
+
+
+class DuplicateMatch(NamedTuple):
+    review_id: ObjectId
+    cluster_id: ObjectId
+    distance: int
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash of the normalized text over 3-word shingles: small edits flip
+    only a few bits, so near-duplicates land within a small Hamming distance
+    """
+    words = normalize_text(text).split()
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    # One 64-char bit string per shingle; counting down the columns is the per-bit vote
+    rows = [
+        f"{int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'):064b}"
+        for shingle in shingles
+    ]
+    half = len(rows) / 2
+    fingerprint = 0
+    for column in zip(*rows):
+        fingerprint = (fingerprint << 1) | (column.count("1") > half)
+    return fingerprint
+
+
+def to_int64(fingerprint: int) -> int:
+    # BSON integers are signed
+    return fingerprint - (1 << HASH_BITS) if fingerprint >= 1 << (HASH_BITS - 1) else fingerprint
+
+
+def from_int64(value: int) -> int:
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+class DedupIndex:
+    """
+    In-memory SimHash index for near-duplicate lookups.
+
+    Fingerprints are split into max_distance + 1 bands; by pigeonhole, two
+    fingerprints within max_distance bits agree exactly on at least one band,
+    so a lookup only compares against reviews sharing a band value. Entries are
+    kept in flat arrays (under 100 bytes per review) so millions of reviews fit.
+
+    The index is per process: it is warmed from the `simhash` stored on each
+    review and then sees this process's own inserts.
+    """
+
+    def __init__(self, max_distance: int, flood_threshold: int, flood_window_seconds: float):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = HASH_BITS // self.bands
+        self.flood_threshold = flood_threshold
+        self.flood_window_seconds = flood_window_seconds
+        self._hashes = array("Q")
+        self._ids = bytearray()  # 12-byte ObjectIds, one per slot
+        self._clusters = bytearray()  # ObjectId of each review's cluster root
+        self._buckets: Dict[int, array] = {}
+        self._recent: Dict[Tuple[str, bytes], Deque[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _band_keys(self, fingerprint: int):
+        mask = (1 << self.band_bits) - 1
+        for band in range(self.bands):
+            yield (band << self.band_bits) | ((fingerprint >> (band * self.band_bits)) & mask)
+
+    def add(self, review_id: ObjectId, fingerprint: int, cluster_id: Optional[ObjectId] = None):
+        slot = len(self._hashes)
+        self._hashes.append(fingerprint)
+        self._ids += review_id.binary
+        self._clusters += (cluster_id or review_id).binary
+        for key in self._band_keys(fingerprint):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = array("I")
+            bucket.append(slot)
+
+    def find(self, fingerprint: int) -> Optional[DuplicateMatch]:
+        """
+        Closest indexed review within max_distance bits, if any
+        """
+        best_slot, best_distance = -1, self.max_distance + 1
+        for key in self._band_keys(fingerprint):
+            for slot in self._buckets.get(key, ()):
+                distance = (self._hashes[slot] ^ fingerprint).bit_count()
+                if distance < best_distance:
+                    best_slot, best_distance = slot, distance
+                    if distance == 0:
+                        break
+        if best_slot < 0:
+            return None
+        offset = best_slot * 12
+        return DuplicateMatch(
+            review_id=ObjectId(bytes(self._ids[offset:offset + 12])),
+            cluster_id=ObjectId(bytes(self._clusters[offset:offset + 12])),
+            distance=best_distance
+        )
+
+    def check_flood(self, match: DuplicateMatch, client: str):
+        """
+        Count a resubmission into the matched cluster by this client; raises DuplicateFlood
+        past the threshold. Counted per client: short, common reviews ("Great service!")
+        from different customers collide all the time and must not lock each other out.
+        """
+        now = time.monotonic()
+        recent = self._recent.setdefault((client, match.cluster_id.binary), deque())
+        while recent and now - recent[0] > self.flood_window_seconds:
+            recent.popleft()
+        if len(recent) >= self.flood_threshold:
+            raise DuplicateFlood("Too many near-identical reviews, please retry later")
+        recent.append(now)
+        if len(self._recent) > 10000:
+            self._prune_recent(now)
+
+    def _prune_recent(self, now: float):
+        self._recent = {
+            key: recent for key, recent in self._recent.items()
+            if recent and now - recent[-1] <= self.flood_window_seconds
+        }
+
+# Create singleton instance
+dedup_index = DedupIndex(
+    max_distance=settings.dedup_max_distance,
+    flood_threshold=settings.dedup_flood_threshold,
+    flood_window_seconds=settings.dedup_flood_window_seconds
+)
\ No newline at end of file
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentQueueFull(Exception):
+    """Raised when the queue is at capacity and cannot accept more reviews"""
+    pass
+
+
+class EnrichmentJob:
+    def __init__(self, review_id: str, rating: int, review_text: str):
+        self.review_id = review_id
+        self.rating = rating
+        self.review_text = review_text
+        self.attempt = 0
+
+
+# handler(job, is_last_attempt) -> result; raising signals that the job should be retried
+EnrichmentHandler = Callable[[EnrichmentJob, bool], Awaitable[Optional[Dict]]]
+
+
+class EnrichmentQueue:
+    """
+    Bounded in-process queue drained by a fixed pool of async workers.
+    Ingest only pays for an enqueue; LLM throughput is capped by the worker count.
+    """
+    def __init__(self, num_workers: int, max_size: int, max_retries: int, retry_backoff_seconds: float):
+        self.num_workers = num_workers
+        self.max_size = max_size
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retry_tasks: set = set()
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._handler: Optional[EnrichmentHandler] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def is_full(self) -> bool:
+        # Jobs waiting out a retry backoff still hold a slot
+        return self.depth + len(self._retry_tasks) >= self.max_size
+
+    async def start(self, handler: EnrichmentHandler):
+        if self.running:
+            return
+
+        self._handler = handler
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.num_workers)
+        ]
+        logger.info(f"✅ Enrichment queue started with {self.num_workers} workers")
+
+    async def stop(self):
+        if not self.running:
+            return
+        
+        # Unfinished jobs stay "pending" in Mongo and are re-queued on the next startup
+        for task in [*self._workers, *self._retry_tasks]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retry_tasks, return_exceptions=True)
+
+        self._workers = []
+        self._retry_tasks = set()
+        for future in self._waiters.values():
+            if not future.done():
+                future.set_result(None)
+        self._waiters = {}
+        logger.info("🔌 Enrichment queue stopped")
+
+    def enqueue(self, review_id: str, rating: int, review_text: str) -> asyncio.Future:
+        """
+        Queue a review for enrichment. The returned future resolves with the
+        handler's result (or None if every attempt failed).
+        """
+        if not self.running:
+            raise RuntimeError("Enrichment queue is not running")
+        if self.is_full():
+            raise EnrichmentQueueFull(f"Enrichment queue is full ({self.max_size} jobs)")
+
+        job = EnrichmentJob(review_id, rating, review_text)
+        self._queue.put_nowait(job)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[review_id] = future
+        return future
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run_job(job)
+            except Exception as e:
+                logger.error(f"❌ Enrichment worker {worker_id} crashed on {job.review_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: EnrichmentJob):
+        is_last_attempt = job.attempt >= self.max_retries
+        try:
+            result = await self._handler(job, is_last_attempt)
+        except Exception as e:
+            if is_last_attempt:
+                logger.error(f"❌ Enrichment failed for {job.review_id} after {job.attempt + 1} attempts: {e}")
+                self._resolve(job.review_id, None)
+                return
+
+            # Exponential backoff without holding a worker slot
+            delay = self.retry_backoff_seconds * (2 ** job.attempt)
+            job.attempt += 1
+            logger.warning(f"⚠️ Enrichment attempt {job.attempt} failed for {job.review_id}, retrying in {delay:.1f}s: {e}")
+            task = asyncio.create_task(self._retry_later(job, delay))
+            self._retry_tasks.add(task)
+            task.add_done_callback(self._retry_tasks.discard)
+            return
+
+        self._resolve(job.review_id, result)
+
+    async def _retry_later(self, job: EnrichmentJob, delay: float):
+        await asyncio.sleep(delay)
+        await self._queue.put(job)
+
+    def _resolve(self, review_id: str, result: Optional[Dict]):
+        future = self._waiters.pop(review_id, None)
+        if future and not future.done():
+            future.set_result(result)
+
+
+# Create singleton instance
+enrichment_queue = EnrichmentQueue(
+    num_workers=settings.enrichment_workers,
+    max_size=settings.enrichment_queue_size,
+    max_retries=settings.enrichment_max_retries,
+    retry_backoff_seconds=settings.enrichment_retry_backoff_seconds,
+)
\ No newline at end of file
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+from typing import Any, Dict, Set
+
+logger = logging.getLogger(__name__)
+
+
+class EventBroker:
+    """
+    In-process fan-out: each published event is copied to every subscriber's
+    bounded queue. A slow subscriber loses its oldest events rather than
+    holding up publishers or growing without bound.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        event = {"event": event_type, "data": data}
+        for queue in self._subscribers:
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
\ No newline at end of file
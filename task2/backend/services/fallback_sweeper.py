@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+from config import settings
+from services.llm_service import llm_service
+
+logger = logging.getLogger(__name__)
+
+
+class FallbackSweeper:
+    """
+    Periodically re-enriches reviews that were stored with fallback content
+    (LLM errors, timeouts or an open circuit). Passes are skipped while the
+    LLM circuit is open; once it is due for a probe, a sweep can be the probe.
+    """
+
+    def __init__(self):
+        self._handler: Optional[Callable[[int], Awaitable[int]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Callable[[int], Awaitable[int]]):
+        if settings.reenrich_interval_seconds <= 0:
+            return
+        self._handler = handler
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Fallback sweeper started (every {settings.reenrich_interval_seconds}s)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.reenrich_interval_seconds)
+            if llm_service.is_cooling_down:
+                continue
+            try:
+                await self._handler(settings.reenrich_batch_size)
+            except Exception as e:
+                logger.error(f"❌ Fallback sweep failed: {e}")
+
+# Create singleton instance
+fallback_sweeper = FallbackSweeper()
\ No newline at end of file
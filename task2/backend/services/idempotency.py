@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from pymongo.errors import DuplicateKeyError
+from config import settings
+from database import Database
+from services.instrumentation import IDEMPOTENT_REPLAYS
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 0.2
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an Idempotency-Key is reused with a different request body"""
+    pass
+
+
+class IdempotencyInProgress(Exception):
+    """Raised when the first request with this key is still running after the wait"""
+    pass
+
+
+def request_fingerprint(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Idempotency-Key handling for POST endpoints.
+
+    Each key is a document in `idempotency_keys` whose _id is the scoped key, so
+    the unique _id index decides which request runs, across workers:
+    - the first request inserts an in-progress record, runs, and stores its result
+    - duplicates in the same worker await that in-flight call
+    - duplicates in other workers poll the record until it completes
+    - retries after completion get the stored result
+    A failed request deletes its record so the client can retry with the same key;
+    a record whose worker died is taken over once its lock expires.
+    """
+
+    def __init__(self, ttl_seconds: int, lock_seconds: float, wait_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    @property
+    def collection(self):
+        return Database.get_collection("idempotency_keys")
+
+    async def run(self, key: str, fingerprint: str, handler: Callable[[], Awaitable[Dict]]) -> Tuple[Dict, bool]:
+        """
+        Result of handler() for this key, and whether it was replayed from an earlier request
+        """
+        scope = key.split(":", 1)[0]
+        local = self._inflight.get(key)
+        if local is not None:
+            if local[0] != fingerprint:
+                raise IdempotencyConflict("Idempotency-Key was already used with a different request")
+            IDEMPOTENT_REPLAYS.labels(scope=scope).inc()
+            # shield: a cancelled duplicate must not cancel the call the others share
+            return await asyncio.shield(local[1]), True
+
+        # Registered before the first await so concurrent duplicates here find it
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fingerprint, future)
+        owned = False
+        try:
+            stored = await self._claim(key, fingerprint)
+            if stored is not None:
+                IDEMPOTENT_REPLAYS.labels(scope=scope).inc()
+                result, replayed = stored, True
+            else:
+                owned = True
+                result, replayed = await handler(), False
+                await self._complete(key, result)
+        except BaseException as e:
+            if owned:
+                await self._release(key)
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()  # mark retrieved so an unshared failure isn't logged twice
+            else:
+                future.cancel()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._inflight.pop(key, None)
+        return result, replayed
+
+    async def has_result(self, key: str, fingerprint: str) -> bool:
+        """
+        Whether a request with this key and body would be answered without running:
+        an earlier one completed, or one is in flight in this worker
+        """
+        local = self._inflight.get(key)
+        if local is not None:
+            return local[0] == fingerprint
+        try:
+            doc = await self.collection.find_one(
+                {"_id": key, "status": "completed", "fingerprint": fingerprint}, {"_id": 1}
+            )
+            return doc is not None
+        except Exception as e:
+            logger.error(f"❌ Failed to look up idempotency key {key}: {e}")
+            return False
+
+    async def _claim(self, key: str, fingerprint: str) -> Optional[Dict]:
+        """
+        None once this request owns the key, else the stored result of the first request
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            now = datetime.utcnow()
+            try:
+                await self.collection.insert_one({
+                    "_id": key,
+                    "fingerprint": fingerprint,
+                    "status": "in_progress",
+                    "locked_until": now + timedelta(seconds=self.lock_seconds),
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                })
+                return None
+            except DuplicateKeyError:
+                pass
+
+            doc = await self.collection.find_one({"_id": key})
+            if doc is None:
+                continue  # released by a failed request in between; try again
+            if doc["fingerprint"] != fingerprint:
+                raise IdempotencyConflict("Idempotency-Key was already used with a different request")
+            if doc["status"] == "completed":
+                return doc["response"]
+            if doc["locked_until"] <= now:
+                taken = await self.collection.find_one_and_update(
+                    {"_id": key, "status": "in_progress", "locked_until": doc["locked_until"]},
+                    {"$set": {"locked_until": now + timedelta(seconds=self.lock_seconds)}}
+                )
+                if taken is not None:
+                    logger.warning(f"⚠️ Taking over stale idempotency key {key}")
+                    return None
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress("A request with this Idempotency-Key is still being processed")
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def _complete(self, key: str, result: Dict):
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"status": "completed", "response": result, "completed_at": datetime.utcnow()}}
+            )
+        except Exception as e:
+            # The request itself succeeded; only later retries lose their replay
+            logger.error(f"❌ Failed to store idempotent result for {key}: {e}")
+
+    async def _release(self, key: str):
+        try:
+            await self.collection.delete_one({"_id": key, "status": "in_progress"})
+        except Exception as e:
+            logger.error(f"❌ Failed to release idempotency key {key}: {e}")
+
+# Create singleton instance
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    lock_seconds=settings.idempotency_lock_seconds,
+    wait_seconds=settings.idempotency_wait_seconds
+)
\ No newline at end of file
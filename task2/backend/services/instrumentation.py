@@ -0,0 +1,88 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from prometheus_client import Counter, Gauge, Histogram
+
+# Per-request list of (stage, seconds), read by the middleware for the Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled", multiprocess_mode="livesum")
+
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Latency of one stage of a request (llm.<kind>, mongo.<operation>, ...)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_REQUESTS = Counter("llm_requests_total", "LLM calls by prompt kind and outcome", ["kind", "outcome"])
+LLM_IN_FLIGHT = Gauge("llm_requests_in_flight", "LLM calls currently awaiting a response", multiprocess_mode="livesum")
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens by model and direction", ["model", "direction"])
+LLM_FALLBACKS = Counter("llm_fallbacks_total", "Fields served from fallback content", ["field"])
+CONCURRENCY_LIMIT = Gauge("concurrency_limit", "Current adaptive concurrency limit", ["name"])
+CIRCUIT_STATE = Gauge("circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open)", ["name"])
+CLASSIFIER_ROUTED = Counter(
+    "rating_classifier_routed_total",
+    "Reviews answered from templates because the local rating classifier was confident",
+    ["sentiment"]
+)
+RATE_LIMITED = Counter("rate_limited_requests_total", "Requests rejected with 429 by the rate limiter", ["rule"])
+IDEMPOTENT_REPLAYS = Counter(
+    "idempotent_replays_total",
+    "Requests answered with the result of an earlier request with the same Idempotency-Key",
+    ["scope"]
+)
+
+
+def start_request_timings() -> List[Tuple[str, float]]:
+    timings: List[Tuple[str, float]] = []
+    _request_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Time a block into STAGE_SECONDS and the current request's Server-Timing entries.
+    Works around awaits: `with timed("mongo.insert_one"): await collection.insert_one(doc)`
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def server_timing_header(timings: List[Tuple[str, float]], total_seconds: float) -> str:
+    # Repeated stages (e.g. three parallel LLM calls) are summed under one entry
+    totals = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items()]
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def record_llm_usage(model: str, prompt_tokens: Optional[int], output_tokens: Optional[int]):
+    if prompt_tokens:
+        LLM_TOKENS.labels(model=model, direction="prompt").inc(prompt_tokens)
+    if output_tokens:
+        LLM_TOKENS.labels(model=model, direction="output").inc(output_tokens)
+
+
+def record_fallbacks(fields: List[str]):
+    for field in fields:
+        LLM_FALLBACKS.labels(field=field).inc()
\ No newline at end of file
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+from config import settings
+from database import get_reviews_collection
+from services.event_broker import EventBroker
+
+logger = logging.getLogger(__name__)
+
+# Stored fields that to_feed_review shows and that change after insert
+FEED_UPDATE_FIELDS = ["ai_summary", "suggested_actions", "enrichment_status", "duplicate_count"]
+
+
+class LiveFeed:
+    """
+    Pushes review and stats events to dashboard streams.
+
+    Events come either from this process's writes ("local") or from a Mongo
+    change stream ("change_stream", needs a replica set) so every worker sees
+    writes made by the others. Stats are recomputed at most once per
+    live_stats_interval_seconds, and only while someone is listening.
+    """
+
+    def __init__(self):
+        self.broker = EventBroker(max_queue_size=settings.live_feed_queue_size)
+        self._stats_loader: Optional[Callable[[], Awaitable[Dict]]] = None
+        self._stats_dirty = asyncio.Event()
+        self._tasks = []
+
+    @property
+    def uses_change_stream(self) -> bool:
+        return settings.live_feed_source == "change_stream"
+
+    async def start(self, stats_loader: Callable[[], Awaitable[Dict]]):
+        self._stats_loader = stats_loader
+        self._tasks.append(asyncio.create_task(self._publish_stats_loop()))
+        if self.uses_change_stream:
+            self._tasks.append(asyncio.create_task(self._watch_changes()))
+        logger.info(f"✅ Live feed started ({settings.live_feed_source})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def review_created(self, review: Dict):
+        if self.uses_change_stream:
+            return  # the watcher publishes it
+        self._publish_review("review_created", review)
+
+    def review_updated(self, review: Dict):
+        if self.uses_change_stream:
+            return
+        self._publish_review("review_updated", review)
+
+    def _publish_review(self, event_type: str, review: Dict):
+        if not self.broker.subscriber_count:
+            return
+        self.broker.publish(event_type, review)
+        self._stats_dirty.set()
+
+    async def _publish_stats_loop(self):
+        # Coalesces a burst of inserts into one stats refresh per interval
+        while True:
+            await self._stats_dirty.wait()
+            await asyncio.sleep(settings.live_stats_interval_seconds)
+            self._stats_dirty.clear()
+            if not self.broker.subscriber_count:
+                continue
+            try:
+                self.broker.publish("stats", await self._stats_loader())
+            except Exception as e:
+                logger.error(f"❌ Failed to publish live stats: {e}")
+
+    async def _watch_changes(self):
+        collection = get_reviews_collection()
+        # Updates only count when they touch what a dashboard shows; bookkeeping writes
+        # (simhash backfill, job claims, fallback markers) would otherwise flood every client
+        pipeline = [{"$match": {"$or": [
+            {"operationType": "insert"},
+            {
+                "operationType": "update",
+                "$or": [{f"updateDescription.updatedFields.{field}": {"$exists": True}} for field in FEED_UPDATE_FIELDS]
+            },
+        ]}}]
+
+        while True:
+            try:
+                async with collection.watch(pipeline, full_document="updateLookup") as stream:
+                    async for change in stream:
+                        doc = change.get("fullDocument")
+                        if not doc:
+                            continue
+                        event_type = "review_created" if change["operationType"] == "insert" else "review_updated"
+                        self._publish_review(event_type, to_feed_review(doc))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Change stream failed, retrying: {e}")
+                await asyncio.sleep(5)
+
+
+def to_feed_review(doc: Dict) -> Dict:
+    """
+    Shape a review document like a view=summary row of /api/reviews/all
+    """
+    text = doc.get("review_text") or ""
+    return {
+        "_id": str(doc["_id"]),
+        "timestamp": doc["timestamp"],
+        "rating": doc["rating"],
+        "review_text": text[:settings.summary_text_length],
+        "review_text_truncated": len(text) > settings.summary_text_length,
+        "ai_summary": doc.get("ai_summary"),
+        "suggested_actions": doc.get("suggested_actions") or [],
+        "enrichment_status": doc.get("enrichment_status", "completed"),
+        "duplicate_count": doc.get("duplicate_count", 0)
+    }
+
+
+# Create singleton instance
+live_feed = LiveFeed()
\ No newline at end of file
@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from services.llm_cache import make_cache_key
+
+# Kept free of config/database imports so the task1 notebook can use the same backends
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("gemini", "stub", "record", "replay")
+
+# (model, prompt_tokens, output_tokens); lets the service meter token usage
+UsageCallback = Callable[[str, Optional[int], Optional[int]], None]
+
+
+class LLMBackendError(Exception):
+    pass
+
+
+class ReplayMiss(LLMBackendError):
+    pass
+
+
+def _config_fingerprint(config: Optional[Dict]) -> str:
+    # response_schema is a class; its name is enough to tell requests apart
+    return json.dumps(config or {}, sort_keys=True, default=lambda o: getattr(o, "__name__", str(o)))
+
+
+class GeminiBackend:
+    """
+    Live Gemini API. The client is created on first use so importing this module
+    (or running with another backend) needs neither the network nor a key.
+    """
+
+    def __init__(self, api_key: str, usage_callback: Optional[UsageCallback] = None):
+        self.api_key = api_key
+        self.usage_callback = usage_callback
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    def _report_usage(self, model: str, response):
+        usage = getattr(response, "usage_metadata", None)
+        if self.usage_callback and usage:
+            self.usage_callback(model, usage.prompt_token_count, usage.candidates_token_count)
+
+    def generate(self, model: str, prompt: str, config: Optional[Dict] = None) -> str:
+        response = self.client.models.generate_content(model=model, contents=[prompt], config=config)
+        self._report_usage(model, response)
+        return response.text
+
+    async def agenerate(self, model: str, prompt: str, config: Optional[Dict] = None) -> str:
+        response = await self.client.aio.models.generate_content(model=model, contents=[prompt], config=config)
+        self._report_usage(model, response)
+        return response.text
+
+
+def canned_response(prompt: str, config: Optional[Dict] = None) -> str:
+    """
+    A well-formed answer for every prompt this repo sends: schema-valid JSON for
+    structured requests, a JSON array for action lists, a rating JSON for the task1
+    classifier prompts and plain text otherwise. Deterministic in the prompt.
+    """
+    digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+    schema = (config or {}).get("response_schema")
+
+    if schema is not None and hasattr(schema, "model_fields"):
+        fields = {}
+        for name, field in schema.model_fields.items():
+            annotation = str(field.annotation)
+            if "List" in annotation or "list" in annotation:
+                fields[name] = [f"Stub {name.replace('_', ' ')} {i}" for i in (1, 2)]
+            elif "int" in annotation:
+                fields[name] = digest % 5 + 1
+            else:
+                fields[name] = f"Stub {name.replace('_', ' ')}."
+        return json.dumps(fields)
+    if "predicted_stars" in prompt:
+        return json.dumps({"predicted_stars": digest % 5 + 1, "explanation": "Stub prediction."})
+    if "JSON array" in prompt:
+        return json.dumps(["Stub action 1", "Stub action 2"])
+    return "Stub response."
+
+
+class StubBackend:
+    """
+    Offline stand-in for load tests: lognormal latency around `latency_ms`
+    (spread set by `latency_sigma`, 0 for a fixed delay), a random `error_rate`
+    and canned responses (see canned_response, or pass `responder`).
+    Pass `seed` for a reproducible latency/error sequence. Token usage is
+    reported as a rough 4-characters-per-token estimate.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        responder: Callable[[str, Optional[Dict]], str] = canned_response,
+        usage_callback: Optional[UsageCallback] = None
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.responder = responder
+        self.usage_callback = usage_callback
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        # One shared RNG; the lock keeps the sequence reproducible across threads
+        with self._lock:
+            latency = self.latency_ms * self._random.lognormvariate(0, self.latency_sigma) if self.latency_sigma else self.latency_ms
+            failed = self._random.random() < self.error_rate
+        return latency / 1000.0, failed
+
+    def _respond(self, model: str, prompt: str, config: Optional[Dict]) -> str:
+        text = self.responder(prompt, config)
+        if self.usage_callback:
+            self.usage_callback(model, len(prompt) // 4, len(text) // 4)
+        return text
+
+    def generate(self, model: str, prompt: str, config: Optional[Dict] = None) -> str:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        if failed:
+            raise LLMBackendError("Stub backend injected error")
+        return self._respond(model, prompt, config)
+
+    async def agenerate(self, model: str, prompt: str, config: Optional[Dict] = None) -> str:
+        delay, failed = self._draw()
+        await asyncio.sleep(delay)
+        if failed:
+            raise LLMBackendError("Stub backend injected error")
+        return self._respond(model, prompt, config)
+
+
+class RecordReplayBackend:
+    """
+    "record": forward to `inner` and append every response to a JSONL file.
+    "replay": answer only from that file (no network); unknown requests raise ReplayMiss.
+    Requests are keyed by model, prompt and generation config.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", inner=None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown record/replay mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("Record mode needs a backend to record from")
+        self.path = path
+        self.mode = mode
+        self.inner = inner
+        self._lock = threading.Lock()
+        self._recordings: Dict[str, str] = self._load()
+
+    def _load(self) -> Dict[str, str]:
+        recordings = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    recordings[entry["key"]] = entry["response"]
+        logger.info(f"📼 Loaded {len(recordings)} recorded LLM responses from {self.path}")
+        return recordings
+
+    def _key(self, model: str, prompt: str, config: Optional[Dict]) -> str:
+        return make_cache_key(model, prompt, _config_fingerprint(config))
+
+    def _lookup(self, key: str) -> str:
+        try:
+            return self._recordings[key]
+        except KeyError:
+            raise ReplayMiss("No recorded response for this request")
+
+    def _record(self, key: str, model: str, prompt: str, response: str):
+        line = json.dumps({"key": key, "model": model, "prompt": prompt, "response": response}, ensure_ascii=False)
+        with self._lock:
+            self._recordings[key] = response
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def generate(self, model: str, prompt: str, config: Optional[Dict] = None) -> str:
+        key = self._key(model, prompt, config)
+        if self.mode == "replay":
+            return self._lookup(key)
+        response = self.inner.generate(model, prompt, config)
+        if response:
+            self._record(key, model, prompt, response)
+        return response
+
+    async def agenerate(self, model: str, prompt: str, config: Optional[Dict] = None) -> str:
+        key = self._key(model, prompt, config)
+        if self.mode == "replay":
+            return self._lookup(key)
+        response = await self.inner.agenerate(model, prompt, config)
+        if response:
+            self._record(key, model, prompt, response)
+        return response
+
+
+def create_backend(
+    name: str,
+    api_key: str = "",
+    recording_path: str = "llm_recordings.jsonl",
+    usage_callback: Optional[UsageCallback] = None,
+    **stub_options: Any
+):
+    """
+    Build a backend by name: "gemini", "stub", "record" (Gemini, saving responses
+    to recording_path) or "replay" (responses from recording_path only)
+    """
+    if name == "gemini":
+        return GeminiBackend(api_key, usage_callback)
+    if name == "stub":
+        return StubBackend(usage_callback=usage_callback, **stub_options)
+    if name == "record":
+        return RecordReplayBackend(recording_path, mode="record", inner=GeminiBackend(api_key, usage_callback))
+    if name == "replay":
+        return RecordReplayBackend(recording_path, mode="replay")
+    raise ValueError(f"Unknown LLM backend: {name} (expected one of {', '.join(BACKENDS)})")
\ No newline at end of file
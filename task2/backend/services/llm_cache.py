@@ -0,0 +1,197 @@
+import hashlib
+import inspect
+import json
+import logging
+import re
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+# Kept free of config/database imports so the task1 notebook can reuse it
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w']+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse case, punctuation and whitespace so trivially different reviews
+    ("Great service!!", "great service") share a cache entry
+    """
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def make_cache_key(*parts: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class MongoCacheStore:
+    """Persistent cache tier on a Motor collection; expired entries are removed by a Mongo TTL index"""
+
+    is_async = True
+
+    def __init__(self, collection, ttl_seconds: int):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self._indexed = False
+
+    async def get(self, key: str) -> Optional[Any]:
+        # The TTL monitor only runs once a minute, so expiry is also checked on read
+        doc = await self.collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        return doc["value"] if doc else None
+
+    async def set(self, key: str, value: Any):
+        if not self._indexed:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {
+                "value": value,
+                "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+            }},
+            upsert=True
+        )
+
+
+class DiskCacheStore:
+    """Persistent cache tier backed by a local shelve file (for notebooks and scripts)"""
+
+    is_async = False
+
+    def __init__(self, path: str, ttl_seconds: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock, shelve.open(self.path) as db:
+            entry = db.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+        return None
+
+    def set(self, key: str, value: Any):
+        with self._lock, shelve.open(self.path) as db:
+            db[key] = (time.time() + self.ttl_seconds, value)
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM responses: an in-memory LRU with TTL in front of an
+    optional persistent store. Only successful responses are cached.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 86400, store=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return value
+
+    def _set_memory(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _has_sync_store(self) -> bool:
+        # Async stores can only be consulted from aget/aset
+        return self.store is not None and not getattr(self.store, "is_async", False)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+
+        if self._has_sync_store():
+            try:
+                value = self.store.get(key)
+            except Exception as e:
+                logger.error(f"LLM cache store read failed: {e}")
+                value = None
+            if value is not None:
+                self.persistent_hits += 1
+                self._set_memory(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        self._set_memory(key, value)
+        if self._has_sync_store():
+            try:
+                self.store.set(key, value)
+            except Exception as e:
+                logger.error(f"LLM cache store write failed: {e}")
+
+    async def aget(self, key: str) -> Optional[Any]:
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+
+        if self.store is not None:
+            try:
+                value = self.store.get(key)
+                if inspect.isawaitable(value):
+                    value = await value
+            except Exception as e:
+                logger.error(f"LLM cache store read failed: {e}")
+                value = None
+            if value is not None:
+                self.persistent_hits += 1
+                self._set_memory(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def aset(self, key: str, value: Any):
+        self._set_memory(key, value)
+        if self.store is not None:
+            try:
+                result = self.store.set(key, value)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"LLM cache store write failed: {e}")
+
+    def stats(self) -> Dict:
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent": self.store is not None
+        }
\ No newline at end of file
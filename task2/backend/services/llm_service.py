@@ -1,23 +1,134 @@
-from google import genai
+import asyncio
 import logging
 import json
-from typing import List, Optional
+from contextlib import contextmanager
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
 from config import settings
-import os
+from database import Database
+from models import ReviewEnrichment
+from services.llm_cache import LLMCache, MongoCacheStore, make_cache_key, normalize_text
+from services.llm_backends import create_backend
+from services.instrumentation import CLASSIFIER_ROUTED, LLM_IN_FLIGHT, LLM_REQUESTS, record_fallbacks, record_llm_usage, timed
+from services.resilience import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, ResilientCaller
 
-CLIENT = genai.Client(api_key=settings.gemini_api_key)
+if TYPE_CHECKING:
+    from services.rating_classifier import RatingClassifier
+
+MODEL_NAME = 'gemini-3-flash-preview'
+
+# Bump whenever a prompt template changes so stale cached responses are not reused
+PROMPT_VERSION = "v1"
 
 logger = logging.getLogger(__name__)
 
+
+def _create_llm_backend():
+    return create_backend(
+        settings.llm_backend,
+        api_key=settings.gemini_api_key,
+        recording_path=settings.llm_recording_path,
+        usage_callback=record_llm_usage,
+        latency_ms=settings.llm_stub_latency_ms,
+        latency_sigma=settings.llm_stub_latency_sigma,
+        error_rate=settings.llm_stub_error_rate,
+        seed=settings.llm_stub_seed
+    )
+
+
+def _create_llm_resilience() -> ResilientCaller:
+    limiter = AdaptiveLimiter(
+        "llm",
+        initial=settings.llm_max_concurrency,
+        min_limit=settings.llm_min_concurrency,
+        max_limit=settings.llm_max_concurrency
+    )
+    breaker = CircuitBreaker(
+        "llm",
+        failure_threshold=settings.llm_breaker_failure_threshold,
+        recovery_seconds=settings.llm_breaker_recovery_seconds
+    )
+    return ResilientCaller(
+        limiter,
+        breaker,
+        deadline_seconds=settings.llm_call_timeout_seconds,
+        queue_timeout_seconds=settings.llm_queue_timeout_seconds
+    )
+
+
+def _create_llm_cache() -> Optional[LLMCache]:
+    # Stub responses are synthetic and must not end up in a cache shared with real runs
+    if not settings.llm_cache_enabled or settings.llm_backend == "stub":
+        return None
+    
+    store = None
+    if settings.llm_cache_persistent:
+        store = MongoCacheStore(
+            Database.get_collection("llm_cache"),
+            ttl_seconds=settings.llm_cache_ttl_seconds
+        )
+    
+    return LLMCache(
+        max_entries=settings.llm_cache_max_entries,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        store=store
+    )
+
+
+def _load_rating_classifier() -> Optional["RatingClassifier"]:
+    if not settings.rating_classifier_path:
+        return None
+    try:
+        # Imported here so NumPy is only loaded when a classifier is configured
+        from services.rating_classifier import RatingClassifier
+        classifier = RatingClassifier.load(settings.rating_classifier_path)
+        logger.info(f"✅ Rating classifier loaded (version {classifier.version})")
+        return classifier
+    except Exception as e:
+        # The LLM path works without it, so a missing model only costs latency
+        logger.error(f"❌ Could not load rating classifier from {settings.rating_classifier_path}: {e}")
+        return None
+
+
+# Ratings grouped the way the fallback templates are: negative, neutral, positive
+SENTIMENT_BUCKETS = {1: "negative", 2: "negative", 3: "neutral", 4: "positive", 5: "positive"}
+
+
 class LLMService:
     def __init__(self):
         
-        self.model = CLIENT
-        logger.info("✅ Gemini API initialized")
+        # Adaptive cap on outstanding calls, per-call deadline and circuit breaker, so an
+        # upstream incident degrades to fallback content instead of piling up requests
+        self.resilience = _create_llm_resilience()
     
-    def generate_user_response(self, rating: int, review_text: str) -> str:
-
-        prompt = f"""You are a customer service AI. A customer just left a {rating}-star review.
+    # Backend, cache and classifier are built on first use (or in start()), in the
+    # process that serves requests, so importing this module opens no clients
+    @cached_property
+    def backend(self):
+        backend = _create_llm_backend()
+        logger.info(f"✅ LLM backend initialized ({settings.llm_backend})")
+        return backend
+    
+    @cached_property
+    def cache(self) -> Optional[LLMCache]:
+        return _create_llm_cache()
+    
+    @cached_property
+    def classifier(self) -> Optional["RatingClassifier"]:
+        return _load_rating_classifier()
+    
+    def start(self):
+        """
+        Build this process's clients up front so the first request doesn't pay for them
+        """
+        backend, cache, classifier = self.backend, self.cache, self.classifier
+        logger.info(
+            f"✅ LLM service ready ({type(backend).__name__}, "
+            f"cache {'on' if cache else 'off'}, classifier {classifier.version if classifier else 'off'})"
+        )
+    
+    def _user_response_prompt(self, rating: int, review_text: str) -> str:
+        return f"""You are a customer service AI. A customer just left a {rating}-star review.
 
 Review: "{review_text}"
 Rating: {rating} stars
@@ -33,22 +144,9 @@ The response should:
 Keep the response to 2-3 sentences maximum.
 
 Respond with ONLY the customer response text, no JSON, no additional formatting."""
-
-        try:
-            response = self.model.models.generate_content(
-                model='gemini-3-flash-preview',
-                contents=[
-                    prompt
-                ],
-            )
-            return response.text.strip()
-        except Exception as e:
-            logger.error(f"Error generating user response: {e}")
-            return self._get_fallback_user_response(rating)
     
-    def generate_admin_summary(self, rating: int, review_text: str) -> str:
-
-        prompt = f"""Analyze this customer review for internal reporting:
+    def _admin_summary_prompt(self, rating: int, review_text: str) -> str:
+        return f"""Analyze this customer review for internal reporting:
 
 Review: "{review_text}"
 Rating: {rating} stars
@@ -59,24 +157,9 @@ Provide a brief summary (1-2 sentences) highlighting:
 - Any critical issues or praise
 
 Respond with ONLY the summary text."""
-
-        try:
-            response = self.model.models.generate_content(
-                model='gemini-3-flash-preview',
-                contents=[
-                    prompt
-                ],
-            )
-            return response.text.strip()
-        except Exception as e:
-            logger.error(f"Error generating admin summary: {e}")
-            return f"Rating: {rating} stars - Unable to generate summary"
     
-    def generate_suggested_actions(self, rating: int, review_text: str) -> List[str]:
-        """
-        Generate suggested actions for the team
-        """
-        prompt = f"""Based on this review, suggest 2-3 specific actionable next steps for the team:
+    def _suggested_actions_prompt(self, rating: int, review_text: str) -> str:
+        return f"""Based on this review, suggest 2-3 specific actionable next steps for the team:
 
 Review: "{review_text}"
 Rating: {rating} stars
@@ -90,35 +173,314 @@ Respond with a JSON array of action items:
 ["action 1", "action 2", "action 3"]
 
 Respond ONLY with the JSON array, no additional text."""
+    
+    def _combined_prompt(self, rating: int, review_text: str) -> str:
+        return f"""You are a customer service AI. A customer just left a {rating}-star review.
+
+Review: "{review_text}"
+Rating: {rating} stars
 
+Produce the following fields:
+
+ai_response: A brief, professional, and empathetic response to the customer (2-3 sentences maximum).
+- Thank them for their feedback
+- Acknowledge their specific points (positive or negative)
+- For negative reviews (1-3 stars): Show empathy and willingness to improve
+- For positive reviews (4-5 stars): Express gratitude and encouragement
+
+ai_summary: A brief summary for internal reporting (1-2 sentences) highlighting the main sentiment, key points mentioned and any critical issues or praise.
+
+suggested_actions: 2-3 specific actionable next steps for the team.
+- For 1-2 stars: Immediate response, investigation, service recovery
+- For 3 stars: Follow-up, improvement opportunities
+- For 4-5 stars: Thank you, encourage repeat business, request testimonial"""
+    
+    def _parse_actions(self, actions_text: str) -> List[str]:
+        actions_text = actions_text.strip()
+        
+        # Try to extract JSON if wrapped in markdown
+        if "```json" in actions_text:
+            actions_text = actions_text.split("```json")[1].split("```")[0].strip()
+        elif "```" in actions_text:
+            actions_text = actions_text.split("```")[1].split("```")[0].strip()
+        
+        actions = json.loads(actions_text)
+        
+        if isinstance(actions, list):
+            return [str(action) for action in actions[:3]]  # Limit to 3 actions
+        return []
+    
+    def _build_prompt(self, kind: str, rating: int, review_text: str) -> str:
+        builders = {
+            "user_response": self._user_response_prompt,
+            "admin_summary": self._admin_summary_prompt,
+            "suggested_actions": self._suggested_actions_prompt,
+            "combined": self._combined_prompt,
+        }
+        return builders[kind](rating, review_text)
+    
+    def _cache_key(self, kind: str, rating: int, review_text: str) -> str:
+        return make_cache_key(PROMPT_VERSION, MODEL_NAME, kind, rating, normalize_text(review_text))
+    
+    def _parse_cached(self, kind: str, cached: Optional[str], parse: Callable[[str], Any]) -> Optional[Any]:
+        # An entry written before responses were validated may not parse; treat it as a miss
+        if cached is None:
+            return None
         try:
-            response = self.model.models.generate_content(
-                model='gemini-3-flash-preview',
-                contents=[
-                    prompt
-                ],
+            parsed = parse(cached)
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unparseable cached {kind} response: {e}")
+            return None
+        LLM_REQUESTS.labels(kind=kind, outcome="cache_hit").inc()
+        return parsed
+    
+    def _generate(self, kind: str, rating: int, review_text: str, parse: Callable[[str], Any] = str.strip) -> Any:
+        """
+        parse(response text); the text is only cached once parse accepts it, so a
+        malformed response is retried on the next call instead of replayed
+        """
+        cache_key = self._cache_key(kind, rating, review_text)
+        if self.cache:
+            parsed = self._parse_cached(kind, self.cache.get(cache_key), parse)
+            if parsed is not None:
+                return parsed
+        
+        with self._track(kind):
+            response_text = self.resilience.guard_sync(
+                lambda: self.backend.generate(MODEL_NAME, self._build_prompt(kind, rating, review_text))
             )
-            
-            # Parse JSON response
-            actions_text = response.text.strip()
-            
-            # Try to extract JSON if wrapped in markdown
-            if "```json" in actions_text:
-                actions_text = actions_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in actions_text:
-                actions_text = actions_text.split("```")[1].split("```")[0].strip()
-            
-            actions = json.loads(actions_text)
-            
-            if isinstance(actions, list) and len(actions) > 0:
-                return actions[:3]  # Limit to 3 actions
-            else:
-                return self._get_fallback_actions(rating)
-                
+        
+        parsed = parse(response_text)
+        if self.cache and response_text:
+            self.cache.set(cache_key, response_text)
+        return parsed
+    
+    async def _generate_async(
+        self,
+        kind: str,
+        rating: int,
+        review_text: str,
+        config: Optional[Dict] = None,
+        parse: Callable[[str], Any] = str.strip
+    ) -> Any:
+        """
+        Async _generate: parse(response text), cached only once parse accepts it
+        """
+        cache_key = self._cache_key(kind, rating, review_text)
+        if self.cache:
+            parsed = self._parse_cached(kind, await self.cache.aget(cache_key), parse)
+            if parsed is not None:
+                return parsed
+        
+        # Native async client: the request is awaited on the event loop instead of blocking it
+        with self._track(kind):
+            response_text = await self.resilience.call(lambda: self.backend.agenerate(
+                MODEL_NAME,
+                self._build_prompt(kind, rating, review_text),
+                config=config,
+            ))
+        
+        parsed = parse(response_text)
+        if self.cache and response_text:
+            await self.cache.aset(cache_key, response_text)
+        return parsed
+    
+    @contextmanager
+    def _track(self, kind: str):
+        LLM_IN_FLIGHT.inc()
+        try:
+            with timed(f"llm.{kind}"):
+                yield
+        except CircuitOpenError:
+            LLM_REQUESTS.labels(kind=kind, outcome="circuit_open").inc()
+            raise
+        except asyncio.TimeoutError:
+            LLM_REQUESTS.labels(kind=kind, outcome="timeout").inc()
+            raise
+        except Exception:
+            LLM_REQUESTS.labels(kind=kind, outcome="error").inc()
+            raise
+        else:
+            LLM_REQUESTS.labels(kind=kind, outcome="ok").inc()
+        finally:
+            LLM_IN_FLIGHT.dec()
+    
+    def generate_user_response(self, rating: int, review_text: str) -> str:
+
+        try:
+            return self._generate("user_response", rating, review_text)
+        except Exception as e:
+            logger.error(f"Error generating user response: {e}")
+            record_fallbacks(["ai_response"])
+            return self._get_fallback_user_response(rating)
+    
+    def generate_admin_summary(self, rating: int, review_text: str) -> str:
+
+        try:
+            return self._generate("admin_summary", rating, review_text)
+        except Exception as e:
+            logger.error(f"Error generating admin summary: {e}")
+            record_fallbacks(["ai_summary"])
+            return self._get_fallback_summary(rating)
+    
+    def generate_suggested_actions(self, rating: int, review_text: str) -> List[str]:
+        """
+        Generate suggested actions for the team
+        """
+        try:
+            actions = self._generate("suggested_actions", rating, review_text, parse=self._parse_actions)
+            return actions or self._get_fallback_actions(rating)
+        except Exception as e:
+            logger.error(f"Error generating suggested actions: {e}")
+            record_fallbacks(["suggested_actions"])
+            return self._get_fallback_actions(rating)
+    
+    async def generate_user_response_async(self, rating: int, review_text: str) -> str:
+
+        try:
+            return await self._generate_async("user_response", rating, review_text)
+        except Exception as e:
+            logger.error(f"Error generating user response: {e}")
+            record_fallbacks(["ai_response"])
+            return self._get_fallback_user_response(rating)
+    
+    async def generate_admin_summary_async(self, rating: int, review_text: str) -> str:
+
+        try:
+            return await self._generate_async("admin_summary", rating, review_text)
+        except Exception as e:
+            logger.error(f"Error generating admin summary: {e}")
+            record_fallbacks(["ai_summary"])
+            return self._get_fallback_summary(rating)
+    
+    async def generate_suggested_actions_async(self, rating: int, review_text: str) -> List[str]:
+
+        try:
+            actions = await self._generate_async("suggested_actions", rating, review_text, parse=self._parse_actions)
+            return actions or self._get_fallback_actions(rating)
         except Exception as e:
             logger.error(f"Error generating suggested actions: {e}")
+            record_fallbacks(["suggested_actions"])
             return self._get_fallback_actions(rating)
     
+    async def generate_combined_content(self, rating: int, review_text: str) -> Dict:
+        """
+        Generate the user reply, admin summary and suggested actions in one schema-constrained request
+        """
+        try:
+            enrichment = await self._generate_async(
+                "combined", rating, review_text,
+                config={
+                    "response_mime_type": "application/json",
+                    "response_schema": ReviewEnrichment,
+                },
+                parse=ReviewEnrichment.model_validate_json,
+            )
+        except Exception as e:
+            logger.error(f"Error generating combined review content: {e}")
+            enrichment = ReviewEnrichment()
+        
+        return self._apply_fallbacks(rating, enrichment)
+    
+    async def generate_review_content(self, rating: int, review_text: str, classify: bool = True) -> Dict:
+        """
+        Generate the user reply, admin summary and suggested actions; `classify=False`
+        when the caller already ran templated_contents on this review
+        """
+        if classify:
+            templated = self.templated_contents([(rating, review_text)])[0]
+            if templated is not None:
+                return templated
+        
+        if settings.llm_generation_mode == "combined":
+            return await self.generate_combined_content(rating, review_text)
+        
+        return await self.generate_parallel_content(rating, review_text)
+    
+    async def generate_parallel_content(self, rating: int, review_text: str) -> Dict:
+        """
+        Generate the user reply, admin summary and suggested actions as three concurrent requests
+        """
+        results = await asyncio.gather(
+            self._generate_async("user_response", rating, review_text),
+            self._generate_async("admin_summary", rating, review_text),
+            self._generate_async("suggested_actions", rating, review_text, parse=self._parse_actions),
+            return_exceptions=True,
+        )
+        response_text, summary_text, suggested_actions = [
+            None if isinstance(result, Exception) else result for result in results
+        ]
+        for name, result in zip(("user response", "admin summary", "suggested actions"), results):
+            if isinstance(result, Exception):
+                logger.error(f"Error generating {name}: {result}")
+        
+        return self._apply_fallbacks(rating, ReviewEnrichment(
+            ai_response=response_text,
+            ai_summary=summary_text,
+            suggested_actions=suggested_actions,
+        ))
+    
+    def templated_contents(self, items: Sequence[Tuple[int, str]]) -> List[Optional[Dict]]:
+        """
+        Templated content for each (rating, review_text) whose text the local classifier
+        confidently places in the rating's sentiment, None where the LLM is still needed.
+        Scores the whole list in one pass.
+        """
+        if self.classifier is None or not items:
+            return [None] * len(items)
+        
+        with timed("classifier.predict"):
+            probabilities = self.classifier.predict_proba([review_text for _, review_text in items])
+        
+        contents = []
+        for (rating, review_text), row in zip(items, probabilities):
+            sentiment = SENTIMENT_BUCKETS[rating]
+            confidence = sum(p for stars, p in enumerate(row, start=1) if SENTIMENT_BUCKETS[stars] == sentiment)
+            if confidence < settings.rating_classifier_threshold:
+                contents.append(None)
+                continue
+            CLASSIFIER_ROUTED.labels(sentiment=sentiment).inc()
+            contents.append({
+                "ai_response": self._get_fallback_user_response(rating),
+                "ai_summary": self._get_templated_summary(rating, sentiment, review_text),
+                "suggested_actions": self._get_fallback_actions(rating),
+                "fallback_fields": []
+            })
+        return contents
+    
+    def _apply_fallbacks(self, rating: int, enrichment: ReviewEnrichment) -> Dict:
+        # Each field falls back on its own, so one missing field doesn't discard the others
+        ai_response = (enrichment.ai_response or "").strip()
+        ai_summary = (enrichment.ai_summary or "").strip()
+        suggested_actions = [a.strip() for a in (enrichment.suggested_actions or []) if a and a.strip()]
+        
+        fallback_fields = [
+            name for name, value in (
+                ("ai_response", ai_response),
+                ("ai_summary", ai_summary),
+                ("suggested_actions", suggested_actions),
+            ) if not value
+        ]
+        record_fallbacks(fallback_fields)
+        
+        return {
+            "ai_response": ai_response or self._get_fallback_user_response(rating),
+            "ai_summary": ai_summary or self._get_fallback_summary(rating),
+            "suggested_actions": suggested_actions[:3] or self._get_fallback_actions(rating),
+            "fallback_fields": fallback_fields
+        }
+    
+    @property
+    def is_healthy(self) -> bool:
+        """
+        False while the circuit breaker is open or probing
+        """
+        return self.resilience.breaker.is_closed
+    
+    @property
+    def is_cooling_down(self) -> bool:
+        return self.resilience.breaker.is_cooling_down
+    
     def _get_fallback_user_response(self, rating: int) -> str:
         if rating <= 2:
             return "Thank you for your feedback. We're sorry to hear about your experience and will work to improve. Please contact us directly so we can make this right."
@@ -127,6 +489,15 @@ Respond ONLY with the JSON array, no additional text."""
         else:
             return "Thank you for your wonderful feedback! We're thrilled you had a great experience and look forward to serving you again."
     
+    def _get_fallback_summary(self, rating: int) -> str:
+        return f"Rating: {rating} stars - Unable to generate summary"
+    
+    def _get_templated_summary(self, rating: int, sentiment: str, review_text: str) -> str:
+        excerpt = " ".join(review_text.split())
+        if len(excerpt) > 120:
+            excerpt = excerpt[:117].rstrip() + "..."
+        return f"Routine {sentiment} {rating}-star review: \"{excerpt}\""
+    
     def _get_fallback_actions(self, rating: int) -> List[str]:
         if rating <= 2:
             return [
@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Tuple
+from bson import ObjectId
+
+# Newest first; _id breaks ties between reviews with the same timestamp
+REVIEW_SORT = [("timestamp", -1), ("_id", -1)]
+
+# Search results: most relevant first, same tie-break
+SEARCH_SORT = [("score", -1), ("_id", -1)]
+
+
+def encode_cursor(timestamp: datetime, doc_id: ObjectId) -> str:
+    payload = json.dumps({"t": timestamp.isoformat(), "id": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def encode_score_cursor(score: float, doc_id: ObjectId) -> str:
+    payload = json.dumps({"s": score, "id": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_score_cursor(cursor: str) -> Tuple[float, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(payload["s"]), ObjectId(payload["id"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset_filter(timestamp: datetime, doc_id: ObjectId) -> Dict:
+    """
+    Match documents strictly after (timestamp, _id) in REVIEW_SORT order, so the
+    next page is an index seek instead of a skip over every earlier row
+    """
+    return {
+        "$or": [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$lt": doc_id}}
+        ]
+    }
+
+def score_keyset_filter(score: float, doc_id: ObjectId) -> Dict:
+    """
+    Match search results strictly after (score, _id) in SEARCH_SORT order
+    """
+    return {
+        "$or": [
+            {"score": {"$lt": score}},
+            {"score": score, "_id": {"$lt": doc_id}}
+        ]
+    }
\ No newline at end of file
@@ -0,0 +1,123 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from fastapi import Request
+from pymongo import ReturnDocument
+from config import settings
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBucketStore:
+    """
+    Token buckets in this process. With several workers each one keeps its own
+    buckets, so a client can get up to workers x the configured rate.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        # Least recently seen clients go first; a forgotten bucket just starts full again
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class MongoBucketStore:
+    """
+    Token buckets shared by all workers: one document per client and rule, refilled
+    and debited in a single pipeline update on the server's clock. Idle buckets
+    expire (TTL index) once they would be full again.
+    """
+
+    @property
+    def collection(self):
+        return Database.get_collection("rate_limits")
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        doc = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": {"$min": [capacity, {"$add": [
+                    {"$ifNull": ["$tokens", capacity]},
+                    {"$multiply": [rate / 1000, {"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}]}
+                ]}]}}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "updated_at": "$$NOW",
+                    "expires_at": {"$add": ["$$NOW", int(capacity / rate * 1000)]},
+                }},
+                {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return 0.0 if doc["allowed"] else (1 - doc["tokens"]) / rate
+
+
+class RateLimiter:
+    """
+    Per-client token buckets, checked by the HTTP middleware before routing.
+    Submissions (each one costs LLM calls) get their own, much smaller bucket.
+    """
+
+    def __init__(self, store, rules: Dict[str, Tuple[float, float]]):
+        self.store = store
+        self.rules = rules  # rule name -> (tokens per second, burst)
+
+    def rule_for(self, request: Request) -> Optional[str]:
+        path = request.url.path
+        if request.method == "POST" and path in ("/api/reviews/submit", "/api/reviews/batch"):
+            return "submit"
+        if path.startswith("/api/"):
+            return "api"
+        return None
+
+    def client_key(self, request: Request) -> str:
+        # Clients can put anything in X-Forwarded-For; only the entries our own proxies
+        # appended (the last `rate_limit_trusted_proxies` of them) can be believed
+        hops = settings.rate_limit_trusted_proxies
+        if hops > 0:
+            forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",") if entry.strip()]
+            if len(forwarded) >= hops:
+                return forwarded[-hops]
+        return request.client.host if request.client else "unknown"
+
+    async def check(self, request: Request) -> Tuple[Optional[str], float]:
+        """
+        The matched rule and how many seconds the client must wait (0 when allowed)
+        """
+        rule = self.rule_for(request)
+        if rule is None:
+            return None, 0.0
+        rate, burst = self.rules[rule]
+        try:
+            return rule, await self.store.take(f"{rule}:{self.client_key(request)}", rate, burst)
+        except Exception as e:
+            # Fail open: a store outage must not take the API down with it
+            logger.error(f"❌ Rate limit check failed: {e}")
+            return rule, 0.0
+
+
+def _create_rate_limiter() -> RateLimiter:
+    store = MongoBucketStore() if settings.rate_limit_store == "mongo" else MemoryBucketStore()
+    return RateLimiter(store, {
+        "submit": (settings.rate_limit_submit_per_minute / 60, settings.rate_limit_submit_burst),
+        "api": (settings.rate_limit_api_per_minute / 60, settings.rate_limit_api_burst),
+    })
+
+# Create singleton instance
+rate_limiter = _create_rate_limiter()
\ No newline at end of file
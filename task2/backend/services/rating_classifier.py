@@ -0,0 +1,233 @@
+"""
+Local star-rating classifier: hashed unigram + bigram features and a softmax
+(multinomial logistic regression) layer, in NumPy only.
+
+Train on the Yelp CSV (columns `text` and `stars`) from task2/backend:
+
+    python -m services.rating_classifier ../../yelp.csv --out rating_classifier.npz
+
+then point RATING_CLASSIFIER_PATH at the file. Scoring is one sparse-dense
+product per batch, so hundreds of reviews take milliseconds.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.llm_cache import normalize_text
+
+# Kept free of config/database imports so the task1 notebook can train and score with it
+
+logger = logging.getLogger(__name__)
+
+STARS = np.arange(1, 6)
+DEFAULT_FEATURES = 2 ** 18
+
+
+def _tokens(text: str) -> List[str]:
+    words = normalize_text(text).split()
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def featurize(texts: Sequence[str], n_features: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hash texts into a sparse matrix in COO form (rows, cols, values): log-scaled
+    term counts, L2-normalized per row. crc32 keeps bucket ids stable across processes.
+    """
+    rows, cols, values = [], [], []
+    for row, text in enumerate(texts):
+        counts: Dict[int, int] = {}
+        for token in _tokens(text or ""):
+            bucket = zlib.crc32(token.encode("utf-8")) % n_features
+            counts[bucket] = counts.get(bucket, 0) + 1
+        if not counts:
+            continue
+        weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        rows.append(np.full(len(counts), row, dtype=np.int32))
+        cols.append(np.fromiter(counts.keys(), dtype=np.int64, count=len(counts)))
+        values.append(weights / np.linalg.norm(weights))
+    if not rows:
+        return np.empty(0, np.int32), np.empty(0, np.int64), np.empty(0, np.float32)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+
+
+class RatingClassifier:
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, metadata: Optional[Dict] = None):
+        self.weights = weights  # (n_features, 5)
+        self.bias = bias  # (5,)
+        self.metadata = metadata or {}
+        self.version = hashlib.sha256(weights.tobytes() + bias.tobytes()).hexdigest()[:12]
+
+    @property
+    def n_features(self) -> int:
+        return self.weights.shape[0]
+
+    @staticmethod
+    def _logits(weights, bias, features, n_rows: int) -> np.ndarray:
+        rows, cols, values = features
+        contributions = weights[cols] * values[:, None]
+        logits = np.tile(bias, (n_rows, 1))
+        np.add.at(logits, rows, contributions)
+        return logits
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        (len(texts), 5) probabilities of 1..5 stars
+        """
+        features = featurize(texts, self.n_features)
+        return self._softmax(self._logits(self.weights, self.bias, features, len(texts)))
+
+    def predict(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predicted stars and the probability of that prediction, per text
+        """
+        probabilities = self.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        return STARS[best], probabilities[np.arange(len(best)), best]
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        stars: Sequence[int],
+        n_features: int = DEFAULT_FEATURES,
+        epochs: int = 8,
+        batch_size: int = 256,
+        learning_rate: float = 0.02,
+        l2: float = 1e-6,
+        seed: int = 42
+    ) -> "RatingClassifier":
+        """
+        Mini-batch Adam on the softmax cross-entropy
+        """
+        rng = np.random.default_rng(seed)
+        labels = np.asarray(stars, dtype=np.int64) - 1
+        targets = np.eye(len(STARS), dtype=np.float32)[labels]
+        weights = np.zeros((n_features, len(STARS)), dtype=np.float32)
+        bias = np.log(np.bincount(labels, minlength=len(STARS)) + 1.0).astype(np.float32)
+        moments = [np.zeros_like(weights), np.zeros_like(weights)]
+        beta1, beta2, eps, step = 0.9, 0.999, 1e-8, 0
+
+        # Hash every text once; batches slice the precomputed rows
+        rows, cols, values = featurize(texts, n_features)
+        row_starts = np.searchsorted(rows, np.arange(len(texts) + 1))
+
+        started = time.perf_counter()
+        for epoch in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                spans = [np.arange(row_starts[i], row_starts[i + 1]) for i in batch]
+                index = np.concatenate(spans)
+                batch_rows = np.repeat(np.arange(len(batch)), [len(span) for span in spans])
+                features = (batch_rows, cols[index], values[index])
+
+                probabilities = cls._softmax(cls._logits(weights, bias, features, len(batch)))
+                error = (probabilities - targets[batch]) / len(batch)
+
+                # Gradient only touches the hashed buckets present in the batch
+                touched, inverse = np.unique(features[1], return_inverse=True)
+                gradient = np.zeros((len(touched), len(STARS)), dtype=np.float32)
+                np.add.at(gradient, inverse, features[2][:, None] * error[batch_rows])
+                gradient += l2 * weights[touched]
+                bias -= learning_rate * error.sum(axis=0)
+
+                step += 1
+                first, second = moments[0][touched], moments[1][touched]
+                first = beta1 * first + (1 - beta1) * gradient
+                second = beta2 * second + (1 - beta2) * gradient ** 2
+                moments[0][touched], moments[1][touched] = first, second
+                corrected = learning_rate * np.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+                weights[touched] -= corrected * first / (np.sqrt(second) + eps)
+            logger.info(f"Epoch {epoch + 1}/{epochs} done ({time.perf_counter() - started:.1f}s)")
+
+        return cls(weights, bias, {
+            "trained_at": datetime.utcnow().isoformat(),
+            "samples": len(texts),
+            "epochs": epochs,
+        })
+
+    def save(self, path: str):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, metadata=json.dumps(self.metadata))
+
+    @classmethod
+    def load(cls, path: str) -> "RatingClassifier":
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], json.loads(str(data["metadata"])))
+
+
+def confusion_matrix(actual: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+    matrix = np.zeros((len(STARS), len(STARS)), dtype=np.int64)
+    np.add.at(matrix, (actual - 1, predicted - 1), 1)
+    return matrix
+
+
+def load_csv(path: str, text_column: str = "text", stars_column: str = "stars") -> Tuple[List[str], np.ndarray]:
+    texts, stars = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            texts.append(row[text_column])
+            stars.append(int(float(row[stars_column])))
+    return texts, np.asarray(stars)
+
+
+def main(args):
+    texts, stars = load_csv(args.csv, args.text_column, args.stars_column)
+    order = np.random.default_rng(args.seed).permutation(len(texts))
+    holdout = order[:int(len(order) * args.holdout)]
+    train = order[len(holdout):]
+
+    classifier = RatingClassifier.train(
+        [texts[i] for i in train], stars[train],
+        n_features=args.features, epochs=args.epochs, seed=args.seed
+    )
+
+    started = time.perf_counter()
+    predicted, confidence = classifier.predict([texts[i] for i in holdout])
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    actual = stars[holdout]
+
+    classifier.metadata.update({
+        "source": args.csv,
+        "holdout_samples": len(holdout),
+        "holdout_accuracy": round(float((predicted == actual).mean()), 4),
+    })
+    print(f"Holdout accuracy: {classifier.metadata['holdout_accuracy']:.2%} on {len(holdout)} reviews "
+          f"(scored in {elapsed_ms:.1f} ms)")
+    print("Confusion matrix (rows: actual 1-5, columns: predicted 1-5):")
+    print(confusion_matrix(actual, predicted))
+    for threshold in (0.5, 0.7, 0.9):
+        confident = confidence >= threshold
+        if confident.any():
+            print(f"  confidence >= {threshold}: {confident.mean():.1%} of reviews, "
+                  f"{(predicted[confident] == actual[confident]).mean():.2%} accurate")
+
+    classifier.save(args.out)
+    print(f"Saved {args.out} (version {classifier.version})")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", help="CSV with review text and star columns (the task1 yelp.csv)")
+    parser.add_argument("--out", default="rating_classifier.npz")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--stars-column", default="stars")
+    parser.add_argument("--features", type=int, default=DEFAULT_FEATURES, help="hash buckets")
+    parser.add_argument("--epochs", type=int, default=8)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction kept out of training for the report")
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
\ No newline at end of file
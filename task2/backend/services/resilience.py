@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, TypeVar
+from services.instrumentation import CIRCUIT_STATE, CONCURRENCY_LIMIT, timed
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open"""
+    pass
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on outstanding calls: each success raises the limit by 1/limit
+    (about +1 per window of calls), a timeout or upstream error halves it.
+    Calls already in flight when the limit was last cut belong to that same
+    congestion event, so their failures don't cut it again.
+    Callers over the limit wait in FIFO order.
+    """
+
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int, decrease_factor: float = 0.5):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._decreased_at = float("-inf")
+        self._waiters: deque = deque()
+        CONCURRENCY_LIMIT.labels(name=name).set(self.limit)
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Gave up (deadline) after being handed a slot: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def on_success(self):
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        CONCURRENCY_LIMIT.labels(name=self.name).set(self.limit)
+        self._wake()
+
+    def on_overload(self, started_at: float):
+        """
+        A call that started at `started_at` (time.monotonic()) failed
+        """
+        if started_at < self._decreased_at:
+            return
+        self._decreased_at = time.monotonic()
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        CONCURRENCY_LIMIT.labels(name=self.name).set(self.limit)
+
+
+class CircuitBreaker:
+    """
+    closed: calls pass; `failure_threshold` consecutive failures open the circuit.
+    open: calls are refused until `recovery_seconds` have passed.
+    half_open: a single probe call is let through; success closes, failure reopens.
+    """
+    STATES = {"closed": 0, "open": 1, "half_open": 2}
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._set_state("closed")
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning(f"⚡ Circuit '{self.name}' {self.state} -> {state}")
+        self.state = state
+        CIRCUIT_STATE.labels(name=self.name).set(self.STATES[state])
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == "closed"
+
+    @property
+    def is_cooling_down(self) -> bool:
+        """
+        Open and not yet due for a probe: calls now are refused without trying
+        """
+        return self.state == "open" and time.monotonic() - self._opened_at < self.recovery_seconds
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.recovery_seconds:
+            self._set_state("half_open")
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        self._set_state("closed")
+
+    def cancel_probe(self):
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+            self._set_state("open")
+
+
+class ResilientCaller:
+    """
+    Guards calls to a flaky upstream: circuit breaker first, then the adaptive
+    limiter, then a deadline on the call itself. Waiting for a slot has its own
+    bound and never counts against upstream, so a shrunken limit can't feed on
+    the queueing it causes. Every failure surfaces quickly as an exception for
+    the caller to fall back on.
+    """
+
+    def __init__(self, limiter: AdaptiveLimiter, breaker: CircuitBreaker, deadline_seconds: float, queue_timeout_seconds: float):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.deadline_seconds = deadline_seconds
+        self.queue_timeout_seconds = queue_timeout_seconds
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit '{self.breaker.name}' is open")
+
+        try:
+            with timed(f"{self.limiter.name}.queue"):
+                await asyncio.wait_for(self.limiter.acquire(), timeout=self.queue_timeout_seconds)
+        except BaseException:
+            self.breaker.cancel_probe()
+            raise
+
+        started_at = time.monotonic()
+        try:
+            result = await asyncio.wait_for(fn(), timeout=self.deadline_seconds)
+        except asyncio.CancelledError:
+            # Our caller went away; not an upstream verdict
+            self.breaker.cancel_probe()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            self.limiter.on_overload(started_at)
+            raise
+        finally:
+            self.limiter.release()
+
+        self.breaker.record_success()
+        self.limiter.on_success()
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "waiting": len(self.limiter._waiters),
+            "deadline_seconds": self.deadline_seconds,
+            "queue_timeout_seconds": self.queue_timeout_seconds,
+        }
+
+    def guard_sync(self, fn: Callable[[], T]) -> T:
+        """
+        Breaker only, for blocking calls that cannot be given a deadline
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit '{self.breaker.name}' is open")
+        try:
+            result = fn()
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
\ No newline at end of file
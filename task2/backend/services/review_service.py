@@ -1,27 +1,100 @@
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict, Set, Tuple
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+import asyncio
+import json
 import logging
-from database import get_reviews_collection
-from services.llm_service import llm_service
+from config import settings
+from database import get_archive_collection, get_reviews_collection
+from services.llm_service import LLMService, llm_service
+from services.enrichment_queue import enrichment_queue, EnrichmentJob, EnrichmentQueue, EnrichmentQueueFull
+from services.coalescing_cache import CoalescingCache
+from services.stats_rollup import StatsRollup, stats_rollup
+from services.pagination import (
+    REVIEW_SORT,
+    SEARCH_SORT,
+    decode_cursor,
+    decode_score_cursor,
+    encode_cursor,
+    encode_score_cursor,
+    keyset_filter,
+    score_keyset_filter
+)
+from services.live_feed import LiveFeed, live_feed, to_feed_review
+from services.instrumentation import timed
+from services.dedup_index import DedupIndex, DuplicateMatch, dedup_index, from_int64, simhash, to_int64
+from services.search_index import InvertedIndex
 
 logger = logging.getLogger(__name__)
 
+# Fields a list request may select; the card view drops the customer-facing reply
+LIST_FIELDS = [
+    "timestamp", "rating", "review_text", "ai_response", "ai_summary", "suggested_actions", "enrichment_status",
+    "duplicate_of", "duplicate_count"
+]
+SUMMARY_FIELDS = [
+    "timestamp", "rating", "review_text", "ai_summary", "suggested_actions", "enrichment_status", "duplicate_count"
+]
+
+def fallback_marker(ai_content: Dict) -> Dict:
+    # Reviews stored with fallback content are picked up again by the fallback sweeper
+    return {
+        "ai_fallback": bool(ai_content["fallback_fields"]),
+        "fallback_fields": ai_content["fallback_fields"],
+    }
+
 class ReviewService:
-    def __init__(self):
-        self.collection = get_reviews_collection()
+    def __init__(
+        self,
+        llm_service: LLMService,
+        enrichment_queue: EnrichmentQueue,
+        stats_rollup: StatsRollup,
+        live_feed: LiveFeed,
+        dedup_index: DedupIndex
+    ):
+        # Collaborators are passed in so tests can build a service on fakes
+        self.llm_service = llm_service
+        self.enrichment_queue = enrichment_queue
+        self.stats_rollup = stats_rollup
+        self.live_feed = live_feed
+        self.dedup_index = dedup_index
+        self._stats_cache = CoalescingCache(ttl_seconds=settings.stats_cache_ttl_seconds)
+        self._version_cache = CoalescingCache(ttl_seconds=settings.http_cache_version_ttl_seconds)
+        self._archive_counts = CoalescingCache(ttl_seconds=settings.archive_count_ttl_seconds)
+        self._archive_counts_version = None
+        self.search_index = InvertedIndex() if settings.search_backend == "memory" else None
+    
+    @property
+    def collection(self):
+        # Looked up on use so that importing the singleton opens no connection
+        return get_reviews_collection()
     
-    async def create_review(self, rating: int, review_text: str) -> Dict:
+    @property
+    def archive_collection(self):
+        # Cold tier: every archived review is older than every review left in `reviews`
+        return get_archive_collection()
+    
+    async def create_review(self, rating: int, review_text: str, client: Optional[str] = None) -> Dict:
+        
+        # Raises DuplicateFlood before any LLM or database work
+        fingerprint, match = self._find_duplicate(review_text, client)
+        reused = await self._reusable_content(match, rating)
+        
+        if settings.enrichment_mode == "background" and reused is None:
+            return await self._create_review_background(rating, review_text, fingerprint, match)
         
         try:
             
-            logger.info(f"Generating AI responses for {rating}-star review")
-            
-            ai_response = llm_service.generate_user_response(rating, review_text)
-            
-            ai_summary = llm_service.generate_admin_summary(rating, review_text)
-            
-            suggested_actions = llm_service.generate_suggested_actions(rating, review_text)
+            if reused is not None:
+                logger.info(f"♻️ Reusing AI content of near-duplicate review {match.review_id}")
+                ai_content = reused
+            else:
+                logger.info(f"Generating AI responses for {rating}-star review")
+                # The three generations run concurrently on the async client
+                ai_content = await self.llm_service.generate_review_content(rating, review_text)
+            ai_response = ai_content["ai_response"]
             
             # Create document
             review_doc = {
@@ -29,125 +102,1000 @@ class ReviewService:
                 "rating": rating,
                 "review_text": review_text,
                 "ai_response": ai_response,
-                "ai_summary": ai_summary,
-                "suggested_actions": suggested_actions,
+                "ai_summary": ai_content["ai_summary"],
+                "suggested_actions": ai_content["suggested_actions"],
+                "enrichment_status": "completed",
+                **fallback_marker(ai_content),
+                **self._dedup_fields(fingerprint, match),
             }
             
             # Insert into database
-            result = self.collection.insert_one(review_doc)
+            with timed("mongo.insert_one"):
+                result = await self.collection.insert_one(review_doc)
+            await self._index_review(result.inserted_id, fingerprint, match)
+            await self._record_stats([(rating, review_doc["timestamp"])])
+            self.live_feed.review_created(to_feed_review(review_doc))
+            self._index_for_search(review_doc)
             
             logger.info(f"✅ Review created with ID: {result.inserted_id}")
             
             return {
                 "submission_id": str(result.inserted_id),
-                "ai_response": ai_response
+                "ai_response": ai_response,
+                "enrichment_status": "completed"
             }
             
         except Exception as e:
             logger.error(f"❌ Error creating review: {e}")
             raise Exception(f"Failed to create review: {str(e)}")
     
-    def get_all_reviews(
+    async def _create_review_background(
+        self, rating: int, review_text: str, fingerprint: Optional[int], match: Optional[DuplicateMatch]
+    ) -> Dict:
+        
+        # Reject before inserting so a full queue never leaves orphaned pending reviews
+        if self.enrichment_queue.is_full():
+            raise EnrichmentQueueFull("Too many reviews awaiting processing, please retry shortly")
+        
+        try:
+            review_doc = {
+                "timestamp": datetime.utcnow(),
+                "rating": rating,
+                "review_text": review_text,
+                "ai_response": None,
+                "ai_summary": None,
+                "suggested_actions": [],
+                "enrichment_status": "pending",
+                **self._dedup_fields(fingerprint, match),
+            }
+            
+            with timed("mongo.insert_one"):
+                result = await self.collection.insert_one(review_doc)
+            submission_id = str(result.inserted_id)
+            await self._index_review(result.inserted_id, fingerprint, match)
+            await self._record_stats([(rating, review_doc["timestamp"])])
+            self.live_feed.review_created(to_feed_review(review_doc))
+            self._index_for_search(review_doc)
+            
+            logger.info(f"✅ Review created with ID: {submission_id} (enrichment pending)")
+            
+            future = self.enrichment_queue.enqueue(submission_id, rating, review_text)
+            
+        except EnrichmentQueueFull:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error creating review: {e}")
+            raise Exception(f"Failed to create review: {str(e)}")
+        
+        # Give the workers a short window to produce the user reply; after that the
+        # client polls the status endpoint instead of holding the request open
+        try:
+            ai_content = await asyncio.wait_for(
+                asyncio.shield(future),
+                timeout=settings.enrichment_reply_wait_seconds
+            )
+        except asyncio.TimeoutError:
+            ai_content = None
+        
+        if ai_content is None:
+            return {
+                "submission_id": submission_id,
+                "ai_response": None,
+                "enrichment_status": "pending"
+            }
+        
+        return {
+            "submission_id": submission_id,
+            "ai_response": ai_content["ai_response"],
+            "enrichment_status": "completed"
+        }
+    
+    def _find_duplicate(
+        self, review_text: str, client: Optional[str] = None
+    ) -> Tuple[Optional[int], Optional[DuplicateMatch]]:
+        if not settings.dedup_enabled:
+            return None, None
+        fingerprint = simhash(review_text)
+        match = self.dedup_index.find(fingerprint)
+        # Floods are counted per submitting client; callers without one (imports) aren't limited
+        if match is not None and client is not None:
+            self.dedup_index.check_flood(match, client)
+        return fingerprint, match
+    
+    async def _reusable_content(self, match: Optional[DuplicateMatch], rating: int) -> Optional[Dict]:
+        """
+        AI fields of the matched review, when it has the same rating and real (not fallback) content
+        """
+        if match is None or not settings.dedup_reuse_enrichment:
+            return None
+        with timed("mongo.find_one"):
+            doc = await self.collection.find_one(
+                {
+                    "_id": match.review_id,
+                    "rating": rating,
+                    "enrichment_status": {"$ne": "pending"},
+                    "ai_fallback": {"$ne": True}
+                },
+                {"ai_response": 1, "ai_summary": 1, "suggested_actions": 1}
+            )
+        if not doc or not doc.get("ai_response"):
+            return None
+        return {
+            "ai_response": doc["ai_response"],
+            "ai_summary": doc.get("ai_summary"),
+            "suggested_actions": doc.get("suggested_actions") or [],
+            "fallback_fields": []
+        }
+    
+    def _dedup_fields(self, fingerprint: Optional[int], match: Optional[DuplicateMatch]) -> Dict:
+        if fingerprint is None:
+            return {}
+        fields = {"simhash": to_int64(fingerprint)}
+        if match is not None:
+            fields["cluster_id"] = match.cluster_id
+            fields["duplicate_of"] = match.review_id
+        return fields
+    
+    async def _index_review(self, review_id: ObjectId, fingerprint: Optional[int], match: Optional[DuplicateMatch]):
+        if fingerprint is None:
+            return
+        self.dedup_index.add(review_id, fingerprint, match.cluster_id if match else None)
+        if match is not None:
+            # Collapsed listings show the cluster root with its duplicate count. The root
+            # is the oldest review in its cluster, so it may already have been archived.
+            try:
+                with timed("mongo.update_one"):
+                    result = await self.collection.update_one({"_id": match.cluster_id}, {"$inc": {"duplicate_count": 1}})
+                    if not result.matched_count:
+                        await self.archive_collection.update_one({"_id": match.cluster_id}, {"$inc": {"duplicate_count": 1}})
+            except Exception as e:
+                logger.error(f"❌ Failed to update duplicate count: {e}")
+    
+    async def warm_dedup_index(self) -> int:
+        """
+        Load stored fingerprints into the in-memory index, oldest first so cluster roots
+        come before their duplicates. Reviews stored without one are fingerprinted and
+        backfilled on the way. Archived reviews are not loaded; hot duplicates keep the
+        cluster_id of an archived root, and _index_review counts them on it there.
+        """
+        if not settings.dedup_enabled:
+            return 0
+        started = datetime.utcnow()
+        
+        try:
+            cursor = self.collection.find(
+                {"simhash": {"$exists": True}},
+                {"simhash": 1, "cluster_id": 1}
+            ).sort("_id", 1).batch_size(settings.export_batch_size)
+            async for doc in cursor:
+                self.dedup_index.add(doc["_id"], from_int64(doc["simhash"]), doc.get("cluster_id"))
+            
+            backfilled = 0
+            cursor = self.collection.find(
+                {"simhash": {"$exists": False}},
+                {"review_text": 1}
+            ).sort("_id", 1).batch_size(settings.export_batch_size)
+            updates = []
+            async for doc in cursor:
+                fingerprint = simhash(doc.get("review_text") or "")
+                self.dedup_index.add(doc["_id"], fingerprint)
+                updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"simhash": to_int64(fingerprint)}}))
+                if len(updates) % 100 == 0:
+                    await asyncio.sleep(0)  # fingerprinting is CPU work; let requests in
+                if len(updates) >= settings.export_batch_size:
+                    await self.collection.bulk_write(updates, ordered=False)
+                    backfilled += len(updates)
+                    updates = []
+            if updates:
+                await self.collection.bulk_write(updates, ordered=False)
+                backfilled += len(updates)
+            
+            elapsed = (datetime.utcnow() - started).total_seconds()
+            logger.info(f"✅ Dedup index warmed: {len(self.dedup_index)} reviews ({backfilled} backfilled) in {elapsed:.1f}s")
+        except Exception as e:
+            # Lookups keep working on whatever was loaded
+            logger.error(f"❌ Failed to warm dedup index: {e}")
+        
+        return len(self.dedup_index)
+    
+    def _index_for_search(self, doc: Dict):
+        if self.search_index is not None:
+            self.search_index.add(
+                doc["_id"],
+                doc["rating"],
+                doc["timestamp"],
+                f"{doc.get('review_text') or ''} {doc.get('ai_summary') or ''}"
+            )
+    
+    async def warm_search_index(self) -> int:
+        """
+        Build the in-memory search index from both tiers (search_backend="memory").
+        Archived reviews stay searchable, so archiving never touches the index.
+        """
+        if self.search_index is None:
+            return 0
+        started = datetime.utcnow()
+        
+        try:
+            loaded = 0
+            for collection in (self.archive_collection, self.collection):
+                cursor = collection.find(
+                    {},
+                    {"rating": 1, "timestamp": 1, "review_text": 1, "ai_summary": 1}
+                ).sort("_id", 1).batch_size(settings.export_batch_size)
+                async for doc in cursor:
+                    self._index_for_search(doc)
+                    loaded += 1
+                    if loaded % 100 == 0:
+                        await asyncio.sleep(0)  # tokenizing is CPU work; let requests in
+            
+            elapsed = (datetime.utcnow() - started).total_seconds()
+            logger.info(f"✅ Search index warmed: {len(self.search_index)} reviews in {elapsed:.1f}s")
+        except Exception as e:
+            logger.error(f"❌ Failed to warm search index: {e}")
+        
+        return len(self.search_index)
+    
+    async def _record_stats(self, reviews: List[Tuple[int, datetime]]):
+        # The review is already stored; a failed counter update is repaired by the reconcile job
+        try:
+            with timed("mongo.stats_rollup"):
+                await self.stats_rollup.record_reviews(reviews)
+        except Exception as e:
+            logger.error(f"❌ Failed to update stats rollup: {e}")
+        self._version_cache.invalidate()
+    
+    async def _bump_version(self):
+        # Stored reviews changed in place; conditional GETs must stop answering 304
+        try:
+            with timed("mongo.stats_rollup"):
+                await self.stats_rollup.bump_version()
+        except Exception as e:
+            logger.error(f"❌ Failed to bump collection version: {e}")
+        self._version_cache.invalidate()
+    
+    async def get_collection_version(self) -> Dict:
+        """
+        Version of the reviews collection for ETags, shared by concurrent requests and
+        reused for http_cache_version_ttl_seconds
+        """
+        with timed("collection_version"):
+            return await self._version_cache.get_or_load("version", self.stats_rollup.get_version)
+    
+    async def create_reviews_batch(self, items: List[Tuple[int, int, str]]) -> List[Dict]:
+        """
+        Enrich and store (index, rating, review_text) items for a bulk import.
+        
+        Items are processed in chunks: LLM calls in a chunk fan out under
+        batch_llm_concurrency, then the chunk is written with one unordered insert_many.
+        Always enriches inline, whatever the enrichment mode. Returns one result per item.
+        """
+        semaphore = asyncio.Semaphore(settings.batch_llm_concurrency)
+        chunk_size = settings.batch_insert_chunk_size
+        
+        results = []
+        for start in range(0, len(items), chunk_size):
+            results += await self._create_reviews_chunk(items[start:start + chunk_size], semaphore)
+        
+        logger.info(f"📦 Batch stored {sum(r['success'] for r in results)}/{len(items)} reviews")
+        return results
+    
+    async def _enrich_for_batch(
+        self, rating: int, review_text: str, templated: Optional[Dict], semaphore: asyncio.Semaphore
+    ) -> Dict:
+        if templated is not None:
+            return templated
+        async with semaphore:
+            return await self.llm_service.generate_review_content(rating, review_text, classify=False)
+    
+    def _match_chunk(self, items: List[Tuple[int, int, str]]) -> List[Tuple[ObjectId, Optional[int], Optional[DuplicateMatch]]]:
+        """
+        (review_id, fingerprint, match) per item. Matches come from the shared index and
+        from the chunk's earlier items, which the shared index only sees once inserted.
+        Imports are tagged into clusters but never rejected as floods.
+        """
+        chunk_index = DedupIndex(settings.dedup_max_distance, 0, 0) if settings.dedup_enabled else None
+        matched = []
+        for _, _, review_text in items:
+            review_id = ObjectId()
+            fingerprint, match = None, None
+            if chunk_index is not None:
+                fingerprint = simhash(review_text)
+                match = self.dedup_index.find(fingerprint)
+                in_chunk = chunk_index.find(fingerprint)
+                if in_chunk is not None and (match is None or in_chunk.distance < match.distance):
+                    match = in_chunk
+                chunk_index.add(review_id, fingerprint, match.cluster_id if match else None)
+            matched.append((review_id, fingerprint, match))
+        return matched
+    
+    async def _create_reviews_chunk(self, items: List[Tuple[int, int, str]], semaphore: asyncio.Semaphore) -> List[Dict]:
+        # One classifier pass over the chunk; confident reviews never reach the LLM
+        templated = self.llm_service.templated_contents([(rating, review_text) for _, rating, review_text in items])
+        matched = self._match_chunk(items)
+        positions = {review_id: position for position, (review_id, _, _) in enumerate(matched)}
+        tasks: List[asyncio.Future] = []
+        
+        async def content_for(position: int) -> Dict:
+            _, rating, review_text = items[position]
+            match = matched[position][2]
+            if match is not None and settings.dedup_reuse_enrichment:
+                source = positions.get(match.review_id)
+                if source is None:
+                    reused = await self._reusable_content(match, rating)
+                    if reused is not None:
+                        return reused
+                elif items[source][1] == rating:
+                    # Near-duplicate of an earlier item in this chunk: share its enrichment
+                    try:
+                        content = await tasks[source]
+                        if not content["fallback_fields"]:
+                            return content
+                    except Exception:
+                        pass
+            return await self._enrich_for_batch(rating, review_text, templated[position], semaphore)
+        
+        # Created in order, so a duplicate's source task always exists when it awaits it
+        for position in range(len(items)):
+            tasks.append(asyncio.ensure_future(content_for(position)))
+        contents = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        results: Dict[int, Dict] = {}
+        pending: List[Tuple[int, Dict]] = []
+        duplicates: Dict[int, Tuple[Optional[int], Optional[DuplicateMatch]]] = {}
+        for (index, rating, review_text), (review_id, fingerprint, match), ai_content in zip(items, matched, contents):
+            if isinstance(ai_content, Exception):
+                results[index] = {"index": index, "success": False, "error": f"Enrichment failed: {ai_content}"}
+                continue
+            duplicates[index] = (fingerprint, match)
+            pending.append((index, {
+                "_id": review_id,
+                "timestamp": datetime.utcnow(),
+                "rating": rating,
+                "review_text": review_text,
+                "ai_response": ai_content["ai_response"],
+                "ai_summary": ai_content["ai_summary"],
+                "suggested_actions": ai_content["suggested_actions"],
+                "enrichment_status": "completed",
+                **fallback_marker(ai_content),
+                **self._dedup_fields(fingerprint, match),
+            }))
+        
+        # Unordered: one bad document doesn't stop the rest; failures come back by position
+        write_errors: Dict[int, str] = {}
+        if pending:
+            try:
+                with timed("mongo.insert_many"):
+                    await self.collection.insert_many([doc for _, doc in pending], ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    write_errors[error["index"]] = error.get("errmsg", "Write failed")
+            except Exception as e:
+                logger.error(f"❌ Error inserting review batch: {e}")
+                write_errors = {position: f"Write failed: {e}" for position in range(len(pending))}
+        
+        inserted = []
+        for position, (index, doc) in enumerate(pending):
+            if position in write_errors:
+                results[index] = {"index": index, "success": False, "error": write_errors[position]}
+                continue
+            results[index] = {
+                "index": index,
+                "success": True,
+                "submission_id": str(doc["_id"]),
+                "enrichment_status": "completed"
+            }
+            inserted.append(doc)
+            await self._index_review(doc["_id"], *duplicates[index])
+        
+        if inserted:
+            await self._record_stats([(doc["rating"], doc["timestamp"]) for doc in inserted])
+            for doc in inserted:
+                self.live_feed.review_created(to_feed_review(doc))
+                self._index_for_search(doc)
+        
+        return [results[index] for index, _, _ in items]
+    
+    async def enrich_review(self, job: EnrichmentJob, is_last_attempt: bool) -> Dict:
+        """
+        Enrichment queue handler: generate the AI fields and write them onto the pending review
+        """
+        ai_content = await self.llm_service.generate_review_content(job.rating, job.review_text)
+        
+        # Fallback content is only accepted once retries are exhausted, or straight away while
+        # the LLM circuit is open (the fallback sweeper re-enriches it after recovery)
+        if ai_content["fallback_fields"] and not is_last_attempt and self.llm_service.is_healthy:
+            raise Exception(f"LLM fell back for {', '.join(ai_content['fallback_fields'])}")
+        
+        with timed("mongo.find_one_and_update"):
+            doc = await self.collection.find_one_and_update(
+                {"_id": ObjectId(job.review_id)},
+                {"$set": {
+                    "ai_response": ai_content["ai_response"],
+                    "ai_summary": ai_content["ai_summary"],
+                    "suggested_actions": ai_content["suggested_actions"],
+                    "enrichment_status": "completed",
+                    "enriched_at": datetime.utcnow(),
+                    **fallback_marker(ai_content),
+                }},
+                projection={"ai_response": 0},
+                return_document=ReturnDocument.AFTER
+            )
+        if doc:
+            self.live_feed.review_updated(to_feed_review(doc))
+            self._index_for_search(doc)
+            await self._bump_version()
+        
+        logger.info(f"✨ Review {job.review_id} enriched")
+        
+        return ai_content
+    
+    async def requeue_pending_reviews(self) -> int:
+        """
+        Re-queue reviews left pending by a previous process (crash or shutdown)
+        """
+        requeued = 0
+        docs = await self.collection.find(
+            {"enrichment_status": "pending"},
+            {"rating": 1, "review_text": 1}
+        ).sort("timestamp", 1).limit(self.enrichment_queue.max_size).to_list(length=self.enrichment_queue.max_size)
+        # Every worker runs this at startup; each review goes to whichever claims it first
+        claimed = await self._claim([doc["_id"] for doc in docs], {"enrichment_status": "pending"})
+        
+        for doc in docs:
+            if doc["_id"] not in claimed:
+                continue
+            try:
+                self.enrichment_queue.enqueue(str(doc["_id"]), doc["rating"], doc["review_text"])
+                requeued += 1
+            except EnrichmentQueueFull:
+                break
+        
+        if requeued:
+            logger.info(f"🔁 Re-queued {requeued} pending reviews for enrichment")
+        return requeued
+    
+    async def reenrich_fallback_reviews(self, limit: int) -> int:
+        """
+        Regenerate the fallback fields of up to `limit` reviews, oldest first.
+        Only fields that were fallbacks are replaced; stops early if the LLM circuit opens.
+        """
+        with timed("mongo.find"):
+            docs = await self.collection.find(
+                {"ai_fallback": True},
+                {"rating": 1, "review_text": 1, "fallback_fields": 1}
+            ).sort("timestamp", 1).limit(limit).to_list(length=limit)
+        # Every worker runs a sweeper; skip reviews another one is already re-enriching
+        claimed = await self._claim([doc["_id"] for doc in docs], {"ai_fallback": True})
+        docs = [doc for doc in docs if doc["_id"] in claimed]
+        
+        semaphore = asyncio.Semaphore(settings.batch_llm_concurrency)
+        results = await asyncio.gather(*(self._reenrich_review(doc, semaphore) for doc in docs), return_exceptions=True)
+        # Reviews still holding fallbacks (e.g. the circuit opened) are free for the next sweep again
+        await self._release_claims([doc["_id"] for doc in docs])
+        
+        reenriched = sum(result is True for result in results)
+        if docs:
+            logger.info(f"🔁 Re-enriched {reenriched}/{len(docs)} reviews with fallback content")
+        return reenriched
+    
+    async def archive_reviews(self, older_than_days: int, batch_size: int) -> int:
+        """
+        Move reviews older than `older_than_days` to the archive, oldest first, until
+        none are left. Each batch is copied, then deleted: a crash in between leaves
+        it in both tiers and the next run finishes the move. The stats rollup counts
+        reviews in either tier, so it is left alone.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        moved = 0
+        
+        try:
+            while True:
+                with timed("mongo.find"):
+                    docs = await self.collection.find(
+                        {"timestamp": {"$lt": cutoff}}
+                    ).sort([("timestamp", 1), ("_id", 1)]).limit(batch_size).to_list(length=batch_size)
+                # A review claimed by a job (e.g. being re-enriched) must not move under it. The batch
+                # stops there, so the archive never gets ahead of a review still in the hot collection.
+                now = datetime.utcnow()
+                for position, doc in enumerate(docs):
+                    if doc.get("claimed_until") and doc["claimed_until"] > now:
+                        docs = docs[:position]
+                        break
+                if not docs:
+                    break
+                
+                try:
+                    with timed("mongo.insert_many"):
+                        await self.archive_collection.insert_many(docs, ordered=False)
+                except BulkWriteError as e:
+                    # Already copied by an interrupted run or by another worker's job
+                    if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                        raise
+                with timed("mongo.delete_many"):
+                    await self.collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+                moved += len(docs)
+                if len(docs) < batch_size:
+                    break
+        except Exception as e:
+            logger.error(f"❌ Error archiving reviews: {e}")
+            raise Exception(f"Failed to archive reviews: {str(e)}")
+        finally:
+            if moved:
+                # Other workers drop their cached archive counts and ETags when the version moves
+                await self._bump_version()
+                self._archive_counts.invalidate()
+        
+        if moved:
+            logger.info(f"🗄️ Archived {moved} reviews older than {older_than_days} days")
+        return moved
+    
+    async def _claim(self, ids: List[ObjectId], query: Dict) -> Set[ObjectId]:
+        """
+        Mark the reviews matching query as taken for job_claim_seconds and return the
+        ids this call won; reviews with a live claim from another call are left out
+        """
+        if not ids:
+            return set()
+        now = datetime.utcnow()
+        token = ObjectId()
+        with timed("mongo.update_many"):
+            await self.collection.update_many(
+                {"_id": {"$in": ids}, **query, "claimed_until": {"$not": {"$gt": now}}},
+                {"$set": {"claim": token, "claimed_until": now + timedelta(seconds=settings.job_claim_seconds)}}
+            )
+        cursor = self.collection.find({"_id": {"$in": ids}, "claim": token}, {"_id": 1})
+        return {doc["_id"] async for doc in cursor}
+    
+    async def _release_claims(self, ids: List[ObjectId]):
+        if ids:
+            with timed("mongo.update_many"):
+                await self.collection.update_many({"_id": {"$in": ids}}, {"$unset": {"claim": "", "claimed_until": ""}})
+    
+    async def _reenrich_review(self, doc: Dict, semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
+            if self.llm_service.is_cooling_down:
+                return False
+            ai_content = await self.llm_service.generate_review_content(doc["rating"], doc["review_text"])
+        
+        previous = doc.get("fallback_fields") or ["ai_response", "ai_summary", "suggested_actions"]
+        fixed = [field for field in previous if field not in ai_content["fallback_fields"]]
+        if not fixed:
+            return False
+        remaining = [field for field in previous if field not in fixed]
+        
+        with timed("mongo.find_one_and_update"):
+            updated = await self.collection.find_one_and_update(
+                {"_id": doc["_id"], "ai_fallback": True},
+                {"$set": {
+                    **{field: ai_content[field] for field in fixed},
+                    "ai_fallback": bool(remaining),
+                    "fallback_fields": remaining,
+                    "enriched_at": datetime.utcnow(),
+                }},
+                projection={"ai_response": 0},
+                return_document=ReturnDocument.AFTER
+            )
+        if updated:
+            self.live_feed.review_updated(to_feed_review(updated))
+            self._index_for_search(updated)
+            await self._bump_version()
+        return not remaining
+    
+    async def get_enrichment_status(self, review_id: str) -> Optional[Dict]:
+        
+        try:
+            with timed("mongo.find_one"):
+                doc = await self._find_one_any_tier(
+                    {"_id": ObjectId(review_id)},
+                    {"ai_response": 1, "ai_summary": 1, "suggested_actions": 1, "enrichment_status": 1}
+                )
+            
+            if doc:
+                return {
+                    "submission_id": str(doc["_id"]),
+                    "enrichment_status": doc.get("enrichment_status", "completed"),
+                    "ai_response": doc.get("ai_response"),
+                    "ai_summary": doc.get("ai_summary"),
+                    "suggested_actions": doc.get("suggested_actions") or []
+                }
+            return None
+            
+        except Exception as e:
+            logger.error(f"❌ Error fetching enrichment status: {e}")
+            return None
+    
+    def _list_projection(self, view: str, fields: Optional[List[str]]) -> Dict:
+        """
+        Build a $project stage that shapes documents into response rows inside Mongo,
+        so the list path never rebuilds them in Python
+        """
+        if fields:
+            unknown = set(fields) - set(LIST_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            selected = fields
+        elif view == "summary":
+            selected = SUMMARY_FIELDS
+        else:
+            selected = LIST_FIELDS
+        
+        # _id and timestamp are always returned: the next cursor is built from them
+        projection = {
+            "_id": {"$toString": "$_id"},
+            "timestamp": 1
+        }
+        for field in selected:
+            if field == "review_text" and view == "summary":
+                projection["review_text"] = {"$substrCP": ["$review_text", 0, settings.summary_text_length]}
+                projection["review_text_truncated"] = {
+                    "$gt": [{"$strLenCP": "$review_text"}, settings.summary_text_length]
+                }
+            elif field == "suggested_actions":
+                projection[field] = {"$ifNull": ["$suggested_actions", []]}
+            elif field == "enrichment_status":
+                projection[field] = {"$ifNull": ["$enrichment_status", "completed"]}
+            elif field == "duplicate_of":
+                projection[field] = {"$toString": "$duplicate_of"}
+            elif field == "duplicate_count":
+                projection[field] = {"$ifNull": ["$duplicate_count", 0]}
+            elif field != "timestamp":
+                projection[field] = 1
+        return projection
+    
+    async def get_all_reviews(
         self, 
         limit: int = 50, 
         skip: int = 0, 
-        rating_filter: Optional[int] = None
+        rating_filter: Optional[int] = None,
+        cursor: Optional[str] = None,
+        estimate_total: bool = False,
+        view: str = "full",
+        fields: Optional[List[str]] = None,
+        collapse: bool = False
     ) -> Dict:
         
+        # Validated outside the try so bad input surfaces as ValueError, not a generic failure
+        after = decode_cursor(cursor) if cursor else None
+        projection = self._list_projection(view, fields)
+        
         try:
             # Build query
             query = {}
             if rating_filter is not None:
                 query["rating"] = rating_filter
+            if collapse:
+                # One row per cluster: the root, carrying its duplicate_count
+                query["duplicate_of"] = {"$exists": False}
             
-            # Get total count
-            total = self.collection.count_documents(query)
+            # Get total count (the stats estimate doesn't know about clusters)
+            if estimate_total and not collapse:
+                total = await self._estimate_total(rating_filter)
+            else:
+                with timed("mongo.count_documents"):
+                    total = await self.collection.count_documents(query) + await self._count_archived(query)
             
-            # Get reviews (sorted by newest first)
-            cursor = self.collection.find(query).sort("timestamp", -1).skip(skip).limit(limit)
+            if after is not None:
+                query.update(keyset_filter(*after))
             
-            reviews = []
-            for doc in cursor:
-                reviews.append({
-                    "_id": str(doc["_id"]),
-                    "timestamp": doc["timestamp"],
-                    "rating": doc["rating"],
-                    "review_text": doc["review_text"],
-                    "ai_response": doc["ai_response"],
-                    "ai_summary": doc["ai_summary"],
-                    "suggested_actions": doc["suggested_actions"]
-                })
+            # Get reviews (sorted by newest first); one extra row tells us whether another page exists
+            with timed("mongo.aggregate.list"):
+                reviews = await self._list_page(self.collection, query, skip, limit + 1, projection)
+            
+            # Past the end of the hot collection the page continues in the archive, which
+            # holds only older reviews; the skip carries over minus the hot rows it covered
+            if len(reviews) <= limit:
+                archive_skip = 0
+                if skip and not reviews:
+                    with timed("mongo.count_documents"):
+                        archive_skip = max(0, skip - await self.collection.count_documents(query))
+                # An interrupted archive run can leave a review in both tiers for a while
+                archive_query = {**query, "_id": {"$nin": [ObjectId(review["_id"]) for review in reviews]}}
+                with timed("mongo.aggregate.archive"):
+                    reviews += await self._list_page(
+                        self.archive_collection, archive_query, archive_skip, limit + 1 - len(reviews), projection
+                    )
+            
+            next_cursor = None
+            if len(reviews) > limit:
+                reviews = reviews[:limit]
+                last = reviews[-1]
+                next_cursor = encode_cursor(last["timestamp"], ObjectId(last["_id"]))
             
             logger.info(f"📊 Retrieved {len(reviews)} reviews (total: {total})")
             
             return {
                 "total": total,
-                "reviews": reviews
+                "total_estimated": estimate_total and not collapse,
+                "reviews": reviews,
+                "next_cursor": next_cursor
             }
             
         except Exception as e:
             logger.error(f"❌ Error fetching reviews: {e}")
             raise Exception(f"Failed to fetch reviews: {str(e)}")
     
-    def get_stats(self) -> Dict:
+    async def _list_page(self, collection, query: Dict, skip: int, limit: int, projection: Dict) -> List[Dict]:
+        pipeline = [
+            {"$match": query},
+            {"$sort": dict(REVIEW_SORT)},
+        ]
+        if skip:
+            pipeline.append({"$skip": skip})
+        pipeline += [
+            {"$limit": limit},
+            {"$project": projection}
+        ]
+        return await collection.aggregate(pipeline).to_list(length=None)
+    
+    async def _count_archived(self, query: Dict) -> int:
+        # The archive only changes when the archive job runs, which bumps the collection
+        # version, so counts are cached per version and every worker recounts after a move
+        version = (await self.get_collection_version()).get("version", 0)
+        if version != self._archive_counts_version:
+            self._archive_counts.invalidate()
+            self._archive_counts_version = version
+        key = (version, json.dumps(query, sort_keys=True, default=str))
+        return await self._archive_counts.get_or_load(key, lambda: self.archive_collection.count_documents(query))
+    
+    async def search_reviews(
+        self,
+        query: str,
+        limit: int = 50,
+        rating_filter: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        view: str = "full"
+    ) -> Dict:
+        """
+        Relevance-ranked search over review_text and ai_summary, paged by (score, _id)
+        """
+        after = decode_score_cursor(cursor) if cursor else None
+        projection = self._list_projection(view, None)
         
         try:
-            # Total reviews
-            total_reviews = self.collection.count_documents({})
+            if self.search_index is not None:
+                reviews = await self._search_memory(query, limit + 1, rating_filter, since, until, after, projection)
+            else:
+                reviews = await self._search_mongo(query, limit + 1, rating_filter, since, until, after, projection)
+            
+            next_cursor = None
+            if len(reviews) > limit:
+                reviews = reviews[:limit]
+                last = reviews[-1]
+                next_cursor = encode_score_cursor(last["score"], ObjectId(last["_id"]))
             
-            # Rating distribution
+            logger.info(f"🔎 Search '{query}' returned {len(reviews)} reviews")
+            
+            return {
+                "reviews": reviews,
+                "next_cursor": next_cursor
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ Error searching reviews: {e}")
+            raise Exception(f"Failed to search reviews: {str(e)}")
+    
+    async def _search_mongo(self, query, limit, rating_filter, since, until, after, projection) -> List[Dict]:
+        match = {"$text": {"$search": query}, **self._export_query(rating_filter, since, until)}
+        pipeline = [
+            {"$match": match},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+        ]
+        if after is not None:
+            pipeline.append({"$match": score_keyset_filter(*after)})
+        pipeline += [
+            {"$sort": dict(SEARCH_SORT)},
+            {"$limit": limit},
+            {"$project": {**projection, "score": 1}}
+        ]
+        # Relevance doesn't follow age, so both tiers are searched and their best rows merged;
+        # hex _id strings sort like the ObjectIds, so the merge keeps SEARCH_SORT order
+        reviews = {}
+        for collection, stage in ((self.collection, "mongo.aggregate.search"), (self.archive_collection, "mongo.aggregate.archive")):
+            with timed(stage):
+                for doc in await collection.aggregate(pipeline).to_list(length=None):
+                    reviews.setdefault(doc["_id"], doc)  # a review mid-archive is in both tiers
+        return sorted(reviews.values(), key=lambda doc: (doc["score"], doc["_id"]), reverse=True)[:limit]
+    
+    async def _search_memory(self, query, limit, rating_filter, since, until, after, projection) -> List[Dict]:
+        reviews = []
+        while len(reviews) < limit:
+            # Common terms mean scoring hundreds of thousands of postings; keep that off the event loop
+            wanted = limit - len(reviews)
+            with timed("search.memory"):
+                hits = await asyncio.to_thread(
+                    self.search_index.search, query, wanted, rating=rating_filter, since=since, until=until, after=after
+                )
+            if not hits:
+                break
+            
+            # The index covers both tiers; look hits up in the hot collection, then the rest in the archive
+            docs = {}
+            missing = [review_id for _, review_id in hits]
+            for collection in (self.collection, self.archive_collection):
+                if not missing:
+                    break
+                pipeline = [
+                    {"$match": {"_id": {"$in": missing}}},
+                    {"$project": projection}
+                ]
+                with timed("mongo.aggregate.search"):
+                    docs.update({doc["_id"]: doc for doc in await collection.aggregate(pipeline).to_list(length=None)})
+                missing = [review_id for review_id in missing if str(review_id) not in docs]
+            
+            # Ranked by the index; a review deleted since it was indexed is skipped and
+            # the next candidates are pulled in its place
+            for score, review_id in hits:
+                doc = docs.get(str(review_id))
+                if doc is not None:
+                    reviews.append({**doc, "score": score})
+            if len(hits) < wanted:
+                break
+            after = hits[-1]
+        return reviews
+    
+    def _export_query(self, rating_filter: Optional[int], since: Optional[datetime], until: Optional[datetime]) -> Dict:
+        query = {}
+        if rating_filter is not None:
+            query["rating"] = rating_filter
+        if since is not None or until is not None:
+            query["timestamp"] = {}
+            if since is not None:
+                query["timestamp"]["$gte"] = since
+            if until is not None:
+                query["timestamp"]["$lt"] = until
+        return query
+    
+    def export_fields(self, fields: Optional[List[str]]) -> List[str]:
+        """
+        Columns of an export, in order; raises ValueError on unknown fields
+        """
+        if not fields:
+            return ["_id"] + LIST_FIELDS
+        unknown = set(fields) - set(LIST_FIELDS) - {"_id"}
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return ["_id"] + [field for field in fields if field != "_id"]
+    
+    async def export_reviews(
+        self,
+        rating_filter: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        fields: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield every matching review, newest first, from a server-side cursor: the hot
+        collection, then the (older) archive. Only one cursor batch (export_batch_size
+        documents) is held in memory at a time.
+        """
+        columns = self.export_fields(fields)
+        projection = {field: 1 for field in columns}
+        query = self._export_query(rating_filter, since, until)
+        
+        for collection in (self.collection, self.archive_collection):
+            cursor = collection.find(query, projection).sort(REVIEW_SORT).batch_size(settings.export_batch_size)
+            try:
+                async for doc in cursor:
+                    doc["_id"] = str(doc["_id"])
+                    yield doc
+            finally:
+                # The client may disconnect mid-export; release the server-side cursor
+                await cursor.close()
+    
+    async def _estimate_total(self, rating_filter: Optional[int]) -> int:
+        # Served from the (cached) stats or collection metadata instead of counting the filtered set
+        if rating_filter is None and settings.stats_source != "rollup":
+            with timed("mongo.estimated_document_count"):
+                return (
+                    await self.collection.estimated_document_count()
+                    + await self.archive_collection.estimated_document_count()
+                )
+        
+        stats = await self.get_stats()
+        if rating_filter is not None:
+            return stats["rating_distribution"].get(str(rating_filter), 0)
+        return stats["total_reviews"]
+    
+    async def get_stats(self) -> Dict:
+        
+        # Dashboards poll this; concurrent callers within the TTL share one query
+        with timed("stats"):
+            if settings.stats_source == "rollup":
+                return await self._stats_cache.get_or_load("stats", self.stats_rollup.get_stats)
+            return await self._stats_cache.get_or_load("stats", self._compute_stats)
+    
+    async def get_live_stats(self) -> Dict:
+        # Live feed refresh: drop the cached value so pollers pick up the new numbers too
+        self._stats_cache.invalidate("stats")
+        return await self.get_stats()
+    
+    async def rebuild_stats(self) -> Dict:
+        
+        try:
+            result = await self.stats_rollup.rebuild()
+            self._stats_cache.invalidate()
+            self._version_cache.invalidate()
+            return result
+        except Exception as e:
+            logger.error(f"❌ Error rebuilding stats rollup: {e}")
+            raise Exception(f"Failed to rebuild stats: {str(e)}")
+    
+    async def get_stats_timeseries(self, hours: int) -> List[Dict]:
+        
+        try:
+            return await self.stats_rollup.get_timeseries(hours)
+        except Exception as e:
+            logger.error(f"❌ Error fetching stats timeseries: {e}")
+            raise Exception(f"Failed to fetch stats timeseries: {str(e)}")
+    
+    async def _compute_stats(self) -> Dict:
+        
+        try:
+            twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
+            
+            # One pass over each tier: rating counts and the trailing-24h count together
             pipeline = [
+                {"$project": {"_id": 0, "rating": 1, "timestamp": 1}},
                 {
-                    "$group": {
-                        "_id": "$rating",
-                        "count": {"$sum": 1}
+                    "$facet": {
+                        "by_rating": [
+                            {"$group": {"_id": "$rating", "count": {"$sum": 1}}}
+                        ],
+                        "recent": [
+                            {"$match": {"timestamp": {"$gte": twenty_four_hours_ago}}},
+                            {"$count": "count"}
+                        ]
                     }
                 }
             ]
-            rating_results = list(self.collection.aggregate(pipeline))
-            
             rating_distribution = {str(i): 0 for i in range(1, 6)}
-            for item in rating_results:
-                rating_distribution[str(item["_id"])] = item["count"]
-            
-            # Calculate average rating
-            if total_reviews > 0:
-                avg_pipeline = [
-                    {
-                        "$group": {
-                            "_id": None,
-                            "average": {"$avg": "$rating"}
-                        }
-                    }
-                ]
-                avg_result = list(self.collection.aggregate(avg_pipeline))
-                average_rating = round(avg_result[0]["average"], 2) if avg_result else 0
-            else:
-                average_rating = 0
+            recent_count = 0
+            for collection in (self.collection, self.archive_collection):
+                with timed("mongo.aggregate.stats"):
+                    result = await collection.aggregate(pipeline).to_list(length=None)
+                facets = result[0] if result else {"by_rating": [], "recent": []}
+                
+                for item in facets["by_rating"]:
+                    rating_distribution[str(item["_id"])] += item["count"]
+                recent_count += facets["recent"][0]["count"] if facets["recent"] else 0
             
-            # Recent reviews (last 24 hours)
-            twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-            recent_count = self.collection.count_documents({
-                "timestamp": {"$gte": twenty_four_hours_ago}
-            })
+            stats = self._stats_from_counts(rating_distribution)
+            stats["recent_count_24h"] = recent_count
             
-            logger.info(f"📈 Stats retrieved: {total_reviews} total reviews")
+            logger.info(f"📈 Stats retrieved: {stats['total_reviews']} total reviews")
             
-            return {
-                "total_reviews": total_reviews,
-                "rating_distribution": rating_distribution,
-                "average_rating": average_rating,
-                "recent_count_24h": recent_count
-            }
+            return stats
             
         except Exception as e:
             logger.error(f"❌ Error fetching stats: {e}")
             raise Exception(f"Failed to fetch stats: {str(e)}")
     
-    def get_review_by_id(self, review_id: str) -> Optional[Dict]:
+    def _stats_from_counts(self, rating_distribution: Dict[str, int]) -> Dict:
+        # Total and average are derived from the per-rating counts, no second scan needed
+        total_reviews = sum(rating_distribution.values())
+        rating_sum = sum(int(rating) * count for rating, count in rating_distribution.items())
+        
+        return {
+            "total_reviews": total_reviews,
+            "rating_distribution": rating_distribution,
+            "average_rating": round(rating_sum / total_reviews, 2) if total_reviews > 0 else 0
+        }
+    
+    async def _find_one_any_tier(self, query: Dict, projection: Optional[Dict] = None) -> Optional[Dict]:
+        # Hot collection first; only a miss there costs an archive lookup
+        doc = await self.collection.find_one(query, projection)
+        if doc is None:
+            doc = await self.archive_collection.find_one(query, projection)
+        return doc
+    
+    async def get_review_by_id(self, review_id: str) -> Optional[Dict]:
 
         try:
-            doc = self.collection.find_one({"_id": ObjectId(review_id)})
+            with timed("mongo.find_one"):
+                doc = await self._find_one_any_tier({"_id": ObjectId(review_id)})
             
             if doc:
                 return {
@@ -155,9 +1103,10 @@ class ReviewService:
                     "timestamp": doc["timestamp"],
                     "rating": doc["rating"],
                     "review_text": doc["review_text"],
-                    "ai_response": doc["ai_response"],
-                    "ai_summary": doc["ai_summary"],
-                    "suggested_actions": doc["suggested_actions"]
+                    "ai_response": doc.get("ai_response"),
+                    "ai_summary": doc.get("ai_summary"),
+                    "suggested_actions": doc.get("suggested_actions") or [],
+                    "enrichment_status": doc.get("enrichment_status", "completed")
                 }
             return None
             
@@ -166,4 +1115,4 @@ class ReviewService:
             return None
 
 # Create singleton instance
-review_service = ReviewService()
\ No newline at end of file
+review_service = ReviewService(llm_service, enrichment_queue, stats_rollup, live_feed, dedup_index)
\ No newline at end of file
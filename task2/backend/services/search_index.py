@@ -0,0 +1,160 @@
+import heapq
+import math
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+from services.llm_cache import normalize_text
+
+# Enough to keep the commonest words out of the postings; not a full stopword list
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have i in is it its of on or our so that the "
+    "their them they this to was we were with you your".split()
+)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _epoch(value: datetime) -> float:
+    # Stored timestamps are naive UTC; .timestamp() would read a naive datetime as local time
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for word in normalize_text(text).split():
+        word = word.strip("'")
+        if word.endswith("'s"):
+            word = word[:-2]
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        # Crude plural folding so "refunds" finds "refund"
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class InvertedIndex:
+    """
+    In-process BM25 index over review_text + ai_summary, for deployments
+    without Mongo text indexes.
+
+    Per-review data lives in flat arrays indexed by slot; postings are
+    (slot, BM25 term weight) arrays per token. The length normalization uses
+    the average length at the time a review is added, so queries only multiply
+    by idf. Re-indexing a review appends a new slot and tombstones the old one.
+    Queries still touch every posting of their terms, so latency grows with
+    how common the terms are.
+    """
+
+    def __init__(self):
+        self._ids = bytearray()
+        self._ratings = array("b")  # 0 marks a tombstoned slot
+        self._timestamps = array("d")
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._slots: Dict[bytes, int] = {}
+        self._tombstones = set()
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, review_id: ObjectId, rating: int, timestamp: datetime, text: str):
+        tokens = tokenize(text)
+        old_slot = self._slots.get(review_id.binary)
+        if old_slot is not None:
+            self._ratings[old_slot] = 0
+            self._tombstones.add(old_slot)
+        else:
+            self._total_length += len(tokens)
+
+        slot = len(self._ratings)
+        self._ids += review_id.binary
+        self._ratings.append(rating)
+        self._timestamps.append(_epoch(timestamp))
+        self._slots[review_id.binary] = slot
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) * len(self._slots) / (self._total_length or 1))
+        for token, count in counts.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = (array("I"), array("f"))
+            postings[0].append(slot)
+            postings[1].append(count * (BM25_K1 + 1) / (count + norm))
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        rating: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        after: Optional[Tuple[float, ObjectId]] = None
+    ) -> List[Tuple[float, ObjectId]]:
+        """
+        Best `limit` (score, review_id) pairs, by score then _id descending,
+        strictly after the `after` position
+        """
+        # Postings still hold tombstoned slots, so document frequencies are over all slots
+        total = len(self._ratings)
+        if not total:
+            return []
+
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            slots, weights = postings
+            idf = math.log(1 + (total - len(slots) + 0.5) / (len(slots) + 0.5))
+            if not scores:
+                scores = dict(zip(slots, map(idf.__mul__, weights)))
+                continue
+            get = scores.get
+            for slot, weight in zip(slots, weights):
+                scores[slot] = get(slot, 0.0) + idf * weight
+        for slot in list(self._tombstones):
+            scores.pop(slot, None)
+
+        candidates = zip(scores.values(), scores.keys())
+        if rating is not None or since or until or after:
+            candidates = self._filtered(candidates, rating, since, until, after)
+        candidates = list(candidates)
+
+        # Slots change when a review is re-indexed, so ties on score are broken by the
+        # _id bytes (the order Mongo sorts ObjectIds in), as the cursor is. Only the
+        # candidates tied with the last place need their _id looked up.
+        top = heapq.nlargest(limit, candidates)
+        if len(top) == limit:
+            cutoff = top[-1][0]
+            tied = [(score, self._id_bytes(slot)) for score, slot in candidates if score >= cutoff]
+            ranked = heapq.nlargest(limit, tied)
+        else:
+            ranked = sorted(((score, self._id_bytes(slot)) for score, slot in top), reverse=True)
+        return [(score, ObjectId(id_bytes)) for score, id_bytes in ranked]
+
+    def _id_bytes(self, slot: int) -> bytes:
+        return bytes(self._ids[slot * 12:slot * 12 + 12])
+
+    def _filtered(self, candidates, rating, since, until, after):
+        since_ts = _epoch(since) if since else None
+        until_ts = _epoch(until) if until else None
+        after_score, after_id = (after[0], after[1].binary) if after else (None, None)
+        ratings, timestamps = self._ratings, self._timestamps
+        for score, slot in candidates:
+            if rating is not None and ratings[slot] != rating:
+                continue
+            if since_ts is not None and timestamps[slot] < since_ts:
+                continue
+            if until_ts is not None and timestamps[slot] >= until_ts:
+                continue
+            if after is not None and (score > after_score or (score == after_score and self._id_bytes(slot) >= after_id)):
+                continue
+            yield score, slot
\ No newline at end of file
@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+import logging
+from database import Database, get_archive_collection, get_reviews_collection
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_ID = "global"
+RATINGS = [str(i) for i in range(1, 6)]
+
+
+def _hour_start(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+class StatsRollup:
+    """
+    Materialized review statistics, maintained with $inc on every insert:
+    - one global document with per-rating counters and a running rating sum
+    - one document per hour (keyed by the hour's start) for trailing windows and time series
+
+    The global document also carries a `version` counter, bumped by every insert and
+    every change to a stored review; HTTP ETags are derived from it.
+
+    Reads are O(1) in the size of the reviews collection. Counters can drift if a
+    write lands between an insert and its $inc (e.g. a crash), so rebuild() recomputes
+    everything from the reviews and archive collections. Archiving only moves reviews
+    between the two, so it leaves the counters alone.
+    """
+
+    # Looked up on use so that importing the singleton opens no connection
+    @property
+    def collection(self):
+        return Database.get_collection("review_stats")
+
+    @property
+    def hourly_collection(self):
+        return Database.get_collection("review_stats_hourly")
+
+    @property
+    def reviews_collection(self):
+        return get_reviews_collection()
+
+    @property
+    def archive_collection(self):
+        return get_archive_collection()
+
+    async def record_reviews(self, reviews: Iterable[Tuple[int, datetime]]):
+        """
+        Add (rating, timestamp) pairs to the global and hourly counters
+        """
+        global_inc: Dict[str, int] = {"total": 0, "rating_sum": 0}
+        hourly_inc: Dict[datetime, Dict[str, int]] = {}
+
+        for rating, timestamp in reviews:
+            global_inc["total"] += 1
+            global_inc["rating_sum"] += rating
+            global_inc[f"rating_counts.{rating}"] = global_inc.get(f"rating_counts.{rating}", 0) + 1
+
+            bucket = hourly_inc.setdefault(_hour_start(timestamp), {"count": 0, "rating_sum": 0})
+            bucket["count"] += 1
+            bucket["rating_sum"] += rating
+            bucket[f"rating_counts.{rating}"] = bucket.get(f"rating_counts.{rating}", 0) + 1
+
+        if not global_inc["total"]:
+            return
+
+        await self.collection.update_one(
+            {"_id": ROLLUP_ID},
+            {"$inc": {**global_inc, "version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        for hour, inc in hourly_inc.items():
+            await self.hourly_collection.update_one({"_id": hour}, {"$inc": inc}, upsert=True)
+
+    async def record_review(self, rating: int, timestamp: datetime):
+        await self.record_reviews([(rating, timestamp)])
+
+    async def bump_version(self):
+        """
+        Record that stored reviews changed without a new insert (enrichment, re-enrichment)
+        """
+        await self.collection.update_one(
+            {"_id": ROLLUP_ID},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    async def get_version(self) -> Dict:
+        return await self.collection.find_one(
+            {"_id": ROLLUP_ID},
+            {"_id": 0, "version": 1, "total": 1, "updated_at": 1}
+        ) or {}
+
+    async def exists(self) -> bool:
+        return await self.collection.find_one({"_id": ROLLUP_ID}, {"_id": 1}) is not None
+
+    async def get_stats(self) -> Dict:
+        doc = await self.collection.find_one({"_id": ROLLUP_ID}) or {}
+        counts = doc.get("rating_counts", {})
+        rating_distribution = {rating: counts.get(rating, 0) for rating in RATINGS}
+        total_reviews = doc.get("total", 0)
+
+        return {
+            "total_reviews": total_reviews,
+            "rating_distribution": rating_distribution,
+            "average_rating": round(doc.get("rating_sum", 0) / total_reviews, 2) if total_reviews > 0 else 0,
+            "recent_count_24h": await self.count_since(datetime.utcnow() - timedelta(hours=24))
+        }
+
+    async def count_since(self, since: datetime) -> int:
+        # Whole hours come from the buckets; only the partial first hour touches the reviews
+        # collection, and that range is at most one hour of data on the timestamp index
+        first_full_hour = _hour_start(since) + timedelta(hours=1)
+
+        buckets = await self.hourly_collection.aggregate([
+            {"$match": {"_id": {"$gte": first_full_hour}}},
+            {"$group": {"_id": None, "count": {"$sum": "$count"}}}
+        ]).to_list(length=None)
+        partial = await self.reviews_collection.count_documents({
+            "timestamp": {"$gte": since, "$lt": first_full_hour}
+        })
+
+        return (buckets[0]["count"] if buckets else 0) + partial
+
+    async def get_timeseries(self, hours: int) -> List[Dict]:
+        since = _hour_start(datetime.utcnow()) - timedelta(hours=hours - 1)
+        cursor = self.hourly_collection.find({"_id": {"$gte": since}}).sort("_id", 1)
+
+        buckets = []
+        async for doc in cursor:
+            counts = doc.get("rating_counts", {})
+            buckets.append({
+                "hour": doc["_id"],
+                "count": doc.get("count", 0),
+                "rating_distribution": {rating: counts.get(rating, 0) for rating in RATINGS}
+            })
+        return buckets
+
+    async def rebuild(self) -> Dict:
+        """
+        Recompute the rollup from scratch (reconcile job). Writes that land while
+        this runs may be missed; run it again if that matters.
+        """
+        pipeline = [
+            {
+                "$group": {
+                    "_id": {
+                        "year": {"$year": "$timestamp"},
+                        "month": {"$month": "$timestamp"},
+                        "day": {"$dayOfMonth": "$timestamp"},
+                        "hour": {"$hour": "$timestamp"},
+                        "rating": "$rating"
+                    },
+                    "count": {"$sum": 1}
+                }
+            }
+        ]
+        # Both tiers group to (hour, rating) rows, which are summed below
+        rows = []
+        for collection in (self.reviews_collection, self.archive_collection):
+            rows += await collection.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+
+        global_doc = {"_id": ROLLUP_ID, "total": 0, "rating_sum": 0, "rating_counts": {rating: 0 for rating in RATINGS}}
+        hourly: Dict[datetime, Dict] = {}
+        for row in rows:
+            key, count = row["_id"], row["count"]
+            rating = str(key["rating"])
+            hour = datetime(key["year"], key["month"], key["day"], key["hour"])
+
+            global_doc["total"] += count
+            global_doc["rating_sum"] += key["rating"] * count
+            global_doc["rating_counts"][rating] = global_doc["rating_counts"].get(rating, 0) + count
+
+            bucket = hourly.setdefault(hour, {"_id": hour, "count": 0, "rating_sum": 0, "rating_counts": {}})
+            bucket["count"] += count
+            bucket["rating_sum"] += key["rating"] * count
+            bucket["rating_counts"][rating] = bucket["rating_counts"].get(rating, 0) + count
+
+        global_doc["updated_at"] = datetime.utcnow()
+        # The version only ever grows, so an ETag issued before the rebuild can't match again
+        previous = await self.get_version()
+        global_doc["version"] = previous.get("version", 0) + 1
+        await self.hourly_collection.delete_many({})
+        if hourly:
+            await self.hourly_collection.insert_many(list(hourly.values()))
+        await self.collection.replace_one({"_id": ROLLUP_ID}, global_doc, upsert=True)
+
+        logger.info(f"🧮 Stats rollup rebuilt: {global_doc['total']} reviews in {len(hourly)} hourly buckets")
+        return {"total_reviews": global_doc["total"], "hourly_buckets": len(hourly)}
+
+
+# Create singleton instance
+stats_rollup = StatsRollup()
\ No newline at end of file
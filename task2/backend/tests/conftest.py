@@ -0,0 +1,85 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Offline settings: the stub LLM and an in-memory database (mongomock-motor), set
+# before anything imports config
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ["LLM_BACKEND"] = "stub"
+os.environ["LLM_STUB_LATENCY_MS"] = "0"
+os.environ["LLM_STUB_ERROR_RATE"] = "0"
+# Every request comes from the same test client; per-client limits would only get in the way
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import database  # noqa: E402
+
+
+class MockClient(AsyncMongoMockClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+
+
+database.AsyncIOMotorClient = MockClient
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """
+    A fresh in-memory database for one test
+    """
+    await database.Database.connect()
+    yield database.Database
+    database.Database.close()
+
+
+@pytest.fixture
+async def review_service(db):
+    """
+    A ReviewService with its own dedup index, so near-duplicates from one test
+    don't cluster with another's
+    """
+    from config import settings
+    from services.dedup_index import DedupIndex
+    from services.enrichment_queue import enrichment_queue
+    from services.live_feed import live_feed
+    from services.llm_service import llm_service
+    from services.review_service import ReviewService
+    from services.stats_rollup import stats_rollup
+
+    return ReviewService(
+        llm_service,
+        enrichment_queue,
+        stats_rollup,
+        live_feed,
+        DedupIndex(settings.dedup_max_distance, settings.dedup_flood_threshold, settings.dedup_flood_window_seconds)
+    )
+
+
+@pytest.fixture
+async def client(review_service):
+    """
+    httpx client for the app, lifespan included, serving routes from `review_service`
+    """
+    import httpx
+    import main
+    from dependencies import get_review_service
+
+    async with main.lifespan(main.app):
+        main.app.dependency_overrides[get_review_service] = lambda: review_service
+        try:
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                yield http
+        finally:
+            main.app.dependency_overrides.clear()
\ No newline at end of file
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+from bson import ObjectId
+
+from services.dedup_index import DedupIndex, DuplicateFlood, from_int64, simhash, to_int64
+
+REVIEW = (
+    "We waited forty minutes for a table even though we had a reservation, "
+    "and when the food finally came the pasta was cold and the salad was wilted"
+)
+
+
+def test_simhash_ignores_case_and_punctuation():
+    assert simhash("Great service!!") == simhash("great service")
+
+
+def test_simhash_small_edit_stays_close():
+    edited = REVIEW.replace("forty", "forty five")
+
+    assert (simhash(REVIEW) ^ simhash(edited)).bit_count() <= 12
+
+
+@pytest.mark.parametrize("fingerprint", [0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1])
+def test_int64_round_trip(fingerprint):
+    stored = to_int64(fingerprint)
+
+    assert -(1 << 63) <= stored < 1 << 63
+    assert from_int64(stored) == fingerprint
+
+
+def test_find_within_max_distance_by_band():
+    index = DedupIndex(max_distance=3, flood_threshold=5, flood_window_seconds=60)
+    rng = random.Random(7)
+    fingerprints = [rng.getrandbits(64) for _ in range(200)]
+    ids = [ObjectId() for _ in fingerprints]
+    for review_id, fingerprint in zip(ids, fingerprints):
+        index.add(review_id, fingerprint)
+
+    # Pigeonhole: any fingerprint within max_distance bits shares a band with its source
+    for review_id, fingerprint in zip(ids, fingerprints):
+        flipped = fingerprint
+        for bit in rng.sample(range(64), 3):
+            flipped ^= 1 << bit
+        match = index.find(flipped)
+        assert match is not None
+        assert match.review_id == review_id
+        assert match.distance == 3
+
+
+def test_find_misses_unrelated_text():
+    index = DedupIndex(max_distance=3, flood_threshold=5, flood_window_seconds=60)
+    index.add(ObjectId(), simhash(REVIEW))
+
+    assert index.find(simhash("Friendly staff, lovely patio and the best tacos in town")) is None
+
+
+def test_duplicates_share_the_cluster_root():
+    index = DedupIndex(max_distance=3, flood_threshold=5, flood_window_seconds=60)
+    root, duplicate = ObjectId(), ObjectId()
+    index.add(root, 0b1111)
+    index.add(duplicate, 0b1110 << 40, cluster_id=root)
+
+    match = index.find(0b1110 << 40)
+
+    assert match.review_id == duplicate
+    assert match.cluster_id == root
+
+
+def test_flood_is_counted_per_client_and_cluster():
+    index = DedupIndex(max_distance=3, flood_threshold=2, flood_window_seconds=60)
+    index.add(ObjectId(), 0)
+    match = index.find(0)
+
+    index.check_flood(match, "1.2.3.4")
+    index.check_flood(match, "1.2.3.4")
+    with pytest.raises(DuplicateFlood):
+        index.check_flood(match, "1.2.3.4")
+    # Another customer posting the same short review is not part of that flood
+    index.check_flood(match, "5.6.7.8")
+
+
+def test_flood_window_expires(monkeypatch):
+    index = DedupIndex(max_distance=3, flood_threshold=1, flood_window_seconds=10)
+    index.add(ObjectId(), 0)
+    match = index.find(0)
+    now = [1000.0]
+    monkeypatch.setattr("services.dedup_index.time.monotonic", lambda: now[0])
+
+    index.check_flood(match, "client")
+    with pytest.raises(DuplicateFlood):
+        index.check_flood(match, "client")
+    now[0] += 11
+    index.check_flood(match, "client")
\ No newline at end of file
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from services.idempotency import IdempotencyConflict, IdempotencyStore, request_fingerprint
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def store(db):
+    return IdempotencyStore(ttl_seconds=3600, lock_seconds=30, wait_seconds=1)
+
+
+def counting_handler(result):
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return result
+
+    return handler, calls
+
+
+async def test_concurrent_duplicates_share_one_call(store):
+    handler, calls = counting_handler({"submission_id": "abc"})
+    fingerprint = request_fingerprint({"rating": 5})
+
+    outcomes = await asyncio.gather(*(store.run("submit:k", fingerprint, handler) for _ in range(3)))
+
+    assert len(calls) == 1
+    assert [result for result, _ in outcomes] == [{"submission_id": "abc"}] * 3
+    assert sorted(replayed for _, replayed in outcomes) == [False, True, True]
+
+
+async def test_retry_after_completion_is_replayed(store):
+    handler, calls = counting_handler({"submission_id": "abc"})
+    fingerprint = request_fingerprint({"rating": 5})
+    await store.run("submit:k", fingerprint, handler)
+
+    result, replayed = await store.run("submit:k", fingerprint, handler)
+
+    assert (result, replayed) == ({"submission_id": "abc"}, True)
+    assert len(calls) == 1
+    assert await store.has_result("submit:k", fingerprint)
+
+
+async def test_reused_key_with_another_body_conflicts(store):
+    handler, _ = counting_handler({"submission_id": "abc"})
+    await store.run("submit:k", request_fingerprint({"rating": 5}), handler)
+    other = request_fingerprint({"rating": 1})
+
+    with pytest.raises(IdempotencyConflict):
+        await store.run("submit:k", other, handler)
+    assert not await store.has_result("submit:k", other)
+
+
+async def test_failed_request_releases_the_key(store):
+    fingerprint = request_fingerprint({"rating": 5})
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await store.run("submit:k", fingerprint, broken)
+    assert not await store.has_result("submit:k", fingerprint)
+
+    handler, calls = counting_handler({"submission_id": "abc"})
+    result, replayed = await store.run("submit:k", fingerprint, handler)
+    assert (result, replayed, len(calls)) == ({"submission_id": "abc"}, False, 1)
\ No newline at end of file
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from services.pagination import (
+    REVIEW_SORT,
+    decode_cursor,
+    decode_score_cursor,
+    encode_cursor,
+    encode_score_cursor,
+    keyset_filter,
+)
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2024, 5, 17, 12, 30, 45, 123456)
+    doc_id = ObjectId()
+
+    cursor = encode_cursor(timestamp, doc_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, doc_id)
+
+
+def test_score_cursor_round_trip():
+    doc_id = ObjectId()
+
+    assert decode_score_cursor(encode_score_cursor(3.25, doc_id)) == (3.25, doc_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_score_cursor(1.0, ObjectId())])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_pages_cover_every_row_once():
+    collection = mongomock.MongoClient().db.reviews
+    now = datetime(2024, 1, 1)
+    # Several reviews share a timestamp, so _id has to break the ties
+    collection.insert_many([{"timestamp": now - timedelta(minutes=i // 3)} for i in range(20)])
+    expected = [doc["_id"] for doc in collection.find().sort(REVIEW_SORT)]
+
+    seen, query = [], {}
+    while True:
+        page = list(collection.find(query).sort(REVIEW_SORT).limit(6))
+        seen += [doc["_id"] for doc in page]
+        if len(page) < 6:
+            break
+        timestamp, doc_id = decode_cursor(encode_cursor(page[-1]["timestamp"], page[-1]["_id"]))
+        query = keyset_filter(timestamp, doc_id)
+
+    assert seen == expected
\ No newline at end of file
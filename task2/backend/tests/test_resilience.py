@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from services.resilience import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, ResilientCaller
+
+
+def make_caller(limit=4, failure_threshold=3, recovery_seconds=60.0, deadline_seconds=1.0):
+    limiter = AdaptiveLimiter("test", initial=limit, min_limit=1, max_limit=limit)
+    breaker = CircuitBreaker("test", failure_threshold=failure_threshold, recovery_seconds=recovery_seconds)
+    return ResilientCaller(limiter, breaker, deadline_seconds=deadline_seconds, queue_timeout_seconds=1.0)
+
+
+async def fail():
+    raise RuntimeError("upstream error")
+
+
+async def succeed():
+    return "ok"
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_seconds=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.is_closed
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.is_cooling_down
+    assert not breaker.allow()
+
+
+def test_breaker_lets_one_probe_through_after_recovery(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("services.resilience.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=30)
+    breaker.record_failure()
+
+    now[0] += 31
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    now[0] += 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.is_closed
+
+
+def test_limiter_increases_additively_up_to_max():
+    limiter = AdaptiveLimiter("test", initial=2, min_limit=1, max_limit=3)
+    for _ in range(2):
+        limiter.on_success()
+    assert limiter.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.limit == 3
+
+
+@pytest.mark.anyio
+async def test_limiter_queues_callers_in_order():
+    limiter = AdaptiveLimiter("test", initial=1, min_limit=1, max_limit=1)
+    order = []
+
+    async def worker(name):
+        await limiter.acquire()
+        order.append(name)
+        await asyncio.sleep(0.01)
+        limiter.release()
+
+    await asyncio.gather(*(worker(name) for name in "abc"))
+
+    assert order == ["a", "b", "c"]
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_caller_opens_circuit_and_fails_fast():
+    caller = make_caller(failure_threshold=2)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await caller.call(fail)
+
+    with pytest.raises(CircuitOpenError):
+        await caller.call(succeed)
+    assert caller.limiter.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_simultaneous_timeouts_cut_the_limit_once():
+    caller = make_caller(limit=16, failure_threshold=100, deadline_seconds=0.05)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    results = await asyncio.gather(*(caller.call(hang) for _ in range(16)), return_exceptions=True)
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+    assert caller.limiter.limit == 8
+
+    # A failure after that decrease is a new congestion event
+    with pytest.raises(asyncio.TimeoutError):
+        await caller.call(hang)
+    assert caller.limiter.limit == 4
+
+
+@pytest.mark.anyio
+async def test_success_closes_the_circuit_and_returns_the_result():
+    caller = make_caller()
+
+    assert await caller.call(succeed) == "ok"
+    assert caller.breaker.is_closed
+    assert caller.stats()["in_flight"] == 0
\ No newline at end of file
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+COMPLAINT = "The pasta was cold and the waiter ignored us for twenty minutes after we sat down"
+
+
+async def list_all(client, **params):
+    """
+    Every review /all returns, following next_cursor page by page
+    """
+    reviews, cursor = [], None
+    while True:
+        response = await client.get("/api/reviews/all", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        reviews += body["reviews"]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return body["total"], reviews
+
+
+async def age_reviews(review_service, days: int):
+    await review_service.collection.update_many(
+        {}, {"$set": {"timestamp": datetime.utcnow() - timedelta(days=days)}}
+    )
+
+
+async def test_submitted_review_is_listed(client):
+    response = await client.post("/api/reviews/submit", json={"rating": 4, "review_text": "Lovely dinner, will be back"})
+
+    assert response.status_code == 200
+    submission = response.json()
+    assert submission["success"] and submission["ai_response"]
+
+    total, reviews = await list_all(client)
+    assert total == 1
+    assert reviews[0]["_id"] == submission["submission_id"]
+    assert reviews[0]["review_text"] == "Lovely dinner, will be back"
+    assert reviews[0]["ai_summary"]
+
+
+async def test_idempotent_submit_is_stored_once(client):
+    headers = {"Idempotency-Key": "retry-me"}
+    body = {"rating": 2, "review_text": "Slow service and a cold starter"}
+
+    first = await client.post("/api/reviews/submit", json=body, headers=headers)
+    retry = await client.post("/api/reviews/submit", json=body, headers=headers)
+    conflict = await client.post("/api/reviews/submit", json={**body, "rating": 1}, headers=headers)
+
+    assert retry.json()["submission_id"] == first.json()["submission_id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert conflict.status_code == 422
+    assert (await list_all(client))[0] == 1
+
+
+async def test_pages_continue_from_hot_collection_into_archive(client, review_service):
+    await review_service.collection.insert_many([
+        {"rating": 1 + i % 5, "review_text": f"Older visit {i}", "enrichment_status": "completed",
+         "timestamp": datetime.utcnow() - timedelta(days=40, minutes=i // 2)}
+        for i in range(7)
+    ])
+    for i in range(4):
+        await client.post("/api/reviews/submit", json={"rating": 5, "review_text": f"Recent visit number {i}"})
+    total_before, before = await list_all(client, limit=3)
+
+    assert await review_service.archive_reviews(older_than_days=30, batch_size=3) == 7
+
+    total_after, after = await list_all(client, limit=3)
+    assert await review_service.collection.count_documents({}) == 4
+    assert total_before == total_after == 11
+    assert [review["_id"] for review in after] == [review["_id"] for review in before]
+    # Filters and skip apply across both tiers too
+    _, fours = await list_all(client, limit=2, rating=4)
+    assert [review["_id"] for review in fours] == [review["_id"] for review in before if review["rating"] == 4]
+    skipped = (await client.get("/api/reviews/all", params={"skip": 5, "limit": 3})).json()["reviews"]
+    assert [review["_id"] for review in skipped] == [review["_id"] for review in before[5:8]]
+
+
+async def test_duplicate_count_lands_on_an_archived_root(client, review_service):
+    root = (await client.post("/api/reviews/submit", json={"rating": 2, "review_text": COMPLAINT})).json()["submission_id"]
+    await age_reviews(review_service, days=40)
+    await review_service.archive_reviews(older_than_days=30, batch_size=10)
+
+    response = await client.post("/api/reviews/submit", json={"rating": 2, "review_text": COMPLAINT + "!"})
+    assert response.status_code == 200
+
+    total, reviews = await list_all(client, collapse="true")
+    assert total == 1
+    assert reviews[0]["_id"] == root
+    assert reviews[0]["duplicate_count"] == 1
\ No newline at end of file
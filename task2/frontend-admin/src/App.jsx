@@ -1,10 +1,10 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { LayoutDashboard, RefreshCw, Loader2, AlertCircle } from 'lucide-react';
 import StatsCards from './components/StatsCards';
 import FilterBar from './components/FilterBar';
 import SubmissionCard from './components/SubmissionCard';
 import EmptyState from './components/EmptyState';
-import { getAllReviews, getStats, checkHealth } from './services/api';
+import { getAllReviews, searchReviews, getStats, checkHealth, subscribeToReviewStream } from './services/api';
 import './App.css';
 
 function App() {
@@ -14,7 +14,10 @@ function App() {
   const [refreshing, setRefreshing] = useState(false);
   const [error, setError] = useState(null);
   const [selectedRating, setSelectedRating] = useState(null);
+  const [searchQuery, setSearchQuery] = useState('');
   const [apiStatus, setApiStatus] = useState('checking');
+  const [liveConnected, setLiveConnected] = useState(false);
+  const wasConnected = useRef(false);
 
   // Check API health on mount
   useEffect(() => {
@@ -32,7 +35,9 @@ function App() {
 
     try {
       const [reviewsData, statsData] = await Promise.all([
-        getAllReviews(50, 0, selectedRating),
+        searchQuery
+          ? searchReviews(searchQuery, 50, selectedRating)
+          : getAllReviews(50, 0, selectedRating),
         getStats(),
       ]);
 
@@ -49,16 +54,48 @@ function App() {
   // Initial load
   useEffect(() => {
     fetchData();
-  }, [selectedRating]);
+  }, [selectedRating, searchQuery]);
 
-  // Auto-refresh every 30 seconds
+  // Live updates pushed by the server
   useEffect(() => {
+    // Search results are ranked by the server; new reviews aren't spliced into them
+    const matchesFilter = (review) => !searchQuery && (!selectedRating || review.rating === selectedRating);
+
+    const unsubscribe = subscribeToReviewStream({
+      onReviewCreated: (review) => {
+        if (!matchesFilter(review)) return;
+        setReviews((current) =>
+          [review, ...current.filter((r) => r._id !== review._id)].slice(0, 50)
+        );
+      },
+      onReviewUpdated: (review) => {
+        setReviews((current) =>
+          current.map((r) => (r._id === review._id ? { ...r, ...review } : r))
+        );
+      },
+      onStats: setStats,
+      onStatusChange: (connected) => {
+        // Events sent while disconnected are lost, so catch up after a reconnect
+        if (connected && wasConnected.current === false) fetchData(true);
+        wasConnected.current = connected;
+        setLiveConnected(connected);
+      },
+    });
+
+    wasConnected.current = null;  // the first open follows the initial load, no catch-up needed
+    return unsubscribe;
+  }, [selectedRating, searchQuery]);
+
+  // Fall back to polling every 30 seconds while the live feed is down
+  useEffect(() => {
+    if (liveConnected) return undefined;
+
     const interval = setInterval(() => {
       fetchData(true);
     }, 30000);
 
     return () => clearInterval(interval);
-  }, [selectedRating]);
+  }, [selectedRating, searchQuery, liveConnected]);
 
   const handleRefresh = () => {
     fetchData(true);
@@ -70,6 +107,7 @@ function App() {
 
   const handleResetFilters = () => {
     setSelectedRating(null);
+    setSearchQuery('');
   };
 
   return (
@@ -124,6 +162,8 @@ function App() {
         <FilterBar
           selectedRating={selectedRating}
           onRatingChange={handleRatingChange}
+          searchQuery={searchQuery}
+          onSearch={setSearchQuery}
           onReset={handleResetFilters}
         />
 
@@ -173,8 +213,8 @@ function App() {
           {/* Empty State */}
           {!loading && reviews.length === 0 && !error && (
             <EmptyState
-              message={selectedRating ? `No ${selectedRating}-star reviews yet` : "No reviews yet"}
-              subtitle={selectedRating ? "Try selecting a different rating filter" : "Reviews will appear here once customers submit them"}
+              message={searchQuery ? `No reviews match "${searchQuery}"` : selectedRating ? `No ${selectedRating}-star reviews yet` : "No reviews yet"}
+              subtitle={searchQuery || selectedRating ? "Try a different search or rating filter" : "Reviews will appear here once customers submit them"}
             />
           )}
         </div>
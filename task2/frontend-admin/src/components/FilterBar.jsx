@@ -1,7 +1,19 @@
-import React from 'react';
-import { Filter, RotateCcw } from 'lucide-react';
+import React, { useState, useEffect } from 'react';
+import { Filter, RotateCcw, Search } from 'lucide-react';
+
+const FilterBar = ({ selectedRating, onRatingChange, searchQuery, onSearch, onReset }) => {
+  const [searchText, setSearchText] = useState(searchQuery);
+
+  // Keep the box in sync when filters are reset from outside
+  useEffect(() => {
+    setSearchText(searchQuery);
+  }, [searchQuery]);
+
+  const handleSubmit = (e) => {
+    e.preventDefault();
+    onSearch(searchText.trim());
+  };
 
-const FilterBar = ({ selectedRating, onRatingChange, onReset }) => {
   return (
     <div className="filter-bar">
       <div className="filter-content">
@@ -12,6 +24,20 @@ const FilterBar = ({ selectedRating, onRatingChange, onReset }) => {
           </span>
         </div>
         
+        <form className="filter-group" onSubmit={handleSubmit}>
+          <label className="filter-label">Search</label>
+          <input
+            type="search"
+            className="filter-select"
+            placeholder="e.g. refund"
+            value={searchText}
+            onChange={(e) => setSearchText(e.target.value)}
+          />
+          <button type="submit" className="btn btn-secondary btn-icon" title="Search">
+            <Search size={20} />
+          </button>
+        </form>
+
         <div className="filter-group">
           <label className="filter-label">Rating</label>
           <select 
@@ -28,7 +54,7 @@ const FilterBar = ({ selectedRating, onRatingChange, onReset }) => {
           </select>
         </div>
 
-        {selectedRating && (
+        {(selectedRating || searchQuery) && (
           <button 
             className="btn btn-secondary btn-icon"
             onClick={onReset}
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useState } from 'react';
 import { 
   Star, 
   Clock, 
@@ -7,8 +7,25 @@ import {
   CheckCircle,
   FileText 
 } from 'lucide-react';
+import { getReviewById } from '../services/api';
 
 const SubmissionCard = ({ submission, index }) => {
+  const [fullText, setFullText] = useState(null);
+  const [loadingFullText, setLoadingFullText] = useState(false);
+
+  // The list uses the summary view; fetch the full review only when asked
+  const handleShowFullText = async () => {
+    setLoadingFullText(true);
+    try {
+      const review = await getReviewById(submission._id || submission.id);
+      setFullText(review.review_text);
+    } catch (error) {
+      console.error('Error loading full review:', error);
+    } finally {
+      setLoadingFullText(false);
+    }
+  };
+
   const formatDate = (dateString) => {
     try {
       const date = new Date(dateString);
@@ -77,8 +94,19 @@ const SubmissionCard = ({ submission, index }) => {
           Customer Review
         </div>
         <div className="section-content">
-          {submission.review_text || 'No review text provided'}
+          {fullText || submission.review_text || 'No review text provided'}
+          {submission.review_text_truncated && !fullText && '...'}
         </div>
+        {submission.review_text_truncated && !fullText && (
+          <button
+            className="btn btn-secondary"
+            onClick={handleShowFullText}
+            disabled={loadingFullText}
+            style={{ marginTop: 'var(--spacing-sm)' }}
+          >
+            {loadingFullText ? 'Loading...' : 'Show full review'}
+          </button>
+        )}
       </div>
 
       {/* AI Summary */}
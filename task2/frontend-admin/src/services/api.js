@@ -11,9 +11,9 @@ const api = axios.create({
 });
 
 // Get all reviews
-export const getAllReviews = async (limit = 50, skip = 0, rating = null) => {
+export const getAllReviews = async (limit = 50, skip = 0, rating = null, view = 'summary') => {
   try {
-    const params = { limit, skip };
+    const params = { limit, skip, view };
     if (rating) params.rating = rating;
     
     const response = await api.get('/api/reviews/all', { params });
@@ -26,6 +26,35 @@ export const getAllReviews = async (limit = 50, skip = 0, rating = null) => {
   }
 };
 
+// Full-text search, most relevant first
+export const searchReviews = async (query, limit = 50, rating = null, view = 'summary') => {
+  try {
+    const params = { q: query, limit, view };
+    if (rating) params.rating = rating;
+    
+    const response = await api.get('/api/reviews/search', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error searching reviews:', error);
+    throw new Error(
+      error.response?.data?.detail || 'Failed to search reviews'
+    );
+  }
+};
+
+// Get a single review with all fields
+export const getReviewById = async (reviewId) => {
+  try {
+    const response = await api.get(`/api/reviews/${reviewId}`);
+    return response.data.review;
+  } catch (error) {
+    console.error('Error fetching review:', error);
+    throw new Error(
+      error.response?.data?.detail || 'Failed to fetch review'
+    );
+  }
+};
+
 // Get statistics
 export const getStats = async () => {
   try {
@@ -39,6 +68,21 @@ export const getStats = async () => {
   }
 };
 
+// Live feed: server-sent review_created / review_updated / stats events.
+// Returns a function that closes the stream.
+export const subscribeToReviewStream = ({ onReviewCreated, onReviewUpdated, onStats, onStatusChange }) => {
+  const source = new EventSource(`${API_BASE_URL}/api/reviews/stream`);
+  const parse = (handler) => (event) => handler?.(JSON.parse(event.data));
+
+  source.addEventListener('review_created', parse(onReviewCreated));
+  source.addEventListener('review_updated', parse(onReviewUpdated));
+  source.addEventListener('stats', parse(onStats));
+  source.onopen = () => onStatusChange?.(true);
+  source.onerror = () => onStatusChange?.(false);  // EventSource reconnects on its own
+
+  return () => source.close();
+};
+
 // Health check
 export const checkHealth = async () => {
   try {
@@ -2,9 +2,28 @@ import React, { useState, useEffect } from 'react';
 import { MessageSquare, AlertCircle, Loader2 } from 'lucide-react';
 import ReviewForm from './components/ReviewForm';
 import ResponseDisplay from './components/ResponseDisplay';
-import { submitReview, checkHealth } from './services/api';
+import { submitReview, getReviewStatus, checkHealth } from './services/api';
 import './App.css';
 
+const STATUS_POLL_INTERVAL_MS = 2000;
+const STATUS_POLL_ATTEMPTS = 15;
+
+// In background enrichment mode the reply may not be ready when /submit returns
+const waitForAiResponse = async (submissionId) => {
+  for (let attempt = 0; attempt < STATUS_POLL_ATTEMPTS; attempt++) {
+    await new Promise((resolve) => setTimeout(resolve, STATUS_POLL_INTERVAL_MS));
+    try {
+      const status = await getReviewStatus(submissionId);
+      if (status.enrichment_status !== 'pending') {
+        return status.ai_response;
+      }
+    } catch (error) {
+      // Keep polling; the review itself was saved
+    }
+  }
+  return null;
+};
+
 function App() {
   const [apiStatus, setApiStatus] = useState('checking');
   const [response, setResponse] = useState(null);
@@ -16,12 +35,16 @@ function App() {
       .catch(() => setApiStatus('offline'));
   }, []);
 
-  const handleSubmitSuccess = async (rating, reviewText) => {
+  const handleSubmitSuccess = async (rating, reviewText, idempotencyKey) => {
     try {
-      const result = await submitReview(rating, reviewText);
+      const result = await submitReview(rating, reviewText, idempotencyKey);
+      let aiResponse = result.ai_response;
+      if (!aiResponse && result.enrichment_status === 'pending') {
+        aiResponse = await waitForAiResponse(result.submission_id);
+      }
       setResponse({
         type: 'success',
-        message: result.ai_response,
+        message: aiResponse || 'Your review has been received. Thank you for your feedback!',
       });
       // Auto-scroll to response
       setTimeout(() => {
@@ -1,12 +1,22 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { Send, Loader2, Star as StarIcon, MessageSquare } from 'lucide-react';
 import StarRating from './StarRating';
 
+const newIdempotencyKey = () =>
+  window.crypto?.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
 const ReviewForm = ({ onSubmitSuccess, onSubmitError }) => {
   const [rating, setRating] = useState(0);
   const [reviewText, setReviewText] = useState('');
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [errors, setErrors] = useState({});
+  // A second click can land before the disabled button re-renders, so guard synchronously
+  const submittingRef = useRef(false);
+  // One key per attempt: resubmitting the same review (retry, double submit) reuses it,
+  // so the server creates it once; editing the review starts a new attempt
+  const idempotencyKeyRef = useRef(null);
 
   const validateForm = () => {
     const newErrors = {};
@@ -30,28 +40,35 @@ const ReviewForm = ({ onSubmitSuccess, onSubmitError }) => {
   const handleSubmit = async (e) => {
     e.preventDefault();
 
-    if (!validateForm()) {
+    if (submittingRef.current || !validateForm()) {
       return;
     }
 
+    submittingRef.current = true;
     setIsSubmitting(true);
     setErrors({});
+    if (!idempotencyKeyRef.current) {
+      idempotencyKeyRef.current = newIdempotencyKey();
+    }
 
     try {
-      await onSubmitSuccess(rating, reviewText);
+      await onSubmitSuccess(rating, reviewText, idempotencyKeyRef.current);
       // Reset form on success
       setRating(0);
       setReviewText('');
+      idempotencyKeyRef.current = null;
     } catch (error) {
       onSubmitError(error);
       setErrors({ submit: error.message });
     } finally {
+      submittingRef.current = false;
       setIsSubmitting(false);
     }
   };
 
   const handleRatingChange = (newRating) => {
     setRating(newRating);
+    idempotencyKeyRef.current = null;
     if (errors.rating) {
       setErrors({ ...errors, rating: undefined });
     }
@@ -59,6 +76,7 @@ const ReviewForm = ({ onSubmitSuccess, onSubmitError }) => {
 
   const handleTextChange = (e) => {
     setReviewText(e.target.value);
+    idempotencyKeyRef.current = null;
     if (errors.reviewText) {
       setErrors({ ...errors, reviewText: undefined });
     }
@@ -10,13 +10,17 @@ const api = axios.create({
   timeout: 30000, // 30 seconds for LLM response
 });
 
-// Submit a review
-export const submitReview = async (rating, reviewText) => {
+// Submit a review; requests with the same idempotency key create it only once
+export const submitReview = async (rating, reviewText, idempotencyKey) => {
   try {
-    const response = await api.post('/api/reviews/submit', {
-      rating,
-      review_text: reviewText,
-    });
+    const response = await api.post(
+      '/api/reviews/submit',
+      {
+        rating,
+        review_text: reviewText,
+      },
+      { headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {} }
+    );
     return response.data;
   } catch (error) {
     if (error.response) {
@@ -32,6 +36,16 @@ export const submitReview = async (rating, reviewText) => {
   }
 };
 
+// Get AI enrichment status for a submitted review
+export const getReviewStatus = async (submissionId) => {
+  try {
+    const response = await api.get(`/api/reviews/${submissionId}/status`);
+    return response.data;
+  } catch (error) {
+    throw new Error(error.response?.data?.detail || 'Failed to fetch review status');
+  }
+};
+
 // Health check
 export const checkHealth = async () => {
   try {